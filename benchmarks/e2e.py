@@ -0,0 +1,392 @@
+"""End-to-end benchmarks: the real app, run headless, against FakeSpotify.
+
+Nothing in the app is mocked. The Spotify clients are pointed at a local
+FakeSpotify server (see fake_spotify.py), which adds the configured latency
+and counts every request, and the app runs under Textual's headless test
+driver. Scenarios:
+
+- cold_start:    a fresh process (imports, first frame, every page of the
+                 playlist list in the sidebar), run in a subprocess so
+                 import costs are real. See also startup.py.
+- playlist_load: selecting a playlist until its first page is on screen,
+                 with an empty cache and again with a warm one.
+- page_flip:     ctrl+d to the next page, after the prefetch has had time to
+                 land and back to back.
+- track_start:   enter on a track until Spotify has the play command, and
+                 until the poller sees it playing.
+- poll_overhead: playback polls per minute while idle and while playing, the
+                 cost of one poll, and how late the event loop runs timers
+                 while polling.
+
+Usage (from the repository root; needs the app's requirements):
+
+    python -m benchmarks.e2e --out bench_e2e.json
+    python -m benchmarks.e2e --latency-ms 120 --rate-limit-every 25
+
+Results are written as JSON (suite, meta, config, results); compare two
+files to catch regressions between releases. Timings are in milliseconds,
+request counts are per route as seen by the fake server.
+"""
+
+import time
+
+_T0 = time.perf_counter()
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import tempfile  # noqa: E402
+from dataclasses import asdict  # noqa: E402
+from urllib.parse import urlsplit  # noqa: E402
+
+from benchmarks.fake_spotify import (  # noqa: E402
+    TRACK_PAGE_MAX, FakeSpotify, FakeSpotifyConfig,
+)
+from benchmarks.report import request_delta, summarize, write_report  # noqa: E402
+
+SCENARIOS = ("cold_start", "playlist_load", "page_flip", "track_start", "poll_overhead")
+SCREEN_SIZE = (160, 50)
+
+
+def wire(api_base: str) -> None:
+    """Point both Spotify clients at api_base. Must run before the app starts.
+    The spotipy client is still built on first use, as in the app, so
+    spotipy and requests are imported when the app first needs them."""
+    from spotify_api.async_client import AsyncSpotifyClient
+    from spotify_api.request_scheduler import SCHEDULED_HOSTS
+    from spotify_api.spotify_client import SpotifyClient
+
+    def build():
+        import spotipy
+        from spotify_api.coalescing import CoalescingSpotify
+        from spotify_api.http_pool import get_session
+
+        client = spotipy.Spotify(auth="fake-token", requests_session=get_session())
+        client.prefix = api_base
+        return CoalescingSpotify(client)
+
+    # The fake stands in for api.spotify.com, so its requests take scheduler
+    # tokens and get 429 handling exactly as the real host's would.
+    SCHEDULED_HOSTS.add(urlsplit(api_base).hostname)
+    SpotifyClient._instance = None
+    SpotifyClient.build = staticmethod(build)
+    AsyncSpotifyClient._instance = AsyncSpotifyClient(
+        lambda: ("fake-token", time.time() + 3600), base_url=api_base)
+
+
+async def _until(predicate, timeout: float = 30.0, step: float = 0.002) -> float:
+    """Yield to the app until predicate() holds; returns perf_counter then."""
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("benchmark condition not reached")
+        await asyncio.sleep(step)
+    return time.perf_counter()
+
+
+def _app_parts():
+    from main import Spotuify
+    from spotify_player.player import Player
+    from tools.playback_monitor import PlaybackMonitor
+
+    return Spotuify, Player, PlaybackMonitor
+
+
+# -- cold start ------------------------------------------------------------
+
+def bench_cold_start(fake: FakeSpotify, config, runs: int, cache_root: str) -> dict:
+    walls, imports, frames, first, complete, calls = [], [], [], [], [], []
+    for run in range(runs):
+        env = dict(os.environ, SPOTUIPY_CACHE_DIR=os.path.join(cache_root, f"cold-{run}"))
+        before = fake.stats()
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.e2e", "--child-startup",
+             "--api-base", fake.api_base, "--playlists", str(config.playlists)],
+            capture_output=True, text=True, env=env, timeout=120,
+        )
+        walls.append(time.perf_counter() - started)
+        if proc.returncode != 0:
+            raise RuntimeError(f"startup child failed:\n{proc.stderr}")
+        child = json.loads(proc.stdout.strip().splitlines()[-1])
+        imports.append(child["imported_s"])
+        frames.append(child["first_frame_s"])
+        first.append(child["first_playlist_s"])
+        complete.append(child["all_playlists_s"])
+        calls.append(request_delta(before, fake.stats()))
+    return {
+        "process_wall": summarize(walls),
+        "imports_done": summarize(imports),
+        "first_frame": summarize(frames),
+        "first_playlist_shown": summarize(first),
+        "all_playlists_shown": summarize(complete),
+        "requests": calls[-1] if calls else {},
+    }
+
+
+def _startup_child(api_base: str, playlists: int) -> None:
+    wire(api_base)
+    Spotuify, Player, _ = _app_parts()
+    imported = time.perf_counter()
+
+    async def run():
+        app = Spotuify()
+        async with app.run_test(size=SCREEN_SIZE):
+            # run_test returns once the app is ready and its first screen is up.
+            frame = time.perf_counter()
+            player = app.query_one(Player)
+            first = await _until(lambda: player.playlist_names)
+            done = await _until(lambda: len(player.playlist_names) >= playlists)
+        return frame, first, done
+
+    frame, first, done = asyncio.run(run())
+    print(json.dumps({
+        "imported_s": imported - _T0,
+        "first_frame_s": frame - _T0,
+        "first_playlist_s": first - _T0,
+        "all_playlists_s": done - _T0,
+    }))
+
+
+# -- in-process scenarios --------------------------------------------------
+
+async def _start(app, Player, config):
+    player = app.query_one(Player)
+    await _until(lambda: len(player.playlist_names) >= config.playlists)
+    return player
+
+
+async def _load(player, name: str) -> float:
+    """Select a playlist; seconds until its first page is in the table."""
+    shown = player.curr_displayed_tracks.get(name)
+    started = time.perf_counter()
+    player.load_playlist_content(name)
+    done = await _until(lambda: player.curr_displayed_tracks.get(name) is not shown)
+    return done - started
+
+
+async def _flip(player, name: str):
+    """ctrl+d; seconds until the next page is in the table, or None on the
+    last page."""
+    page = player.curr_displayed_tracks[name]
+    if not page.get("next"):
+        return None
+    started = time.perf_counter()
+    player.action_scroll_down()
+    done = await _until(lambda: player.curr_displayed_tracks[name] is not page)
+    return done - started
+
+
+async def bench_first_session(fake, config, scenarios, runs, window_s) -> dict:
+    """Empty cache: playlist_load (cold), page_flip, track_start and
+    poll_overhead, in that order, in one app session."""
+    Spotuify, Player, PlaybackMonitor = _app_parts()
+    results = {}
+    app = Spotuify()
+    async with app.run_test(size=SCREEN_SIZE) as pilot:
+        player = await _start(app, Player, config)
+        names = list(player.playlist_names)
+        # Playlists the track index reaches last, so the cold loads really
+        # are cold rather than served by the index build.
+        cold_names = names[::-1][:runs]
+
+        if "playlist_load" in scenarios:
+            samples, calls = [], []
+            for name in cold_names:
+                before = fake.stats()
+                samples.append(await _load(player, name))
+                calls.append(request_delta(before, fake.stats()))
+            results["playlist_load_cold"] = {
+                "load": summarize(samples), "requests": calls[0] if calls else {}}
+
+        # Let the background index finish so it doesn't skew what follows.
+        expected = config.playlists * config.tracks_per_playlist
+        await _until(lambda: len(player.search_index) >= expected, timeout=300)
+
+        if "page_flip" in scenarios:
+            results["page_flip"] = await _bench_page_flip(player, names, runs)
+
+        if "track_start" in scenarios:
+            results["track_start"] = await _bench_track_start(
+                fake, pilot, player, app.query_one(PlaybackMonitor), names[0], runs)
+
+        if "poll_overhead" in scenarios:
+            results["poll_overhead"] = await _bench_poll_overhead(
+                fake, pilot, player, app.query_one(PlaybackMonitor), names[0], window_s)
+    return results
+
+
+async def bench_warm_session(fake, config, runs) -> dict:
+    """A second app session over the first one's cache."""
+    Spotuify, Player, _ = _app_parts()
+    app = Spotuify()
+    async with app.run_test(size=SCREEN_SIZE):
+        player = await _start(app, Player, config)
+        samples, calls = [], []
+        for name in list(player.playlist_names)[::-1][:runs]:
+            before = fake.stats()
+            samples.append(await _load(player, name))
+            calls.append(request_delta(before, fake.stats()))
+    return {"load": summarize(samples), "requests": calls[0] if calls else {}}
+
+
+async def _bench_page_flip(player, names, runs) -> dict:
+    prefetched, back_to_back = [], []
+    for name in names[:runs]:
+        await _load(player, name)
+        while True:
+            # Give the prefetch of the next page time to land first.
+            await asyncio.sleep(0.3)
+            flipped = await _flip(player, name)
+            if flipped is None:
+                break
+            prefetched.append(flipped)
+        await _load(player, name)
+        while (flipped := await _flip(player, name)) is not None:
+            back_to_back.append(flipped)
+    return {"prefetched": summarize(prefetched), "back_to_back": summarize(back_to_back)}
+
+
+def _playlist_index(name: str) -> int:
+    return int(name.rsplit(" ", 1)[1])
+
+
+async def _bench_track_start(fake, pilot, player, monitor, name, runs) -> dict:
+    await _load(player, name)
+    player.track_table.focus()
+    commands, visible, calls = [], [], []
+    rows = min(runs, player.track_table.row_count - 1, TRACK_PAGE_MAX - 1)
+    for row in range(1, rows + 1):
+        uri = fake.track_uri(_playlist_index(name), row)
+        player.track_table.move_cursor(row=row)
+        await pilot.pause()
+        before = fake.stats()
+        started = time.perf_counter()
+        await pilot.press("enter")
+        sent = await _until(
+            lambda: fake.stats().get("put_play", 0) > before.get("put_play", 0))
+        seen = await _until(lambda: monitor.current_uri == uri)
+        commands.append(sent - started)
+        visible.append(seen - started)
+        calls.append(request_delta(before, fake.stats()))
+        await asyncio.sleep(0.5)
+    return {
+        "command_sent": summarize(commands),
+        "playing_on_screen": summarize(visible),
+        "requests": calls[0] if calls else {},
+    }
+
+
+async def _bench_poll_overhead(fake, pilot, player, monitor, name, window_s) -> dict:
+    from main import SP as ASYNC_SP
+
+    async def window():
+        before = fake.stats()
+        lateness = []
+        end = time.perf_counter() + window_s
+        while time.perf_counter() < end:
+            asked = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lateness.append(max(0.0, time.perf_counter() - asked - 0.01))
+        polls = request_delta(before, fake.stats()).get("get_player", 0)
+        return {
+            "polls_per_min": round(polls * 60 / window_s, 1),
+            "timer_lateness": summarize(lateness),
+        }
+
+    # Playing: make sure something is.
+    if not monitor.is_playing:
+        await _load(player, name)
+        player.track_table.focus()
+        await pilot.press("enter")
+        await _until(lambda: monitor.is_playing)
+    playing = await window()
+
+    await ASYNC_SP.pause_playback()
+    await _until(lambda: not monitor.is_playing)
+    idle = await window()
+
+    durations = []
+    for _ in range(20):
+        started = time.perf_counter()
+        await monitor.poll()
+        durations.append(time.perf_counter() - started)
+    return {"playing": playing, "idle": idle, "poll_call": summarize(durations)}
+
+
+# -- entry point -----------------------------------------------------------
+
+def run(config: FakeSpotifyConfig, scenarios, runs: int, window_s: float, out) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="spotuipy-bench-") as cache_root, \
+            FakeSpotify(config) as fake:
+        os.environ["SPOTUIPY_CACHE_DIR"] = os.path.join(cache_root, "session")
+        wire(fake.api_base)
+        if "cold_start" in scenarios:
+            results["cold_start"] = bench_cold_start(fake, config, runs, cache_root)
+        in_process = set(scenarios) - {"cold_start"}
+        if in_process:
+            results.update(asyncio.run(
+                bench_first_session(fake, config, in_process, runs, window_s)))
+        if "playlist_load" in scenarios:
+            results["playlist_load_warm"] = asyncio.run(
+                bench_warm_session(fake, config, runs))
+        results["requests_total"] = fake.stats()
+        if in_process:
+            # The app's own view of the same traffic, per endpoint.
+            from spotify_api.metrics import METRICS
+
+            results["app_metrics"] = METRICS.snapshot()
+    return write_report(
+        out, "e2e",
+        dict(asdict(config), runs=runs, window_s=window_s, scenarios=list(scenarios)),
+        results,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default="bench_e2e.json",
+                        help="where to write the JSON results ('-' for stdout)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help="comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--window-s", type=float, default=5.0,
+                        help="how long to count polls for, idle and playing")
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--playlists", type=int, default=12)
+    parser.add_argument("--tracks", type=int, default=500)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--retry-after-s", type=int, default=1)
+    parser.add_argument("--play-delay-ms", type=float, default=150.0)
+    parser.add_argument("--child-startup", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--api-base", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_startup:
+        _startup_child(args.api_base, args.playlists)
+        return
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    config = FakeSpotifyConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        playlists=args.playlists, tracks_per_playlist=args.tracks,
+        rate_limit_every=args.rate_limit_every, retry_after_s=args.retry_after_s,
+        play_delay_ms=args.play_delay_ms,
+    )
+    report = run(config, scenarios, args.runs, args.window_s, args.out)
+    if args.out != "-":
+        print(f"Wrote {args.out}")
+        for scenario, result in report["results"].items():
+            print(f"  {scenario}: {json.dumps(result)[:160]}")
+
+
+if __name__ == "__main__":
+    main()
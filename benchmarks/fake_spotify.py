@@ -0,0 +1,435 @@
+"""A local stand-in for the parts of the Spotify Web API spotuipy uses.
+
+FakeSpotify serves a deterministic library (playlists of tracks, a couple of
+Connect devices, one player) over plain HTTP on 127.0.0.1, using only the
+standard library. Point spotipy's `prefix` and AsyncSpotifyClient's base_url
+at `server.api_base` and the app can't tell the difference, apart from the
+knobs:
+
+- latency_ms / jitter_ms: added to every response, to model the round trip;
+- playlists, tracks_per_playlist: library size (and so page counts, since
+  pages are capped at Spotify's limits of 50 playlists / 100 tracks);
+- rate_limit_every / retry_after_s: every Nth request gets a 429 with that
+  Retry-After, to exercise the scheduler's hold-and-retry path;
+- play_delay_ms: how long a device takes to report a newly started track.
+
+Every request is counted per route (stats()), so benchmarks can report API
+calls per operation as well as time.
+
+Run it standalone with `python -m benchmarks.fake_spotify --port 8901`.
+"""
+
+import argparse
+import json
+import random
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+PLAYLIST_PAGE_MAX = 50
+TRACK_PAGE_MAX = 100
+TRACK_DURATION_MS = 180000
+
+
+@dataclass
+class FakeSpotifyConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    playlists: int = 20
+    tracks_per_playlist: int = 250
+    rate_limit_every: int = 0
+    retry_after_s: int = 1
+    play_delay_ms: float = 0.0
+    seed: int = 0
+
+
+def _png(width: int = 1, height: int = 1) -> bytes:
+    """A tiny valid grey PNG, so cover decoding has something real to do."""
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(
+            ">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    raw = b"".join(b"\x00" + b"\x80\x80\x80" * width for _ in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+class FakeSpotify:
+    """The fake server: library, player state and request counters."""
+
+    def __init__(self, config: FakeSpotifyConfig = None, port: int = 0) -> None:
+        self.config = config or FakeSpotifyConfig()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._request_no = 0
+        self._snapshots = {
+            self.playlist_id(i): f"snap-{i}-0" for i in range(self.config.playlists)
+        }
+        self.devices = [
+            {"id": "dev-spotifyd", "name": "spotifyd", "type": "Computer",
+             "is_active": False, "volume_percent": 100},
+            {"id": "dev-phone", "name": "Phone", "type": "Smartphone",
+             "is_active": True, "volume_percent": 60},
+        ]
+        self._player = {
+            "uri": None, "is_playing": False, "progress_ms": 0,
+            "started_at": 0.0, "visible_at": 0.0, "context": None,
+        }
+        self._art = _png(64, 64)
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _handler_for(self))
+        self._server.daemon_threads = True
+        self._thread = None
+
+    # -- lifecycle ---------------------------------------------------------
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_base(self) -> str:
+        return self.url + "/v1/"
+
+    def start(self) -> "FakeSpotify":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05},
+            daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # -- library -----------------------------------------------------------
+
+    @staticmethod
+    def playlist_id(i: int) -> str:
+        return f"pl{i:04d}"
+
+    def track_uri(self, playlist_index: int, position: int) -> str:
+        return f"spotify:track:t{playlist_index:04d}x{position:05d}"
+
+    def edit_playlist(self, i: int) -> None:
+        """Bump a playlist's snapshot_id, as an edit in Spotify would."""
+        with self._lock:
+            pid = self.playlist_id(i)
+            version = int(self._snapshots[pid].rsplit("-", 1)[1]) + 1
+            self._snapshots[pid] = f"snap-{i}-{version}"
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+    def _track(self, playlist_index: int, position: int) -> dict:
+        artist = f"Artist {(playlist_index * 7 + position) % 97}"
+        album = f"Album {(playlist_index * 13 + position) % 211}"
+        return {
+            "uri": self.track_uri(playlist_index, position),
+            "name": f"Track {playlist_index}-{position}",
+            "artists": [{"name": artist}],
+            "album": {
+                "name": album,
+                "images": [
+                    {"url": f"{self.url}/art/{album.replace(' ', '_')}/640",
+                     "width": 640, "height": 640},
+                    {"url": f"{self.url}/art/{album.replace(' ', '_')}/300",
+                     "width": 300, "height": 300},
+                    {"url": f"{self.url}/art/{album.replace(' ', '_')}/64",
+                     "width": 64, "height": 64},
+                ],
+            },
+            "duration_ms": TRACK_DURATION_MS,
+        }
+
+    def _track_by_uri(self, uri: str):
+        try:
+            pl, pos = uri.rsplit(":", 1)[1][1:].split("x")
+            return self._track(int(pl), int(pos))
+        except (ValueError, IndexError):
+            return None
+
+    def _playlist_index(self, pid: str) -> int:
+        i = int(pid[2:])
+        if not 0 <= i < self.config.playlists:
+            raise KeyError(pid)
+        return i
+
+    def _page(self, path, items, offset, limit, total) -> dict:
+        def link(at):
+            return f"{self.url}{path}?offset={at}&limit={limit}"
+
+        return {
+            "href": link(offset),
+            "items": items,
+            "limit": limit,
+            "offset": offset,
+            "total": total,
+            "next": link(offset + limit) if offset + limit < total else None,
+            "previous": link(max(0, offset - limit)) if offset else None,
+        }
+
+    def _tracks_page(self, i, offset, limit) -> dict:
+        total = self.config.tracks_per_playlist
+        items = [
+            {"track": self._track(i, pos), "added_at": "2024-01-01T00:00:00Z"}
+            for pos in range(offset, min(total, offset + limit))
+        ]
+        return self._page(
+            f"/v1/playlists/{self.playlist_id(i)}/tracks", items, offset, limit, total)
+
+    # -- routing -----------------------------------------------------------
+
+    def handle(self, method: str, path: str, query: dict, body: dict):
+        """Returns (status, payload, headers); payload is a dict, bytes or None."""
+        with self._lock:
+            self._request_no += 1
+            limited = (
+                self.config.rate_limit_every
+                and self._request_no % self.config.rate_limit_every == 0
+            )
+            route = _route_name(method, path)
+            self._counts[route] += 1
+            self._counts["total"] += 1
+            if limited:
+                self._counts["429"] += 1
+        delay = self.config.latency_ms + self._random.uniform(0, self.config.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+        if limited:
+            return 429, {"error": {"status": 429, "message": "API rate limit exceeded"}}, {
+                "Retry-After": str(self.config.retry_after_s)}
+        try:
+            return getattr(self, "_" + route)(path, query, body)
+        except (AttributeError, KeyError, ValueError):
+            return 404, {"error": {"status": 404, "message": "Not found."}}, {}
+
+    def _get_me_playlists(self, path, query, body):
+        offset = int(query.get("offset", 0))
+        limit = min(int(query.get("limit", 20)), PLAYLIST_PAGE_MAX)
+        total = self.config.playlists
+        items = [
+            {
+                "id": self.playlist_id(i),
+                "name": f"Playlist {i:03d}",
+                "snapshot_id": self._snapshots[self.playlist_id(i)],
+                "tracks": {"total": self.config.tracks_per_playlist},
+            }
+            for i in range(offset, min(total, offset + limit))
+        ]
+        return 200, self._page("/v1/me/playlists", items, offset, limit, total), {}
+
+    def _get_playlist(self, path, query, body):
+        pid = path.split("/")[3]
+        i = self._playlist_index(pid)
+        return 200, {
+            "id": pid,
+            "name": f"Playlist {i:03d}",
+            "snapshot_id": self._snapshots[pid],
+            "tracks": self._tracks_page(i, 0, TRACK_PAGE_MAX),
+        }, {}
+
+    def _get_playlist_tracks(self, path, query, body):
+        i = self._playlist_index(path.split("/")[3])
+        offset = int(query.get("offset", 0))
+        limit = min(int(query.get("limit", TRACK_PAGE_MAX)), TRACK_PAGE_MAX)
+        return 200, self._tracks_page(i, offset, limit), {}
+
+    def _get_devices(self, path, query, body):
+        with self._lock:
+            return 200, {"devices": [dict(d) for d in self.devices]}, {}
+
+    def _get_player(self, path, query, body):
+        with self._lock:
+            state = dict(self._player)
+            device = next((dict(d) for d in self.devices if d["is_active"]), None)
+        now = time.monotonic()
+        if state["uri"] is None or now < state["visible_at"]:
+            if state["uri"] is None or state.get("previous_uri") is None:
+                return 204, None, {}
+            state["uri"] = state["previous_uri"]
+        progress = state["progress_ms"]
+        if state["is_playing"]:
+            progress += int((now - state["started_at"]) * 1000)
+        if progress >= TRACK_DURATION_MS:
+            progress = TRACK_DURATION_MS - 1
+        return 200, {
+            "device": device,
+            "is_playing": state["is_playing"],
+            "progress_ms": progress,
+            "item": self._track_by_uri(state["uri"]),
+            "context": state["context"],
+            "currently_playing_type": "track",
+        }, {}
+
+    def _put_play(self, path, query, body):
+        device_id = query.get("device_id")
+        with self._lock:
+            if device_id:
+                self._activate(device_id)
+            uris = (body or {}).get("uris")
+            if uris:
+                self._player.update(
+                    previous_uri=self._player["uri"],
+                    uri=uris[0], progress_ms=0,
+                    visible_at=time.monotonic() + self.config.play_delay_ms / 1000,
+                    context=None,
+                )
+            elif self._player["uri"] is None:
+                return 404, {"error": {"status": 404,
+                                       "message": "Player command failed: No active device found"}}, {}
+            self._player.update(is_playing=True, started_at=time.monotonic())
+        return 204, None, {}
+
+    def _put_pause(self, path, query, body):
+        with self._lock:
+            if self._player["is_playing"]:
+                elapsed = int((time.monotonic() - self._player["started_at"]) * 1000)
+                self._player["progress_ms"] += elapsed
+            self._player["is_playing"] = False
+        return 204, None, {}
+
+    def _put_seek(self, path, query, body):
+        with self._lock:
+            self._player.update(
+                progress_ms=int(query.get("position_ms", 0)),
+                started_at=time.monotonic(),
+            )
+        return 204, None, {}
+
+    def _put_transfer(self, path, query, body):
+        ids = (body or {}).get("device_ids") or []
+        with self._lock:
+            if ids:
+                self._activate(ids[0])
+            if (body or {}).get("play") and self._player["uri"]:
+                self._player.update(is_playing=True, started_at=time.monotonic())
+        return 204, None, {}
+
+    def _get_art(self, path, query, body):
+        return 200, self._art, {"Content-Type": "image/png"}
+
+    def _activate(self, device_id) -> None:
+        # Caller holds the lock.
+        if not any(d["id"] == device_id for d in self.devices):
+            raise KeyError(device_id)
+        for d in self.devices:
+            d["is_active"] = d["id"] == device_id
+
+
+def _route_name(method: str, path: str) -> str:
+    parts = [p for p in path.split("/") if p]
+    if parts and parts[0] == "art":
+        return "get_art"
+    parts = parts[1:]  # drop "v1"
+    if method == "GET" and parts == ["me", "playlists"]:
+        return "get_me_playlists"
+    if method == "GET" and len(parts) == 2 and parts[0] == "playlists":
+        return "get_playlist"
+    if method == "GET" and len(parts) == 3 and parts[0] == "playlists" and parts[2] == "tracks":
+        return "get_playlist_tracks"
+    if parts[:2] == ["me", "player"]:
+        rest = parts[2:]
+        if method == "GET" and rest == []:
+            return "get_player"
+        if method == "GET" and rest == ["devices"]:
+            return "get_devices"
+        if method == "PUT" and rest == []:
+            return "put_transfer"
+        if method == "PUT" and rest in (["play"], ["pause"], ["seek"]):
+            return "put_" + rest[0]
+    return f"unknown {method} {path}"
+
+
+def _handler_for(fake: FakeSpotify):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_PUT(self):
+            self._dispatch("PUT")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def log_message(self, format, *args):
+            pass
+
+        def _dispatch(self, method):
+            split = urlsplit(self.path)
+            query = {k: v[0] for k, v in parse_qs(split.query).items()}
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            try:
+                body = json.loads(raw) if raw else None
+            except ValueError:
+                body = None
+            status, payload, headers = fake.handle(method, split.path, query, body)
+            if isinstance(payload, (bytes, bytearray)):
+                data = bytes(payload)
+            elif payload is None:
+                data = b""
+            else:
+                data = json.dumps(payload).encode()
+                headers.setdefault("Content-Type", "application/json")
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            if data:
+                self.wfile.write(data)
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--playlists", type=int, default=20)
+    parser.add_argument("--tracks", type=int, default=250)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--play-delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    config = FakeSpotifyConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        playlists=args.playlists, tracks_per_playlist=args.tracks,
+        rate_limit_every=args.rate_limit_every, play_delay_ms=args.play_delay_ms,
+    )
+    with FakeSpotify(config, port=args.port) as fake:
+        print(f"Fake Spotify Web API on {fake.api_base}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""Micro-benchmarks for the pure data-path code that runs on every page and
+every poll.
+
+Each case feeds synthetic data to the real function and reports throughput
+(calls/s and items/s, from the best of several timeit repeats) and
+allocations (bytes still held after one call and peak bytes during it, from
+tracemalloc). Track cases run over playlists of 100 to 100k tracks; the poll
+cases run the playback state machine, poll scheduler and progress-bar repaint
+decisions over a stream of a million synthetic poll responses.
+
+    python -m benchmarks.micro --out bench_micro.json
+    python -m benchmarks.micro --sizes 100,1000 --events 100000 --only poll
+
+Only the standard library is needed.
+"""
+
+import argparse
+import gc
+import timeit
+import tracemalloc
+
+from benchmarks.report import summarize, write_report
+from tools.formatting import format_artist_track, format_duration
+from tools.play_queue import PlayQueue
+from tools.playback_state import PlaybackState, ended_naturally
+from tools.poll_scheduler import PollScheduler
+from tools.render_budget import ProgressFrame
+from tools.track import PlaylistTracks, Track
+from tools.track_loading import load_tracks, load_user_playlists
+
+SIZES = (100, 1_000, 10_000, 100_000)
+EVENTS = 1_000_000
+REPEAT = 5
+# Each timed repeat runs the case enough times to take at least this long.
+MIN_TIME_S = 0.2
+# Synthetic libraries repeat artists and albums the way real ones do.
+ARTISTS = 2_000
+ALBUMS = 6_000
+
+
+def tracks_page(n: int) -> dict:
+    """A playlist-tracks page holding n items, shaped like the Web API's."""
+    return {
+        "offset": 0,
+        "limit": n,
+        "total": n,
+        "next": None,
+        "items": [
+            {
+                "track": {
+                    "uri": f"spotify:track:{i:022d}",
+                    "name": f"Track number {i} (Remastered {1960 + i % 60})",
+                    "artists": [{"name": f"Artist {i % ARTISTS}"}],
+                    "album": {"name": f"Album {i % ALBUMS} - Deluxe Edition"},
+                    "duration_ms": 120_000 + (i * 7919) % 240_000,
+                }
+            }
+            for i in range(n)
+        ],
+    }
+
+
+def playlists_page(n: int) -> dict:
+    return {
+        "items": [
+            {"id": f"pl{i:08d}", "name": f"Playlist {i}", "snapshot_id": f"snap{i}"}
+            for i in range(n)
+        ]
+    }
+
+
+def playlist_tracks(n: int) -> PlaylistTracks:
+    pt = PlaylistTracks()
+    for i in range(n):
+        pt.append(Track(
+            uri=f"spotify:track:{i:022d}", name=f"Track {i}",
+            artist=f"Artist {i % ARTISTS}", album=f"Album {i % ALBUMS}",
+            duration_ms=200_000, row_index=i,
+        ))
+    return pt
+
+
+def poll_events(n: int, per_track: int = 40) -> list:
+    """n current_playback responses: tracks played through at ~5s polls,
+    every fifth one skipped halfway, with a stopped poll between tracks now
+    and then. Generated once as a repeating cycle, since the state machine
+    only looks at the values."""
+    cycle = []
+    track = 0
+    while len(cycle) < min(n, 20_000):
+        duration = 200_000
+        last = per_track // 2 if track % 5 == 0 else per_track
+        for step in range(1, last + 1):
+            cycle.append({
+                "is_playing": True,
+                "progress_ms": duration * step // per_track - 1,
+                "item": {"uri": f"spotify:track:{track:022d}", "duration_ms": duration},
+            })
+        if track % 7 == 0:
+            cycle.append(None)
+        track += 1
+    return (cycle * (n // len(cycle) + 1))[:n]
+
+
+def measure(fn, items: int, repeat: int = REPEAT, min_time: float = MIN_TIME_S) -> dict:
+    """Time fn() (best of `repeat` timeit runs, each at least min_time) and
+    trace the memory one call allocates."""
+    timer = timeit.Timer(fn)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    runs = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    best = min(runs)
+
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = fn()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    return {
+        "items": items,
+        "calls_per_s": round(1 / best, 2),
+        "items_per_s": round(items / best),
+        "ns_per_item": round(best / items * 1e9, 1),
+        "per_call": summarize(runs),
+        "alloc_retained_bytes": after - before,
+        "alloc_peak_bytes": peak - before,
+        "alloc_bytes_per_item": round((peak - before) / items, 1),
+    }
+
+
+def track_cases(n: int):
+    """(name, fn, items) for the per-playlist cases at size n."""
+    page = tracks_page(n)
+    playlists = playlists_page(n)
+    durations = [item["track"]["duration_ms"] for item in page["items"]]
+    names = [
+        (t["artists"][0]["name"], t["name"], t["album"]["name"])
+        for t in (item["track"] for item in page["items"])
+    ]
+    pt = playlist_tracks(n)
+    uris = list(pt.uris())
+    unique_names = [t.unique_name for t in pt]
+
+    def queue_walk():
+        queue = PlayQueue()
+        queue.play_from("p", pt, 0)
+        while queue.next() is not None:
+            pass
+        while queue.previous() is not None:
+            pass
+        return queue
+
+    yield "load_tracks", lambda: load_tracks(page, "p", {}), n
+    yield "load_user_playlists", lambda: load_user_playlists(playlists), n
+    yield "format_duration", lambda: [format_duration(d) for d in durations], n
+    yield "format_artist_track", lambda: [
+        format_artist_track(a, t, al, 20) for a, t, al in names], n
+    yield "PlaylistTracks.by_index", lambda: [pt.by_index(i) for i in range(n)], n
+    yield "PlaylistTracks.by_uri", lambda: [pt.by_uri(u) for u in uris], n
+    yield "PlaylistTracks.index_of_uri", lambda: [pt.index_of_uri(u) for u in uris], n
+    yield "PlaylistTracks.by_unique_name", lambda: [
+        pt.by_unique_name(u) for u in unique_names], n
+    # Every next() through the playlist, then back through the history.
+    yield "PlayQueue.next+previous", queue_walk, n
+    yield "PlayQueue.play_from", lambda: [
+        PlayQueue().play_from("p", pt, i) for i in range(0, n, max(1, n // 100))
+    ], len(range(0, n, max(1, n // 100)))
+
+
+def poll_cases(events: list):
+    """(name, fn, items) for the per-poll cases."""
+    samples = [
+        (e["progress_ms"], e["item"]["duration_ms"]) if e else (0, 0)
+        for e in events
+    ]
+
+    def state_machine():
+        state = PlaybackState()
+        update = state.update
+        for event in events:
+            update(event)
+        return state
+
+    def scheduler():
+        schedule = PollScheduler(clock=lambda: 0.0)
+        interval = schedule.next_interval
+        for progress, duration in samples:
+            interval(duration > 0, progress, duration)
+        return schedule
+
+    def monitor_step():
+        # What PlaybackMonitor does with each response, minus the I/O.
+        state = PlaybackState()
+        schedule = PollScheduler(clock=lambda: 0.0)
+        for event in events:
+            state.update(event)
+            schedule.next_interval(state.playing, state.progress_ms, state.duration_ms)
+        return state
+
+    def progress_ticks():
+        # One progress-bar tick per event, deciding what to repaint.
+        frame = ProgressFrame()
+        bar, elapsed = frame.bar_changed, frame.elapsed_text
+        repaints = 0
+        for progress, duration in samples:
+            repaints += bar(progress, duration, 32) + (elapsed(progress) is not None)
+        return repaints
+
+    n = len(events)
+    yield "ended_naturally", lambda: [ended_naturally(p, d) for p, d in samples], n
+    yield "PlaybackState.update", state_machine, n
+    yield "PollScheduler.next_interval", scheduler, n
+    yield "poll_step (state + scheduler)", monitor_step, n
+    yield "ProgressFrame tick", progress_ticks, n
+
+
+def run(sizes=SIZES, events: int = EVENTS, only: str = "", repeat: int = REPEAT,
+        min_time: float = MIN_TIME_S, progress=print) -> dict:
+    results = {}
+    for n in sizes:
+        for name, fn, items in track_cases(n):
+            if only in name:
+                key = f"{name}[n={n}]"
+                results[key] = measure(fn, items, repeat, min_time)
+                progress(f"  {key}: {results[key]['items_per_s']:,} items/s")
+    if events:
+        for name, fn, items in poll_cases(poll_events(events)):
+            if only in name:
+                key = f"{name}[events={events}]"
+                results[key] = measure(fn, items, repeat, min_time)
+                progress(f"  {key}: {results[key]['items_per_s']:,} items/s")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default="bench_micro.json",
+                        help="where to write the JSON results ('-' for stdout)")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)),
+                        help="comma-separated playlist sizes")
+    parser.add_argument("--events", type=int, default=EVENTS,
+                        help="synthetic poll responses per poll case (0 to skip)")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--only", default="",
+                        help="run only cases whose name contains this")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    quiet = args.out == "-"
+    results = run(sizes, args.events, args.only, args.repeat,
+                  progress=(lambda _: None) if quiet else print)
+    write_report(
+        args.out, "micro",
+        {"sizes": sizes, "events": args.events, "repeat": args.repeat, "only": args.only},
+        results,
+    )
+    if not quiet:
+        print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Shared helpers for the benchmark scripts: summarising timings and writing
+results as JSON that can be compared between releases."""
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def summarize(samples_s) -> dict:
+    """min / median / p95 / max / mean of durations in seconds, reported in
+    milliseconds (rounded to the microsecond)."""
+    samples = sorted(samples_s)
+    if not samples:
+        return {"n": 0}
+
+    def ms(value):
+        return round(value * 1000, 3)
+
+    rank = max(0, min(len(samples) - 1, round(0.95 * len(samples)) - 1))
+    return {
+        "n": len(samples),
+        "min_ms": ms(samples[0]),
+        "median_ms": ms(statistics.median(samples)),
+        "p95_ms": ms(samples[rank]),
+        "max_ms": ms(samples[-1]),
+        "mean_ms": ms(statistics.fmean(samples)),
+    }
+
+
+def request_delta(before: dict, after: dict) -> dict:
+    """Per-route request counts made between two FakeSpotify.stats() calls."""
+    delta = {route: after[route] - before.get(route, 0) for route in after}
+    return {route: n for route, n in sorted(delta.items()) if n}
+
+
+def meta() -> dict:
+    """Where and when the numbers were taken."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def write_report(path, suite: str, config: dict, results: dict) -> dict:
+    """Write {"suite", "meta", "config", "results"} to path ("-" for stdout)
+    and return it."""
+    report = {"suite": suite, "meta": meta(), "config": config, "results": results}
+    text = json.dumps(report, indent=2, sort_keys=False)
+    if str(path) == "-":
+        print(text)
+    else:
+        Path(path).write_text(text + "\n")
+    return report
@@ -0,0 +1,147 @@
+"""Import-time benchmarks: what importing each of the app's modules costs in
+a fresh interpreter, and what it drags in with it.
+
+Each module is imported in a new process, several times, and for each one
+the report gives:
+
+- import:       wall time of the import itself (interpreter startup not
+                included);
+- top_imports:  the most expensive packages it imported, from one run under
+                `python -X importtime`;
+- heavy:        which of HEAVY ended up loaded;
+- client_built: whether importing it built the Spotify client (it
+                shouldn't: the client is built on first use).
+
+    python -m benchmarks.startup --out bench_startup.json
+    python -m benchmarks.startup --modules main,tools.widgets --runs 10
+
+Only the standard library is needed to run it. A module whose dependencies
+aren't installed is reported with its import error. Time to the first frame
+(which needs the app's requirements and a fake Web API) is measured by the
+cold_start scenario in e2e.py.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+from benchmarks.report import ROOT, summarize, write_report
+
+MODULES = (
+    "main",
+    "spotify_player.player",
+    "tools.widgets",
+    "tools.playback_monitor",
+    "spotify_api.spotify_utils",
+    "spotify_api.async_client",
+    "spotify_api.spotify_client",
+)
+# Slow to import, and none of them needed before the first frame except
+# textual, textual_image (and the PIL it uses) and dotenv, which main loads
+# first so settings can come from .env.
+HEAVY = ("spotipy", "requests", "urllib3", "aiohttp", "dotenv", "PIL",
+         "textual_image", "textual", "redis")
+RUNS = 5
+TOP = 10
+
+_PROBE = """\
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+from spotify_api.spotify_client import SpotifyClient
+print(json.dumps({{
+    "elapsed_s": elapsed,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+    "client_built": SpotifyClient._instance is not None,
+}}))
+"""
+
+
+def parse_importtime(stderr: str) -> list:
+    """(package, self_us, cumulative_us, depth) for each line of
+    `python -X importtime` output, in the order Python reports them."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), int(fields[0]), int(fields[1]), depth))
+    return entries
+
+
+def top_imports(entries, module: str, top: int = TOP) -> list:
+    """The most expensive top-level packages loaded while importing module,
+    by cumulative time, as [package, ms]."""
+    costs = {}
+    for name, _, cumulative, _ in entries:
+        package = name.split(".")[0]
+        if package == module.split(".")[0]:
+            continue
+        costs[package] = max(costs.get(package, 0), cumulative)
+    ranked = sorted(costs.items(), key=lambda item: -item[1])[:top]
+    return [[package, round(us / 1000, 3)] for package, us in ranked]
+
+
+def _probe(module: str, importtime: bool = False):
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", _PROBE.format(module=module, heavy=HEAVY)]
+    return subprocess.run(command, cwd=ROOT, capture_output=True, text=True, timeout=120)
+
+
+def measure(module: str, runs: int = RUNS) -> dict:
+    samples, child = [], None
+    for _ in range(runs):
+        proc = _probe(module)
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines()
+            return {"error": lines[-1] if lines else f"exit status {proc.returncode}"}
+        child = json.loads(proc.stdout.strip().splitlines()[-1])
+        samples.append(child["elapsed_s"])
+    traced = _probe(module, importtime=True)
+    return {
+        "import": summarize(samples),
+        "top_imports": top_imports(parse_importtime(traced.stderr), module),
+        "heavy": child["heavy"],
+        "client_built": child["client_built"],
+    }
+
+
+def run(modules=MODULES, runs: int = RUNS, progress=print) -> dict:
+    results = {}
+    for module in modules:
+        results[module] = result = measure(module, runs)
+        if "error" in result:
+            progress(f"  {module}: {result['error']}")
+        else:
+            progress(f"  {module}: {result['import']['median_ms']} ms, "
+                     f"heavy={result['heavy']}")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default="bench_startup.json",
+                        help="where to write the JSON results ('-' for stdout)")
+    parser.add_argument("--modules", default=",".join(MODULES),
+                        help="comma-separated modules to import")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    args = parser.parse_args()
+    modules = [m for m in args.modules.split(",") if m]
+
+    quiet = args.out == "-"
+    results = run(modules, args.runs, progress=(lambda _: None) if quiet else print)
+    write_report(args.out, "startup", {"modules": modules, "runs": args.runs}, results)
+    if not quiet:
+        print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
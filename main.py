@@ -1,24 +1,48 @@
-from textual.app import App, ComposeResult
-from spotify_player.player import Player
-from spotify_player.player_controls import PlayerControls
-from tools.playback_monitor import PlaybackMonitor
-from tools.widgets import CurrentTrack, TrackProgress, AlbumCover
-from spotify_api.spotify_client import SpotifyClient
-import logging
+from dotenv import load_dotenv
+
+# Settings are read from the environment as modules are imported, so .env
+# has to be loaded before anything else.
+load_dotenv()
+
+from textual.app import App, ComposeResult  # noqa: E402
+from spotify_player.player import Player  # noqa: E402
+from spotify_player.player_controls import PlayerControls  # noqa: E402
+from tools.playback_monitor import PlaybackMonitor  # noqa: E402
+from tools.widgets import CurrentTrack, TrackProgress, AlbumCover, DebugPanel  # noqa: E402
+from spotify_api.async_client import AsyncSpotifyClient  # noqa: E402
+from spotify_api.spotify_client import LazyClient  # noqa: E402
+from spotify_api.metrics import METRICS, METRICS_FILE, METRICS_INTERVAL_S  # noqa: E402
+from tools.tracing import TRACE_FILE, TRACER  # noqa: E402
+import logging  # noqa: E402
 
 logging.getLogger("spotipy").setLevel(logging.WARNING)
 logging.getLogger("urllib3").setLevel(logging.WARNING)
 
-SP = SpotifyClient.get_instance()
+SP = LazyClient(AsyncSpotifyClient.get_instance)
 
 
 class Spotuify(App):
     CSS_PATH = "css/playlist.tcss"
+    BINDINGS = [("f12", "toggle_debug", "Debug Panel")]
 
     def compose(self) -> ComposeResult:
         yield Player()
         yield PlayerControls()
         yield PlaybackMonitor()
+        yield DebugPanel()
+
+    def on_mount(self) -> None:
+        if METRICS_FILE:
+            self.set_interval(METRICS_INTERVAL_S, self._export_metrics)
+
+    def action_toggle_debug(self) -> None:
+        self.query_one(DebugPanel).toggle()
+
+    def _export_metrics(self) -> None:
+        try:
+            METRICS.export(METRICS_FILE)
+        except OSError as e:
+            logging.warning(f"Could not write metrics to {METRICS_FILE}: {e}")
 
     def on_playback_monitor_playback_changed(
         self, message: PlaybackMonitor.PlaybackChanged
@@ -40,18 +64,32 @@ class Spotuify(App):
         self.query_one(
             AlbumCover).on_playback_monitor_playback_stopped(message)
 
+    def on_playback_monitor_playback_confirmed(
+        self, message: PlaybackMonitor.PlaybackConfirmed
+    ) -> None:
+        self.query_one(Player).on_playback_confirmed(message)
+
     def on_playback_monitor_track_ended(
         self, message: PlaybackMonitor.TrackEnded
     ) -> None:
         self.query_one(Player).on_track_ended(message)
 
-    def on_unmount(self) -> None:
+    async def on_unmount(self) -> None:
         try:
-            playback = SP.current_playback()
+            playback = await SP.current_playback()
             if playback and playback.get("is_playing"):
-                SP.pause_playback()
+                await SP.pause_playback()
         except Exception:
             pass
+        await SP.close()
+        from spotify_api.http_pool import pool_stats
+
+        logging.info(f"HTTP pool stats: {pool_stats()}")
+        if METRICS_FILE:
+            self._export_metrics()
+        if TRACE_FILE:
+            events = TRACER.dump(TRACE_FILE)
+            logging.info(f"Wrote {events} trace events to {TRACE_FILE}")
 
 
 if __name__ == "__main__":
@@ -48,11 +48,99 @@ $TestGroups = @(
     },
     @{
         File  = "tests\test_ended_naturally.py"
-        Label = "Natural-end heuristic - distinguishes a track finishing on its own from a manual skip"
+        Label = "Natural-end heuristic and playback state machine - a track finishing on its own vs. a manual skip"
     },
     @{
         File  = "tests\test_device_selection.py"
         Label = "Device selection - preference order (spotifyd, then active, then first available)"
+    },
+    @{
+        File  = "tests\test_playlist_cache.py"
+        Label = "Playlist cache - pages round-trip through SQLite and are keyed by snapshot_id"
+    },
+    @{
+        File  = "tests\test_page_prefetcher.py"
+        Label = "Page prefetch - next page fetched once in the background and reused by paging"
+    },
+    @{
+        File  = "tests\test_art_cache.py"
+        Label = "Album art cache - one fetch per URL, disk-backed LRU, per-size scaling and variant selection"
+    },
+    @{
+        File  = "tests\test_poll_scheduler.py"
+        Label = "Poll scheduler - fast around commands and track ends, slow mid-track, idle back-off"
+    },
+    @{
+        File  = "tests\test_request_scheduler.py"
+        Label = "Request scheduler - token bucket, priority lanes and Retry-After holds"
+    },
+    @{
+        File  = "tests\test_coalescing.py"
+        Label = "Read coalescing - overlapping reads share one request, freshness windows, invalidation on commands"
+    },
+    @{
+        File  = "tests\test_playback_confirm.py"
+        Label = "Playback confirmation - play commands confirmed by the monitor, timeouts, cross-thread wakeup"
+    },
+    @{
+        File  = "tests\test_device_registry.py"
+        Label = "Device registry - cached device list, background refresh, active device from playback polls"
+    },
+    @{
+        File  = "tests\test_shared_cache.py"
+        Label = "Shared cache - Redis tier warms other instances, snapshot-keyed pages, TTLs, degrades when down"
+    },
+    @{
+        File  = "tests\test_track_index.py"
+        Label = "Track index - URI lookup across whole playlists, incremental by snapshot, survives restarts"
+    },
+    @{
+        File  = "tests\test_paging.py"
+        Label = "Pagination - remaining pages fetched concurrently, returned and streamed in order"
+    },
+    @{
+        File  = "tests\test_play_queue.py"
+        Label = "Play queue - O(1) cursor next/previous, queued tracks first, history across jumps"
+    },
+    @{
+        File  = "tests\test_search_index.py"
+        Label = "Search index - substring/prefix/fuzzy matching, ranking tiers, incremental updates, 50k-track speed"
+    },
+    @{
+        File  = "tests\test_fake_spotify.py"
+        Label = "Benchmark harness - fake Spotify Web API pages, 429 injection, play delay and request counting"
+    },
+    @{
+        File  = "tests\test_micro_benchmarks.py"
+        Label = "Micro-benchmarks - every data-path case runs against the real functions and reports throughput and allocations"
+    },
+    @{
+        File  = "tests\test_metrics.py"
+        Label = "API metrics - endpoint grouping, latency histograms, error and 429 counts, Prometheus/JSON export"
+    },
+    @{
+        File  = "tests\test_tracing.py"
+        Label = "Tracing - keypress-to-render spans and Chrome trace export"
+    },
+    @{
+        File  = "tests\test_render_budget.py"
+        Label = "Render budget - progress ticker repaint decisions"
+    },
+    @{
+        File  = "tests\test_playback_clock.py"
+        Label = "Playback clock - derived position, drift and natural-end timing"
+    },
+    @{
+        File  = "tests\test_startup.py"
+        Label = "Startup - lazy client and import-time side effects"
+    },
+    @{
+        File  = "tests\test_async_client.py"
+        Label = "Async client - 204 as None, 429 retry after Retry-After, OAuth token reuse and refresh (needs aiohttp)"
+    },
+    @{
+        File  = "tests\test_http_pool.py"
+        Label = "HTTP pool - per-host request and connection counts, reuse ratio, totals across both clients (needs requests)"
     }
 )
 
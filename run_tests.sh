@@ -33,8 +33,30 @@ fi
 # A test group is: "file::Human-readable description of what it verifies".
 TEST_GROUPS=(
     "tests/test_track.py::Track data model — lookups, ordering, and that missing keys return None instead of raising"
-    "tests/test_ended_naturally.py::Natural-end heuristic — distinguishes a track finishing on its own from a manual skip"
+    "tests/test_ended_naturally.py::Natural-end heuristic and playback state machine — a track finishing on its own vs. a manual skip"
     "tests/test_device_selection.py::Device selection — preference order (spotifyd, then active, then first available)"
+    "tests/test_playlist_cache.py::Playlist cache — pages round-trip through SQLite and are keyed by snapshot_id"
+    "tests/test_page_prefetcher.py::Page prefetch — next page fetched once in the background and reused by paging"
+    "tests/test_art_cache.py::Album art cache — one fetch per URL, disk-backed LRU, per-size scaling and variant selection"
+    "tests/test_poll_scheduler.py::Poll scheduler — fast around commands and track ends, slow mid-track, idle back-off"
+    "tests/test_request_scheduler.py::Request scheduler — token bucket, priority lanes and Retry-After holds"
+    "tests/test_coalescing.py::Read coalescing — overlapping reads share one request, freshness windows, invalidation on commands"
+    "tests/test_playback_confirm.py::Playback confirmation — play commands confirmed by the monitor, timeouts, cross-thread wakeup"
+    "tests/test_device_registry.py::Device registry — cached device list, background refresh, active device from playback polls"
+    "tests/test_shared_cache.py::Shared cache — Redis tier warms other instances, snapshot-keyed pages, TTLs, degrades when down"
+    "tests/test_track_index.py::Track index — URI lookup across whole playlists, incremental by snapshot, survives restarts"
+    "tests/test_paging.py::Pagination — remaining pages fetched concurrently, returned and streamed in order"
+    "tests/test_play_queue.py::Play queue — O(1) cursor next/previous, queued tracks first, history across jumps"
+    "tests/test_search_index.py::Search index — substring/prefix/fuzzy matching, ranking tiers, incremental updates, 50k-track speed"
+    "tests/test_fake_spotify.py::Benchmark harness — fake Spotify Web API pages, 429 injection, play delay and request counting"
+    "tests/test_micro_benchmarks.py::Micro-benchmarks — every data-path case runs against the real functions and reports throughput and allocations"
+    "tests/test_metrics.py::API metrics — endpoint grouping, latency histograms, error and 429 counts, Prometheus/JSON export"
+    "tests/test_tracing.py::Tracing — keypress-to-render spans and Chrome trace export"
+    "tests/test_render_budget.py::Render budget — progress ticker repaint decisions"
+    "tests/test_playback_clock.py::Playback clock — derived position, drift and natural-end timing"
+    "tests/test_startup.py::Startup — lazy client and import-time side effects"
+    "tests/test_async_client.py::Async client — 204 as None, 429 retry after Retry-After, OAuth token reuse and refresh (needs aiohttp)"
+    "tests/test_http_pool.py::HTTP pool — per-host request and connection counts, reuse ratio, totals across both clients (needs requests)"
 )
 
 divider() {
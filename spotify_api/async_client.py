@@ -0,0 +1,191 @@
+# async_client.py
+import asyncio
+import time
+from json import dumps, loads
+from spotify_api.spotify_client import SpotifyClient
+from spotify_api.request_scheduler import SCHEDULER, MAX_429_RETRIES, parse_retry_after
+from spotify_api.metrics import METRICS, endpoint_for
+from tools.tracing import TRACER
+from spotify_api.coalescing import (
+    FRESHNESS_S,
+    PLAYBACK_READS,
+    READER,
+    call_key,
+)
+
+API_BASE = "https://api.spotify.com/v1/"
+
+
+class AsyncSpotifyException(Exception):
+    """A non-2xx response from the Web API (mirrors spotipy's
+    SpotifyException fields the app cares about)."""
+
+    def __init__(self, http_status: int, msg: str, retry_after: float = None):
+        super().__init__(f"http status: {http_status}, {msg}")
+        self.http_status = http_status
+        self.msg = msg
+        self.retry_after = retry_after
+
+
+class AsyncSpotifyClient:
+    """asyncio-native client for the endpoints the UI loop calls directly.
+
+    spotipy is synchronous, so calling it from a Textual handler or timer
+    blocks input and rendering for a full round trip. This client covers only
+    what the poll and command paths need — current_playback and
+    start/pause/seek — with the same return shapes as spotipy (parsed JSON,
+    or None for 204 No Content). Page loads and device lookups run in worker
+    threads through spotipy instead.
+
+    It shares the OAuth token with SpotifyClient: token_provider() returns
+    (access_token, expires_at) and is run in a thread, since refreshing goes
+    through spotipy's blocking auth manager and token cache. The token is
+    reused until a minute before it expires.
+
+    Every request takes a token from the shared RequestScheduler in the
+    caller's priority lane, and 429s are retried after the Retry-After hold,
+    exactly as for the synchronous session.
+
+    current_playback is coalesced through the same reader as the spotipy
+    client, and commands invalidate it: an identical read from either client
+    joins one already in flight from the other, or reuses its fresh result.
+    """
+
+    _instance = None
+
+    def __init__(self, token_provider, base_url: str = API_BASE) -> None:
+        self._token_provider = token_provider
+        self._base_url = base_url
+        self._session = None
+        self._token = None
+        self._token_expires_at = 0.0
+        self._token_lock = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls(_spotipy_token_provider)
+        return cls._instance
+
+    async def current_playback(self, market=None, additional_types=None):
+        kwargs = {}
+        if market is not None:
+            kwargs["market"] = market
+        if additional_types is not None:
+            kwargs["additional_types"] = additional_types
+        return await READER.aget(
+            call_key("current_playback", (), kwargs),
+            lambda: self._request(
+                "GET",
+                "me/player",
+                params={"market": market, "additional_types": additional_types},
+            ),
+            FRESHNESS_S["current_playback"],
+        )
+
+    async def start_playback(
+        self, device_id=None, context_uri=None, uris=None, offset=None,
+        position_ms=None,
+    ):
+        body = {}
+        if context_uri is not None:
+            body["context_uri"] = context_uri
+        if uris is not None:
+            body["uris"] = uris
+        if offset is not None:
+            body["offset"] = offset
+        if position_ms is not None:
+            body["position_ms"] = position_ms
+        return await self._request(
+            "PUT", "me/player/play", params={"device_id": device_id}, json=body
+        )
+
+    async def pause_playback(self, device_id=None):
+        return await self._request(
+            "PUT", "me/player/pause", params={"device_id": device_id}
+        )
+
+    async def seek_track(self, position_ms: int, device_id=None):
+        return await self._request(
+            "PUT",
+            "me/player/seek",
+            params={"position_ms": position_ms, "device_id": device_id},
+        )
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _request(self, method: str, path: str, params=None, json=None):
+        try:
+            return await self._send(method, path, params, json)
+        finally:
+            if method != "GET":
+                # Any command makes the cached playback state stale.
+                READER.invalidate(PLAYBACK_READS)
+
+    async def _send(self, method: str, path: str, params, json):
+        url = path if path.startswith("http") else self._base_url + path
+        headers = {"Authorization": f"Bearer {await self._access_token()}"}
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        sent = len(dumps(json).encode()) if json is not None else 0
+        for attempt in range(MAX_429_RETRIES + 1):
+            with TRACER.span("rate limiter", cat="http"):
+                await SCHEDULER.acquire_async()
+            started = time.perf_counter()
+            try:
+                with TRACER.span(endpoint_for(method, url), cat="http"):
+                    async with self._get_session().request(
+                        method, url, params=params, json=json, headers=headers
+                    ) as resp:
+                        status, resp_headers = resp.status, resp.headers
+                        body = await resp.read()
+            except Exception:
+                METRICS.record(method, url, None, time.perf_counter() - started, 0, sent)
+                raise
+            METRICS.record(
+                method, url, status, time.perf_counter() - started, len(body), sent)
+            if status == 429 and attempt < MAX_429_RETRIES:
+                SCHEDULER.retry_after(
+                    parse_retry_after(resp_headers.get("Retry-After")))
+                continue
+            if status >= 400:
+                retry_after = resp_headers.get("Retry-After")
+                raise AsyncSpotifyException(
+                    status,
+                    body.decode(errors="replace"),
+                    parse_retry_after(retry_after) if retry_after else None,
+                )
+            if status == 204 or not body:
+                return None
+            return loads(body)
+
+    def _get_session(self):
+        # Created lazily so it binds to the running event loop (and aiohttp
+        # is only imported once a request is made).
+        if self._session is None or self._session.closed:
+            from spotify_api.http_pool import new_aiohttp_session
+
+            self._session = new_aiohttp_session()
+        return self._session
+
+    async def _access_token(self) -> str:
+        if self._token and time.time() < self._token_expires_at - 60:
+            return self._token
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+        async with self._token_lock:
+            if not (self._token and time.time() < self._token_expires_at - 60):
+                self._token, self._token_expires_at = await asyncio.to_thread(
+                    self._token_provider
+                )
+        return self._token
+
+
+def _spotipy_token_provider():
+    """The token SpotifyClient's spotipy instance uses, refreshed if needed."""
+    auth = SpotifyClient.get_instance().auth_manager
+    token = auth.get_access_token(as_dict=False)
+    token_info = auth.cache_handler.get_cached_token() or {}
+    return token, token_info.get("expires_at", time.time() + 300)
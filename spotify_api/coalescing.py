@@ -0,0 +1,218 @@
+# coalescing.py
+import asyncio
+import threading
+import time
+
+# How long a result stays fresh, per endpoint. Within the window a repeat
+# read is answered from memory; 0 only shares requests already in flight.
+FRESHNESS_S = {
+    "current_playback": 0.25,
+    "currently_playing": 0.25,
+    "devices": 2.0,
+    "playlist": 0.0,
+    "playlist_items": 0.0,
+    "current_user_playlists": 0.0,
+}
+
+# Commands that change playback state; after any of them the cached playback
+# reads are stale.
+WRITE_METHODS = {
+    "start_playback",
+    "pause_playback",
+    "transfer_playback",
+    "seek_track",
+    "next_track",
+    "previous_track",
+    "add_to_queue",
+    "shuffle",
+    "repeat",
+    "volume",
+}
+PLAYBACK_READS = {"current_playback", "currently_playing", "devices"}
+
+
+class _Call:
+    """One fetch in flight, shared by every caller that asks for the same
+    key meanwhile: threads wait on done, coroutines on a future of their own
+    loop that is woken when it finishes."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        # The leader was interrupted (its task cancelled) before it got a
+        # result: waiters try again rather than share that.
+        self.cancelled = False
+        self.waiters = []  # (loop, future) per waiting coroutine
+
+    def result(self):
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class CoalescingReader:
+    """Shares identical reads that overlap in time.
+
+    get(key, fetch, max_age) returns a result stored less than max_age seconds
+    ago if there is one; otherwise, if another caller is already fetching the
+    same key, it waits for that call and shares its result (or its exception);
+    otherwise it calls fetch() itself. aget() does the same for coroutines on
+    the event loop. Both share one result store and one set of calls in
+    flight, so a poll made by the async client also answers a worker
+    thread's identical read, whether it lands a moment later or while the
+    poll is still waiting on Spotify (and the other way round). get() blocks,
+    so it is for worker threads, never the event loop.
+    """
+
+    def __init__(self, clock=time.monotonic) -> None:
+        self._clock = clock
+        self._results = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, fetch, max_age: float = 0.0):
+        while True:
+            with self._lock:
+                fresh = self._fresh(key, max_age)
+                if fresh is not None:
+                    return fresh[1]
+                call = self._inflight.get(key)
+                if call is None:
+                    call = self._inflight[key] = _Call()
+                    break
+            call.done.wait()
+            if not call.cancelled:
+                return call.result()
+        try:
+            call.value = fetch()
+            self._store(key, call.value)
+            return call.value
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException:
+            call.cancelled = True
+            raise
+        finally:
+            self._finish(key, call)
+
+    async def aget(self, key, fetch, max_age: float = 0.0):
+        """Like get(), but fetch() returns an awaitable."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                fresh = self._fresh(key, max_age)
+                if fresh is not None:
+                    return fresh[1]
+                call = self._inflight.get(key)
+                if call is None:
+                    call = self._inflight[key] = _Call()
+                    break
+                waiter = loop.create_future()
+                call.waiters.append((loop, waiter))
+            await waiter
+            if not call.cancelled:
+                return call.result()
+        try:
+            call.value = await fetch()
+            self._store(key, call.value)
+            return call.value
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException:
+            call.cancelled = True
+            raise
+        finally:
+            self._finish(key, call)
+
+    def invalidate(self, names=None) -> None:
+        """Forget stored results, either all or those for the given endpoint
+        names (the first element of each key)."""
+        with self._lock:
+            if names is None:
+                self._results.clear()
+                return
+            for key in [k for k in self._results if k[0] in names]:
+                del self._results[key]
+
+    def _fresh(self, key, max_age):
+        # Caller holds the lock. Returns (stored_at, value) or None.
+        hit = self._results.get(key)
+        if hit is not None and max_age > 0 and self._clock() - hit[0] < max_age:
+            return hit
+        return None
+
+    def _store(self, key, value) -> None:
+        with self._lock:
+            self._results[key] = (self._clock(), value)
+
+    def _finish(self, key, call) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            waiters, call.waiters = call.waiters, []
+        call.done.set()
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                pass  # that loop has closed; nobody is waiting any more
+
+
+def _wake(waiter) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def call_key(name: str, args, kwargs):
+    return (name, repr(args), repr(sorted(kwargs.items())))
+
+
+READER = CoalescingReader()
+
+
+class CoalescingSpotify:
+    """spotipy.Spotify with coalesced reads, as a drop-in proxy.
+
+    Reads listed in `freshness` go through the shared CoalescingReader, so
+    simultaneous identical calls (the monitor, the sync worker and playback
+    confirmation all asking for current_playback at once) turn into one
+    request. Playback commands drop the cached playback reads so the next
+    read sees their effect. Everything else is passed straight through, so
+    callers are written exactly as against spotipy.
+    """
+
+    def __init__(self, client, reader: CoalescingReader = READER, freshness=None):
+        object.__setattr__(self, "_client", client)
+        object.__setattr__(self, "_reader", reader)
+        object.__setattr__(
+            self, "_freshness", FRESHNESS_S if freshness is None else freshness
+        )
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name in self._freshness:
+            max_age = self._freshness[name]
+
+            def read(*args, **kwargs):
+                return self._reader.get(
+                    call_key(name, args, kwargs),
+                    lambda: attr(*args, **kwargs),
+                    max_age,
+                )
+
+            return read
+        if name in WRITE_METHODS:
+
+            def write(*args, **kwargs):
+                try:
+                    return attr(*args, **kwargs)
+                finally:
+                    self._reader.invalidate(PLAYBACK_READS)
+
+            return write
+        return attr
+
+    def __setattr__(self, name, value) -> None:
+        setattr(self._client, name, value)
@@ -0,0 +1,156 @@
+# device_registry.py
+import os
+import threading
+import time
+
+from spotify_api.request_scheduler import Priority, request_priority
+
+PREFERRED_DEVICE_NAME = os.getenv("SPOTIFYD_DEVICE_NAME", "spotifyd")
+DEVICE_TTL_S = float(os.getenv("SPOTUIPY_DEVICE_TTL", "30"))
+
+
+def choose_device(devices, preferred_name=None):
+    """Pick the device to play on. Return-value contract:
+
+        None  -> no devices available
+        -1    -> the chosen device is already active; play on current device
+        "id"  -> transfer playback to this device id first
+
+    Preference order: the preferred (spotifyd) device by name, then whatever
+    is active, then the first available device.
+    """
+    preferred_name = preferred_name or PREFERRED_DEVICE_NAME
+    if not devices:
+        return None
+    # 1. Prefer our local daemon by name, if present
+    preferred = next(
+        (d for d in devices if d.get("name") == preferred_name), None)
+    if preferred:
+        return -1 if preferred.get("is_active") else preferred["id"]
+    # 2. Otherwise use whatever is currently active
+    active = next((d for d in devices if d.get("is_active")), None)
+    if active:
+        return -1
+    # 3. Fall back to the first available device
+    return devices[0]["id"]
+
+
+class DeviceRegistry:
+    """In-memory copy of the user's device list, so starting a track doesn't
+    have to ask Spotify which devices exist first.
+
+    The list is fetched once and then kept current three ways:
+
+    - PlaybackMonitor passes every poll's `device` (and is_playing) to
+      observe_playback(), which tracks which device is active for free;
+    - after a transfer, mark_active() records the new active device;
+    - once the list is older than `ttl`, the next read still answers from
+      memory but starts a background refresh to pick up devices that came or
+      went (a daemon starting, a phone going to sleep).
+
+    Only the very first read, or one after invalidate(), waits on the network.
+    fetch() returns the `devices` array of GET /me/player/devices; clock is
+    what the list's age is measured on against `ttl`.
+    """
+
+    def __init__(self, fetch=None, ttl: float = DEVICE_TTL_S, clock=time.monotonic):
+        self._fetch = fetch or _spotipy_devices
+        self.ttl = ttl
+        self._clock = clock
+        self._devices = None
+        self._fetched_at = 0.0
+        self._playing = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def devices(self) -> list:
+        with self._lock:
+            devices = self._devices
+            stale = devices is not None and self._clock() - self._fetched_at >= self.ttl
+        if devices is None:
+            return self.refresh()
+        if stale:
+            self.refresh_in_background()
+        return devices
+
+    def choose(self, preferred_name=None):
+        """choose_device() over the cached list."""
+        return choose_device(self.devices(), preferred_name)
+
+    def is_playing(self):
+        """Whether something was playing at the last poll (None if unknown)."""
+        with self._lock:
+            return self._playing
+
+    def refresh(self) -> list:
+        devices = list(self._fetch() or [])
+        with self._lock:
+            self._devices = devices
+            self._fetched_at = self._clock()
+        return devices
+
+    def refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, daemon=True).start()
+
+    def observe_playback(self, playback) -> None:
+        """Fold one current_playback response into the registry. None (204,
+        nothing playing anywhere) means no device is active."""
+        device = (playback or {}).get("device")
+        with self._lock:
+            self._playing = bool(playback and playback.get("is_playing"))
+            if self._devices is None:
+                return
+            if device is None:
+                if playback is None:
+                    self._set_active(None)
+                return
+            if device.get("id") and not any(
+                d.get("id") == device["id"] for d in self._devices
+            ):
+                self._devices = self._devices + [dict(device)]
+            self._set_active(device.get("id"))
+
+    def mark_active(self, device_id) -> None:
+        """A transfer to device_id was just sent."""
+        with self._lock:
+            if self._devices is not None:
+                self._set_active(device_id)
+
+    def invalidate(self) -> None:
+        """Drop the list (e.g. a command failed because a device vanished);
+        the next read fetches it again."""
+        with self._lock:
+            self._devices = None
+
+    def _set_active(self, device_id) -> None:
+        # Caller holds the lock. Copies rather than mutating, so a list
+        # already handed to a reader never changes under it.
+        self._devices = [
+            {**d, "is_active": device_id is not None and d.get("id") == device_id}
+            for d in self._devices
+        ]
+
+    def _background_refresh(self) -> None:
+        try:
+            # Threads don't inherit the request lane; this is background work.
+            with request_priority(Priority.BACKGROUND):
+                self.refresh()
+        except Exception:
+            # keep serving the old list; the next stale read tries again
+            pass
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+def _spotipy_devices():
+    from spotify_api.spotify_client import SpotifyClient
+
+    return SpotifyClient.get_instance().devices()["devices"]
+
+
+DEVICES = DeviceRegistry()
@@ -0,0 +1,187 @@
+# http_pool.py
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from spotify_api.request_scheduler import (
+    MAX_429_RETRIES,
+    SCHEDULED_HOSTS,
+    SCHEDULER,
+    parse_retry_after,
+)
+from spotify_api.metrics import METRICS, endpoint_for
+from tools.tracing import TRACER
+
+# Pool sizing, overridable from the environment for tuning.
+POOL_HOSTS = int(os.getenv("SPOTUIPY_HTTP_POOL_HOSTS", "4"))
+POOL_MAXSIZE = int(os.getenv("SPOTUIPY_HTTP_POOL_MAXSIZE", "10"))
+KEEPALIVE_S = float(os.getenv("SPOTUIPY_HTTP_KEEPALIVE", "60"))
+TIMEOUT_S = float(os.getenv("SPOTUIPY_HTTP_TIMEOUT", "10"))
+
+_session = None
+_session_lock = threading.Lock()
+_async_counts = {"requests": 0, "connections": 0, "reused": 0}
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter with the app's pool sizing that can report pool usage.
+
+    urllib3 keeps one connection pool per host and counts requests and newly
+    opened connections on each, so reuse is just the requests that didn't need
+    a new connection. Pools block: a request that finds all POOL_MAXSIZE
+    connections to its host busy waits for one to come back, instead of
+    urllib3 opening an extra connection and throwing it away afterwards.
+
+    Web API requests wait for a token from the shared RequestScheduler (in the
+    calling thread's priority lane) before going out. A 429 holds the
+    scheduler for the Retry-After period and the request is retried once the
+    hold lifts, up to MAX_429_RETRIES times; after that the 429 is returned
+    and spotipy raises as usual.
+    """
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(
+            pool_connections=POOL_HOSTS, pool_maxsize=POOL_MAXSIZE,
+            pool_block=True, **kwargs
+        )
+
+    def send(self, request, **kwargs):
+        if urlsplit(request.url).hostname not in SCHEDULED_HOSTS:
+            return self._measured_send(request, **kwargs)
+        for attempt in range(MAX_429_RETRIES + 1):
+            with TRACER.span("rate limiter", cat="http"):
+                SCHEDULER.acquire()
+            resp = self._measured_send(request, **kwargs)
+            if resp.status_code != 429 or attempt == MAX_429_RETRIES:
+                return resp
+            SCHEDULER.retry_after(
+                parse_retry_after(resp.headers.get("Retry-After")))
+            resp.close()
+        return resp
+
+    def _measured_send(self, request, **kwargs):
+        """One attempt, recorded in METRICS. Unless the caller streams, the
+        body is read here (Session.send would read it straight after), so
+        the latency covers the whole response and its size is known."""
+        sent = len(request.body or b"")
+        started = time.perf_counter()
+        try:
+            with TRACER.span(endpoint_for(request.method, request.url), cat="http"):
+                resp = super().send(request, **kwargs)
+                received = 0 if kwargs.get("stream") else len(resp.content)
+        except Exception:
+            METRICS.record(request.method, request.url, None,
+                           time.perf_counter() - started, 0, sent)
+            raise
+        METRICS.record(request.method, request.url, resp.status_code,
+                       time.perf_counter() - started, received, sent)
+        return resp
+
+    def stats(self) -> dict:
+        hosts = {}
+        pools = self.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            idle = sum(1 for conn in list(pool.pool.queue) if conn is not None)
+            hosts[pool.host] = {
+                "requests": pool.num_requests,
+                "connections": pool.num_connections,
+                "idle": idle,
+            }
+        return hosts
+
+
+def get_session() -> requests.Session:
+    """The shared keep-alive session every synchronous request goes through:
+    spotipy's API calls, its token refreshes, and album art downloads."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers["Accept-Encoding"] = "gzip, deflate"
+            # Same retry policy spotipy mounts on the session it builds itself,
+            # minus 429s: those go through the request scheduler instead of
+            # urllib3 sleeping on Retry-After behind the scheduler's back.
+            adapter = PooledAdapter(
+                max_retries=Retry(
+                    total=3,
+                    connect=None,
+                    read=False,
+                    allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+                    status=3,
+                    backoff_factor=0.3,
+                    status_forcelist=(500, 502, 503, 504),
+                )
+            )
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def new_aiohttp_session() -> "aiohttp.ClientSession":
+    """An aiohttp session with the same pool limits, counting connection
+    reuse into pool_stats(). Must be called with an event loop running."""
+    # Imported on first use: aiohttp is slow to import and the synchronous
+    # path never needs it.
+    import aiohttp
+
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(_count("requests"))
+    trace.on_connection_create_end.append(_count("connections"))
+    trace.on_connection_reuseconn.append(_count("reused"))
+    connector = aiohttp.TCPConnector(
+        limit=POOL_HOSTS * POOL_MAXSIZE,
+        limit_per_host=POOL_MAXSIZE,
+        keepalive_timeout=KEEPALIVE_S,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=TIMEOUT_S),
+        headers={"Accept-Encoding": "gzip, deflate"},
+        trace_configs=[trace],
+    )
+
+
+def _count(name):
+    async def on_event(session, context, params) -> None:
+        _async_counts[name] += 1
+
+    return on_event
+
+
+def reuse_ratio(requests_made: int, connections_opened: int) -> float:
+    """Share of requests that went out on an already-open connection."""
+    if requests_made <= 0:
+        return 0.0
+    return max(0.0, 1 - connections_opened / requests_made)
+
+
+def pool_stats() -> dict:
+    """Per-host pool usage for the requests session plus totals for aiohttp."""
+    hosts = {}
+    if _session is not None:
+        adapter = _session.get_adapter("https://")
+        if isinstance(adapter, PooledAdapter):
+            hosts = adapter.stats()
+    sync_requests = sum(h["requests"] for h in hosts.values())
+    sync_connections = sum(h["connections"] for h in hosts.values())
+    return {
+        "requests": {
+            "hosts": hosts,
+            "requests": sync_requests,
+            "connections": sync_connections,
+            "open": sum(h["idle"] for h in hosts.values()),
+            "reuse_ratio": reuse_ratio(sync_requests, sync_connections),
+        },
+        "aiohttp": dict(
+            _async_counts,
+            reuse_ratio=reuse_ratio(
+                _async_counts["requests"], _async_counts["connections"]
+            ),
+        ),
+    }
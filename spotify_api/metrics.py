@@ -0,0 +1,252 @@
+import bisect
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+# Write a metrics snapshot here every METRICS_INTERVAL_S and on exit:
+# Prometheus text format for a .prom file (for node_exporter's textfile
+# collector), JSON otherwise.
+METRICS_FILE = os.getenv("SPOTUIPY_METRICS_FILE", "")
+METRICS_INTERVAL_S = float(os.getenv("SPOTUIPY_METRICS_INTERVAL", "15"))
+
+# Latency buckets in seconds, Prometheus-style upper bounds.
+BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Path segments that are followed by an id in Web API URLs.
+_ID_COLLECTIONS = {
+    "playlists", "tracks", "albums", "artists", "users", "shows",
+    "episodes", "audiobooks", "chapters", "categories",
+}
+
+
+def endpoint_for(method: str, url: str) -> str:
+    """Group a request URL by endpoint: ids become {id} and the query string
+    is dropped, so every playlist's tracks count as one endpoint
+    ("GET /v1/playlists/{id}/tracks"). Requests to anything other than the
+    Web API (album art, token refreshes) are grouped by host."""
+    parts = urlsplit(url)
+    segments = [s for s in parts.path.split("/") if s]
+    if not segments or segments[0] != "v1":
+        return f"{method} {parts.hostname}"
+    for i in range(2, len(segments)):
+        if segments[i - 1] in _ID_COLLECTIONS:
+            segments[i] = "{id}"
+    return f"{method} /" + "/".join(segments)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram: constant memory however many samples,
+    and exportable as a Prometheus histogram as is. Quantiles are estimated
+    by interpolating inside the bucket they fall in."""
+
+    __slots__ = ("counts", "total", "count", "min", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_S) + 1)  # last bucket is +Inf
+        self.total = 0.0
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_S, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def quantile(self, q: float):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = BUCKETS_S[i - 1] if i > 0 else 0.0
+                high = BUCKETS_S[i] if i < len(BUCKETS_S) else self.max
+                estimate = low + (high - low) * (rank - seen) / n
+                return min(max(estimate, self.min), self.max)
+            seen += n
+        return self.max
+
+    def cumulative(self) -> list:
+        """(upper bound, samples at or below it) pairs, ending with +Inf."""
+        running, result = 0, []
+        for bound, n in zip((*BUCKETS_S, float("inf")), self.counts):
+            running += n
+            result.append((bound, running))
+        return result
+
+
+class _Endpoint:
+    __slots__ = ("latency", "statuses", "errors", "rate_limited", "bytes_in", "bytes_out")
+
+    def __init__(self) -> None:
+        self.latency = Histogram()
+        self.statuses = {}
+        self.errors = 0
+        self.rate_limited = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+
+class ApiMetrics:
+    """Call counts, latency histograms, errors, 429s and bytes transferred
+    for every HTTP request the app makes, grouped by endpoint (see
+    endpoint_for).
+
+    Requests are recorded where they leave the process, in the shared
+    requests adapter and in AsyncSpotifyClient, so spotipy calls, token
+    refreshes, album art downloads and the asyncio poll path all land here
+    without any call site knowing. Each attempt counts: a request retried
+    after a 429 is two calls, which is what the rate limit sees.
+
+    Bytes are request and response bodies as the app sees them (after
+    decompression), not counting headers.
+
+    status is None for a request that never got a response (connection
+    error, timeout); it counts as an error. 429s are counted apart from
+    other errors. Rates are per minute since the metrics were created (or
+    last reset), i.e. over the session.
+
+    Recording takes a lock and a few additions; it is safe from any thread.
+    """
+
+    def __init__(self, clock=time.monotonic, wall_clock=time.time) -> None:
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints = {}
+            self._started = self._clock()
+
+    def record(
+        self, method: str, url: str, status, seconds: float,
+        bytes_in: int = 0, bytes_out: int = 0,
+    ) -> None:
+        endpoint = endpoint_for(method, url)
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = _Endpoint()
+            stats.latency.observe(seconds)
+            key = str(status) if status is not None else "error"
+            stats.statuses[key] = stats.statuses.get(key, 0) + 1
+            if status == 429:
+                stats.rate_limited += 1
+            elif status is None or status >= 400:
+                stats.errors += 1
+            stats.bytes_in += bytes_in
+            stats.bytes_out += bytes_out
+
+    def snapshot(self) -> dict:
+        """Everything as plain data: per-endpoint counts, rates, latency
+        quantiles (ms) and bucket counts, plus session totals."""
+        with self._lock:
+            elapsed_min = max(self._clock() - self._started, 1e-9) / 60
+            endpoints = {}
+            for name, s in sorted(self._endpoints.items()):
+                h = s.latency
+                endpoints[name] = {
+                    "calls": h.count,
+                    "calls_per_min": round(h.count / elapsed_min, 2),
+                    "statuses": dict(sorted(s.statuses.items())),
+                    "errors": s.errors,
+                    "rate_limited": s.rate_limited,
+                    "bytes_in": s.bytes_in,
+                    "bytes_out": s.bytes_out,
+                    "latency_ms": {
+                        "p50": _ms(h.quantile(0.5)),
+                        "p95": _ms(h.quantile(0.95)),
+                        "p99": _ms(h.quantile(0.99)),
+                        "min": _ms(h.min),
+                        "max": _ms(h.max),
+                        "mean": _ms(h.total / h.count if h.count else None),
+                    },
+                    "latency_sum_s": h.total,
+                    "latency_buckets": [
+                        ["+Inf" if bound == float("inf") else bound, n]
+                        for bound, n in h.cumulative()
+                    ],
+                }
+            calls = sum(e["calls"] for e in endpoints.values())
+            return {
+                "timestamp": self._wall_clock(),
+                "session_s": round(elapsed_min * 60, 3),
+                "calls": calls,
+                "calls_per_min": round(calls / elapsed_min, 2),
+                "errors": sum(e["errors"] for e in endpoints.values()),
+                "rate_limited": sum(e["rate_limited"] for e in endpoints.values()),
+                "endpoints": endpoints,
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """The snapshot in Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        family("spotuipy_api_requests_total", "counter",
+               "HTTP requests by endpoint and response status.")
+        for endpoint, e in snap["endpoints"].items():
+            for status, n in e["statuses"].items():
+                lines.append(
+                    f'spotuipy_api_requests_total{{{_labels(endpoint)},status="{status}"}} {n}')
+        for name, key, help_text in (
+            ("spotuipy_api_errors_total", "errors",
+             "Failed requests (4xx/5xx other than 429, or no response)."),
+            ("spotuipy_api_rate_limited_total", "rate_limited",
+             "Requests answered 429 Too Many Requests."),
+            ("spotuipy_api_response_bytes_total", "bytes_in",
+             "Response bytes received."),
+            ("spotuipy_api_request_bytes_total", "bytes_out",
+             "Request body bytes sent."),
+        ):
+            family(name, "counter", help_text)
+            for endpoint, e in snap["endpoints"].items():
+                lines.append(f"{name}{{{_labels(endpoint)}}} {e[key]}")
+
+        name = "spotuipy_api_request_duration_seconds"
+        family(name, "histogram", "Request latency, per attempt.")
+        for endpoint, e in snap["endpoints"].items():
+            labels = _labels(endpoint)
+            for bound, n in e["latency_buckets"]:
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {n}')
+            lines.append(f"{name}_sum{{{labels}}} {e['latency_sum_s']!r}")
+            lines.append(f"{name}_count{{{labels}}} {e['calls']}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path) -> None:
+        """Write the snapshot to path, as Prometheus text if it ends in .prom
+        and JSON otherwise. Written to a temporary file and renamed into
+        place, so a collector never reads half a file."""
+        path = Path(path)
+        text = self.to_prometheus() if path.suffix == ".prom" else self.to_json()
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(text)
+        os.replace(tmp, path)
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def _labels(endpoint: str) -> str:
+    method, _, path = endpoint.partition(" ")
+    path = path.replace("\\", "\\\\").replace('"', '\\"')
+    return f'method="{method}",endpoint="{path}"'
+
+
+METRICS = ApiMetrics()
@@ -0,0 +1,164 @@
+# request_scheduler.py
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+
+
+class Priority(IntEnum):
+    """Request lanes, most urgent first."""
+
+    USER = 0  # play, pause, seek, skip: the user is waiting on the result
+    INTERACTIVE = 1  # reads behind something on screen (playlist load, page flip)
+    BACKGROUND = 2  # playback polls and confirmation checks
+    PREFETCH = 3  # speculative work: next-page prefetch, index building
+
+
+_priority = ContextVar("request_priority", default=Priority.INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: Priority):
+    """Run the requests made inside this block in the given lane.
+
+    Context variables don't follow work onto new threads, so worker threads
+    set their lane themselves inside the worker function.
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+class RequestScheduler:
+    """Token bucket shared by every Spotify Web API request, with priority lanes.
+
+    Requests spend one token each; tokens refill at `rate` per second up to
+    `burst`. Lower lanes must leave RESERVE tokens in the bucket, and nobody
+    takes a token while a more urgent lane is waiting, so under load user
+    commands go first and background polls and prefetches slow down instead
+    of keypresses being delayed or dropped.
+
+    A 429 from Spotify calls retry_after(), which empties the bucket and holds
+    every lane until the Retry-After period has passed.
+
+    acquire() blocks a worker thread; acquire_async() is its event-loop
+    counterpart. Both are built on try_acquire(), which never waits.
+    """
+
+    RESERVE = {
+        Priority.USER: 0,
+        Priority.INTERACTIVE: 1,
+        Priority.BACKGROUND: 2,
+        Priority.PREFETCH: 4,
+    }
+    # Longest single sleep while waiting, so a waiter notices a more urgent
+    # lane arriving or a Retry-After hold ending.
+    MAX_SLEEP_S = 0.25
+
+    def __init__(self, rate: float = 5.0, burst: int = 10, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._waiting = {p: 0 for p in Priority}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, priority: Priority = None) -> float:
+        """Take a token if this lane may go now and return 0; otherwise return
+        how many seconds to wait before trying again."""
+        priority = current_priority() if priority is None else priority
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if any(self._waiting[p] for p in Priority if p < priority):
+                return self.MAX_SLEEP_S
+            needed = 1 + self.RESERVE[priority]
+            if self._tokens >= needed:
+                self._tokens -= 1
+                return 0.0
+            return (needed - self._tokens) / self.rate
+
+    def acquire(self, priority: Priority = None) -> None:
+        priority = current_priority() if priority is None else priority
+        self._enter(priority)
+        try:
+            while (wait := self.try_acquire(priority)) > 0:
+                time.sleep(min(wait, self.MAX_SLEEP_S))
+        finally:
+            self._leave(priority)
+
+    async def acquire_async(self, priority: Priority = None) -> None:
+        priority = current_priority() if priority is None else priority
+        self._enter(priority)
+        try:
+            while (wait := self.try_acquire(priority)) > 0:
+                await asyncio.sleep(min(wait, self.MAX_SLEEP_S))
+        finally:
+            self._leave(priority)
+
+    def retry_after(self, seconds: float) -> None:
+        """Spotify answered 429: hold every lane for `seconds`."""
+        with self._lock:
+            now = self._clock()
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = now
+
+    def waiting(self) -> dict:
+        with self._lock:
+            return {p.name: n for p, n in self._waiting.items()}
+
+    def _refill(self, now: float) -> None:
+        # Caller holds the lock. Nothing accrues during a Retry-After hold,
+        # so the bucket starts empty when the hold lifts.
+        elapsed = max(0.0, now - max(self._updated, self._blocked_until))
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def _enter(self, priority) -> None:
+        with self._lock:
+            self._waiting[priority] += 1
+
+    def _leave(self, priority) -> None:
+        with self._lock:
+            self._waiting[priority] -= 1
+
+
+# Requests to these hosts spend scheduler tokens; album art (served from
+# Spotify's CDN) is not rate limited and bypasses the scheduler.
+SCHEDULED_HOSTS = {"api.spotify.com"}
+# A request answered 429 is retried this many times, each after the
+# Retry-After hold, before the 429 is passed on.
+MAX_429_RETRIES = 3
+# Longest Retry-After hold honoured. Spotify can ask for minutes or more; the
+# hold stalls every lane, and the worker waiting on it, for that long.
+MAX_RETRY_AFTER_S = float(os.getenv("SPOTUIPY_MAX_RETRY_AFTER", "10"))
+
+
+def parse_retry_after(value, default: float = 1.0) -> float:
+    """Seconds from a Retry-After header (Spotify sends whole seconds),
+    capped at MAX_RETRY_AFTER_S."""
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        return default
+    return min(max(0.0, seconds), MAX_RETRY_AFTER_S)
+
+
+SCHEDULER = RequestScheduler(
+    rate=float(os.getenv("SPOTUIPY_API_RATE", "5")),
+    burst=int(os.getenv("SPOTUIPY_API_BURST", "10")),
+)
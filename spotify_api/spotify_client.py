@@ -1,23 +1,72 @@
 # spotify_client.py
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
 import os
-from dotenv import load_dotenv
+import threading
+from spotify_api.coalescing import CoalescingSpotify
+
+SCOPE = (
+    "playlist-read-private playlist-read-collaborative user-read-playback-state "
+    "user-modify-playback-state user-read-currently-playing"
+)
 
 
 class SpotifyClient:
     _instance = None
-    load_dotenv()
+    _lock = threading.Lock()
 
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
-            cls._instance = spotipy.Spotify(
-                auth_manager=SpotifyOAuth(
-                    client_id=os.getenv("SPOTIFY_CLIENT_ID"),
-                    client_secret=os.getenv("SPOTIFY_CLIENT_SECRET"),
-                    redirect_uri=os.getenv("SPOTIFY_REDIRECT_URI"),
-                    scope="playlist-read-private playlist-read-collaborative user-read-playback-state user-modify-playback-state user-read-currently-playing",
-                )
-            )
+            # The first use can come from several worker threads at once
+            # (playlists, devices, the poll's token); build only one.
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls.build()
         return cls._instance
+
+    @staticmethod
+    def build():
+        """The spotipy client, with OAuth settings from the environment.
+
+        spotipy and requests are imported here rather than at module level:
+        they are slow to import, and nothing needs them before the first
+        request, so the app's first frame doesn't wait for them.
+        """
+        import spotipy
+        from spotipy.oauth2 import SpotifyOAuth
+        from spotify_api.http_pool import get_session
+
+        # Both the API calls and token refreshes go through the shared
+        # keep-alive pool instead of spotipy's own session. Identical
+        # reads that overlap are coalesced into one request.
+        return CoalescingSpotify(spotipy.Spotify(
+            requests_session=get_session(),
+            auth_manager=SpotifyOAuth(
+                client_id=os.getenv("SPOTIFY_CLIENT_ID"),
+                client_secret=os.getenv("SPOTIFY_CLIENT_SECRET"),
+                redirect_uri=os.getenv("SPOTIFY_REDIRECT_URI"),
+                scope=SCOPE,
+                requests_session=get_session(),
+            ),
+        ))
+
+
+class LazyClient:
+    """Module-level stand-in for a client singleton: the client is fetched
+    from get_instance on each attribute access, so it is built on first use
+    rather than when the module is imported.
+
+    Importing a module that talks to Spotify then costs nothing and needs no
+    credentials; and whatever instance get_instance returns at call time is
+    the one used (the benchmarks install their own).
+    """
+
+    __slots__ = ("_get_instance",)
+
+    def __init__(self, get_instance) -> None:
+        object.__setattr__(self, "_get_instance", get_instance)
+
+    def __getattr__(self, name):
+        return getattr(self._get_instance(), name)
+
+    def __setattr__(self, name, value) -> None:
+        setattr(self._get_instance(), name, value)
@@ -1,118 +1,81 @@
-import time
-import os
-from tools.formatting import format_duration, format_artist_track
-from tools.track import Track, PlaylistTracks
-from spotify_api.spotify_client import SpotifyClient
+import logging
+from spotify_api.spotify_client import LazyClient, SpotifyClient
+from spotify_api.device_registry import DEVICES
+from tools.playback_confirm import CONFIRMATIONS
 
-sp = SpotifyClient.get_instance()
-
-PREFFERED_DEVICE_NAME = os.getenv("SPOTIFYD_DEVICE_NAME", "spotifyd")
-
-
-def load_tracks(tracks, playlist, playlist_tracks) -> list:
-    """Populate playlist_tracks[playlist] with Track objects and return the
-    formatted and unformatted display rows for the table."""
-    list_items = []
-    unformatted_list_items = []
-    playlist_tracks[playlist] = PlaylistTracks()
-
-    for row_index, item in enumerate(tracks["items"]):
-        track = item["track"]
-        artist_name = track["artists"][0]["name"]
-        track_name = track["name"]
-        album_name = track["album"]["name"]
-        duration_ms = track["duration_ms"]
-        duration = format_duration(duration_ms)
-        uri = track["uri"]
-
-        playlist_tracks[playlist].append(Track(
-            uri=uri,
-            name=track_name,
-            artist=artist_name,
-            album=album_name,
-            duration_ms=duration_ms,
-            row_index=row_index,
-        ))
-
-        artist_name_formatted, track_name_formatted, album_name_formatted = (
-            format_artist_track(artist_name, track_name, album_name, 20)
-        )
-
-        list_items.append(
-            (
-                track_name_formatted,
-                artist_name_formatted,
-                album_name_formatted,
-                duration,
-            )
-        )
-        unformatted_list_items.append(
-            (track_name, artist_name, album_name, duration))
-
-    return list_items, unformatted_list_items
+sp = LazyClient(SpotifyClient.get_instance)
 
 
 def find_active_device(preferred_name=None):
-    preferred_name = preferred_name or PREFFERED_DEVICE_NAME
-    devices = sp.devices()["devices"]
-    if not devices:
-        return None
-    # 1. Prefer our local daemon by name, if present
-    preferred = next(
-        (d for d in devices if d.get("name") == preferred_name), None)
-    if preferred:
-        return -1 if preferred.get("is_active") else preferred["id"]
-    # 2. Otherwise use whatever is currently active
-    active = next((d for d in devices if d.get("is_active")), None)
-    if active:
-        return -1
-    # 3. Fall back to the first available device
-    return devices[0]["id"]
+    # Answered from the device registry; no request unless the list has
+    # never been fetched (see DeviceRegistry).
+    return DEVICES.choose(preferred_name)
 
 
 def start_playback_on_active_device(track_uri: str, playlist_uri: str) -> int:
+    """Send the commands to play track_uri and return without waiting.
+
+    Returns 1 once the commands are sent, or -1 if there is no device. It
+    no longer returns 0 for a start that wasn't confirmed: confirmation comes
+    later, from PlaybackMonitor, which posts PlaybackConfirmed when it sees
+    the track playing. A start still unconfirmed at the timeout is logged
+    and drops the cached device list. On an already-active device this is a
+    single start_playback request.
+
+    The device comes from the registry's cached list, which may name a
+    device that has since gone away. If the commands fail, the list is
+    fetched again and they are retried once, on whatever device that
+    chooses, before the error is raised.
+    """
     device_id = find_active_device()
-    if device_id:
-        if device_id != -1:
-            # Pause whatever is currently playing first, so the old device
-            # can't keep playing alongside the new one (the dual-playback bug).
-            try:
-                current = sp.current_playback()
-                if current and current.get("is_playing"):
-                    sp.pause_playback()
-            except Exception:
-                pass
-            # Move the active device to our target, then start the chosen track.
-            sp.transfer_playback(device_id, force_play=True)
-            sp.start_playback(device_id=device_id, uris=[track_uri])
-        else:
-            sp.start_playback(uris=[track_uri])
-        if wait_for_playback_to_start(track_uri):
-            return 1
-        else:
-            return 0
-    else:
+    if not device_id:
         return -1
-
-
-def wait_for_playback_to_start(expected_track_uri: str, timeout=30) -> bool:
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        current_playback = sp.current_playback()
-        if (
-            current_playback
-            and current_playback.get("item")
-            and current_playback["item"]["uri"] == expected_track_uri
-        ):
-            return True
-        time.sleep(1)
-    return False
-
-
-def load_user_playlists(playlists):
-    playlist_names = []
-    playlist_ids = {}
-    for playlist in playlists["items"]:
-        playlist_names.append(playlist["name"])
-        playlist_ids[playlist["name"]] = playlist["id"]
-    return playlist_names, playlist_ids
+    try:
+        _play_on(device_id, track_uri)
+    except Exception:
+        # Most likely the cached device has gone away.
+        DEVICES.invalidate()
+        device_id = find_active_device()
+        if not device_id:
+            return -1
+        try:
+            _play_on(device_id, track_uri)
+        except Exception:
+            DEVICES.invalidate()
+            raise
+    # Registering the expectation puts the monitor into its fast confirm
+    # burst until the device reports this track (or the timeout passes).
+    CONFIRMATIONS.expect(track_uri).add_done_callback(
+        lambda confirmed: _check_started(track_uri, confirmed.result()))
+    return 1
+
+
+def _check_started(track_uri: str, confirmed: bool) -> None:
+    if not confirmed:
+        # The device took the commands but never played the track; don't
+        # trust the cached list for the next one.
+        logging.warning(f"Playback of {track_uri} was not confirmed")
+        DEVICES.invalidate()
+
+
+def _play_on(device_id, track_uri: str) -> None:
+    """Start track_uri on device_id, or on the active device if it is -1."""
+    if device_id == -1:
+        sp.start_playback(uris=[track_uri])
+        return
+    # Pause whatever is currently playing first, so the old device can't
+    # keep playing alongside the new one (the dual-playback bug). The
+    # monitor's last poll says whether anything is.
+    try:
+        playing = DEVICES.is_playing()
+        if playing is None:
+            current = sp.current_playback()
+            playing = bool(current and current.get("is_playing"))
+        if playing:
+            sp.pause_playback()
+    except Exception:
+        pass
+    # Move the active device to our target, then start the chosen track.
+    sp.transfer_playback(device_id, force_play=True)
+    DEVICES.mark_active(device_id)
+    sp.start_playback(device_id=device_id, uris=[track_uri])
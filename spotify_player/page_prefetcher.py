@@ -0,0 +1,83 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from contextlib import nullcontext
+
+
+class PagePrefetcher:
+    """Fetches the next page of a playlist before the user asks for it.
+
+    As soon as a page is shown the player hands it to prefetch(), which starts
+    fetching the page after it on a background thread. When ctrl+d (or
+    auto-advance across a page boundary) needs that page, take() returns the
+    already-fetched result, so paging is an in-memory swap instead of a round
+    trip. If the prefetch is still in flight take() waits briefly for it; if
+    nothing was prefetched, it failed, it hasn't started, or it is still
+    waiting after TAKE_WAIT_S, take() fetches the page directly, in the
+    caller's request lane.
+
+    fetch_next(playlist_name, page) does the actual work and returns the next
+    page or None; keeping it injectable keeps this class free of Spotify and
+    Textual imports. Background fetches run inside the background() context
+    (the player uses it to put them in the lowest request-priority lane).
+    That lane yields to every other one, so once the user is waiting on a
+    page, take() doesn't leave it queued there behind an index build.
+    """
+
+    # How long take() waits on an in-flight prefetch before fetching itself.
+    TAKE_WAIT_S = 0.25
+
+    def __init__(self, fetch_next, max_workers: int = 2, background=nullcontext) -> None:
+        self._fetch_next = fetch_next
+        self._background = background
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="page-prefetch"
+        )
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(playlist_name: str, page):
+        # A page's "next" URL identifies the page it leads to.
+        return (playlist_name, page.get("next"))
+
+    def prefetch(self, playlist_name: str, page) -> None:
+        """Start fetching the page after `page` in the background."""
+        if not page or not page.get("next"):
+            return
+        key = self._key(playlist_name, page)
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending[key] = self._executor.submit(
+                self._fetch_in_background, playlist_name, page
+            )
+
+    def _fetch_in_background(self, playlist_name: str, page):
+        with self._background():
+            return self._fetch_next(playlist_name, page)
+
+    def take(self, playlist_name: str, page):
+        """The page after `page`: prefetched if possible, fetched otherwise."""
+        if not page or not page.get("next"):
+            return None
+        with self._lock:
+            future = self._pending.pop(self._key(playlist_name, page), None)
+        # A prefetch that hasn't started is cancelled outright.
+        if future is not None and not future.cancel():
+            try:
+                return future.result(timeout=self.TAKE_WAIT_S)
+            except TimeoutError:
+                logging.info("Prefetch still in flight, fetching directly")
+            except Exception as e:
+                logging.warning(f"Prefetch failed, fetching directly: {e}")
+        return self._fetch_next(playlist_name, page)
+
+    def discard(self, keep_playlist: str = None) -> None:
+        """Drop prefetched pages for every playlist except keep_playlist."""
+        with self._lock:
+            for key in [k for k in self._pending if k[0] != keep_playlist]:
+                self._pending.pop(key).cancel()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,57 +1,39 @@
 import logging
+import os
 from textual import on
 from textual.app import ComposeResult
-from textual.widgets import Static, ListView, DataTable
-from textual.containers import Horizontal
-from spotify_api.spotify_utils import (
-    load_tracks,
-    load_user_playlists,
-    start_playback_on_active_device,
-)
-from collections import deque
-from tools.widgets import PlaylistLabel, TrackProgress
+from textual.widgets import Static, ListView, DataTable, Input
+from textual.containers import Horizontal, Vertical
+from spotify_api.spotify_utils import start_playback_on_active_device
+from tools.widgets import PlaylistLabel, SearchResult, TrackProgress
 from tools.track import Track
+from tools.track_loading import load_tracks, load_user_playlists
+from tools.playlist_cache import PlaylistCache
+from tools.shared_cache import SHARED_CACHE
+from tools.track_index import TrackIndex
+from tools.play_queue import PlayQueue
+from tools.search_index import SearchIndex
+from tools.paging import fetch_remaining_pages, iter_remaining_pages, merge_pages
 from spotify_player.seek_controller import SeekController
+from spotify_player.page_prefetcher import PagePrefetcher
 from tools.playback_monitor import PlaybackMonitor
-from spotify_api.spotify_client import SpotifyClient
+from tools.playback_clock import PLAYBACK_CLOCK
+from spotify_api.spotify_client import LazyClient, SpotifyClient
+from spotify_api.async_client import AsyncSpotifyClient
+from spotify_api.request_scheduler import Priority, request_priority
+from spotify_api.device_registry import DEVICES
+from tools.tracing import TRACER, current_action, trace_action
 
-SP = SpotifyClient.get_instance()
+SP = LazyClient(SpotifyClient.get_instance)
+ASYNC_SP = LazyClient(AsyncSpotifyClient.get_instance)
 
-
-class PlaylistTrackQueue:
-    def __init__(self):
-        self.queues = {}
-
-    def add_tracks(self, playlist: str, track_uris):
-        if playlist not in self.queues:
-            self.queues[playlist] = deque()
-        self.queues[playlist].extend(track_uris)
-
-    def next_track(self, playlist: str):
-        if playlist in self.queues and len(self.queues[playlist]) > 0:
-            return self.queues[playlist].popleft()
-        return None
-
-    def current_track(self, playlist: str):
-        if playlist in self.queues and len(self.queues[playlist]) > 0:
-            return self.queues[playlist][0]
-        return None
-
-    def queue_length(self, playlist: str):
-        if playlist in self.queues:
-            return len(self.queues[playlist])
-        return 0
-
-    def clear_queue(self, playlist: str):
-        if playlist in self.queues:
-            self.queues[playlist].clear()
-
-    def remove_queue_at_track_uri(self, playlist: str, curr_track_uri: str):
-        while (
-            len(self.queues[playlist]) > 0
-            and self.queues[playlist][0] != curr_track_uri
-        ):
-            self.queues[playlist].popleft()
+# "paged" shows one 100-track page at a time; "full" loads every page of the
+# selected playlist into a single table (toggle at runtime with "f").
+TABLE_MODE = os.getenv("SPOTUIPY_TABLE_MODE", "paged")
+# Largest page GET /me/playlists allows.
+PLAYLIST_PAGE_SIZE = 50
+# Table rows added per frame when a whole playlist lands in full mode.
+ROW_CHUNK = 500
 
 
 class Player(Static):
@@ -59,14 +41,19 @@ class Player(Static):
         ("ctrl+d", "scroll_down", "Scroll Down"),
         ("ctrl+u", "scroll_up", "Scroll Up"),
         ("n", "next_track", "Next Track"),
+        ("a", "enqueue_track", "Add to Queue"),
         ("p", "previous_track", "Previous Track"),
         ("right_square_bracket", "seek_forward", "Seek +10s"),
         ("left_square_bracket", "seek_backward", "Seek -10s"),
+        ("f", "toggle_full_playlist", "Toggle Full Playlist"),
+        ("slash", "open_search", "Search"),
+        ("escape", "close_search", "Close Search"),
     ]
+    SEARCH_RESULTS = 20
 
     def __init__(self):
         super().__init__()
-        self.track_queue = PlaylistTrackQueue()
+        self.play_queue = PlayQueue()
         self.curr_displayed_tracks = {}
         self.prev_displayed_tracks = {}
         self.curr_track = None
@@ -82,81 +69,283 @@ class Player(Static):
         self.track_progress = None
         self.playlist_list = None
         self.track_table = None
-        self.playlists = None
         self.playlist_names = None
         self.playlist_ids = None
+        self.playlist_snapshots = {}
+        self.playlist_cache = PlaylistCache(shared=SHARED_CACHE)
+        self.track_index = TrackIndex(self.playlist_cache, self._fetch_whole_playlist)
+        self.search_index = SearchIndex()
+        self.search_pane = None
+        self.search_input = None
+        self.search_results = None
+        self._search_hits = []
+        self._searchable_snapshots = {}
+        self.page_prefetcher = PagePrefetcher(
+            self._fetch_next_page,
+            background=lambda: request_priority(Priority.PREFETCH),
+        )
         self.tracks = None
+        self.full_playlist = TABLE_MODE == "full"
         self.seek_controller = None
         self._playback_timer = None
         self._pending_playback = None
+        self._pending_cursor_row = None
+        self._advance_when_merged = None
 
     def compose(self) -> ComposeResult:
+        with Vertical(id="search-pane"):
+            yield Input(placeholder="Search tracks, artists, albums", id="search")
+            yield ListView(id="search-results")
         with Horizontal():
             yield ListView(id="playlist-tabs")
             yield DataTable(id="playlist-table")
 
     def on_mount(self) -> None:
-        self.playlist_list = self.query_one(ListView)
+        self.playlist_list = self.query_one("#playlist-tabs", ListView)
+        self.search_pane = self.query_one("#search-pane", Vertical)
+        self.search_input = self.query_one("#search", Input)
+        self.search_results = self.query_one("#search-results", ListView)
         self.track_table = self.query_one(DataTable)
         self.track_table.add_columns("Track", "Artist", "Album", "Length")
         self.track_table.cursor_type = "row"
         self.playlist_list.border_title = "Playlists"
         self.track_table.border_title = "Tracks"
-        self.playlists = SP.current_user_playlists()
-        self.playlist_names, self.playlist_ids = load_user_playlists(
-            self.playlists)
+        self.playlist_names, self.playlist_ids = [], {}
         self.track_progress = self.app.query_one(TrackProgress)
         self.seek_controller = SeekController(self, self.track_progress)
-        added_playlist_names = set()
-
-        for playlist in self.playlist_names:
-            if playlist not in added_playlist_names:
-                self.playlist_list.append(PlaylistLabel(playlist))
-                added_playlist_names.add(playlist)
-            else:
-                added_playlist_names = []
+        # Warm the device list now so the first play doesn't wait on it.
+        DEVICES.refresh_in_background()
+
+        # The playlist list is paged (50 per page); fetch it off the UI thread
+        # and stream rows into the sidebar as pages arrive.
+        self.run_worker(self._load_playlists, thread=True, group="playlists")
+
+    def _load_playlists(self) -> None:
+        """Fetch every page of the user's playlists: the first one, then all
+        the rest concurrently, appending each to the sidebar in order as soon
+        as it lands. Runs on a worker thread."""
+        first_page = SP.current_user_playlists(limit=PLAYLIST_PAGE_SIZE)
+        self.app.call_from_thread(self._add_playlists, first_page)
+        for page in iter_remaining_pages(
+            first_page,
+            lambda offset, limit: SP.current_user_playlists(
+                limit=limit, offset=offset),
+        ):
+            self.app.call_from_thread(self._add_playlists, page)
+        self.app.call_from_thread(self._on_playlists_loaded)
+
+    def _add_playlists(self, page) -> None:
+        """Append one page of playlists to the sidebar (UI thread)."""
+        names, ids, snapshots = load_user_playlists(page)
+        listed = set(self.playlist_names)
+        for name in names:
+            if name in listed:
+                # Same name twice: the sidebar shows it once.
+                continue
+            listed.add(name)
+            self.playlist_names.append(name)
+            self.playlist_list.append(PlaylistLabel(name))
+        self.playlist_ids.update(ids)
+        self.playlist_snapshots.update(snapshots)
 
+    def _on_playlists_loaded(self) -> None:
         # Sync to any already-playing track AFTER the UI has mounted, as a
         # background worker, so the initial render isn't blocked by the chain
         # of Spotify API calls (and the page-seeking loop) this performs.
         self.run_worker(self.check_if_track_playing,
                         thread=True, exclusive=True)
+        # Index every playlist in the background so a later context-less
+        # sync is a lookup; only playlists whose snapshot changed are fetched.
+        self.run_worker(self.build_track_index, thread=True,
+                        group="track-index", exclusive=True)
+
+    def on_unmount(self) -> None:
+        self.page_prefetcher.shutdown()
 
     def load_playlist_content(self, playlist_name) -> None:
+        """Show a playlist: the table is cleared now, and its first page (in
+        full-playlist mode, then the rest) is fetched on a worker thread."""
         if playlist_name:
-            self.track_table.visible = True
-            self.track_table.clear()
-
-            track_list, unformatted_track_list = self.fetch_playlist_tracks(
-                playlist_name
+            self._open_playlist(playlist_name)
+            self.run_worker(
+                lambda: self._load_playlist(playlist_name),
+                thread=True,
+                group="playlist-load",
+                exclusive=True,
             )
 
-            for i, (track_list_item, unformatted_track_list_item) in enumerate(
-                zip(track_list, unformatted_track_list)
-            ):
-                unique_key = f"{unformatted_track_list_item[0]}_{i}"
-                try:
-                    self.track_table.add_row(*track_list_item, key=unique_key)
-                except Exception as e:
-                    logging.warning(
-                        f"Error adding row for track {track_list_item[0]}: {e}"
-                    )
-                self.curr_displayed_playlist = playlist_name
-
-    def fetch_playlist_tracks(self, playlist_name: str):
+    def _open_playlist(self, playlist_name) -> None:
+        """Make playlist_name the displayed playlist, with an empty table
+        until its first page arrives (UI thread)."""
+        self.track_table.visible = True
+        self.track_table.clear()
+        self._pending_cursor_row = None
+        self.page_prefetcher.discard(keep_playlist=playlist_name)
         self.curr_displayed_playlist = playlist_name
-        results = SP.playlist(
-            self.playlist_ids[playlist_name], fields="tracks, next, items"
-        )
-        self.tracks = results["tracks"]
 
+    def _load_playlist(self, playlist_name) -> None:
+        """Fetch the first page of the displayed playlist and show it; in
+        full-playlist mode, then fetch and append the rest. Runs on a worker
+        thread."""
+        first_page = self._fetch_first_page(playlist_name)
+        shown = self.app.call_from_thread(
+            self._show_first_page, playlist_name, first_page)
+        if shown and self.full_playlist:
+            self._load_full_playlist(playlist_name)
+
+    def _add_rows(
+        self, track_list, unformatted_track_list, start: int = 0, stop: int = None
+    ) -> None:
+        """Add table rows for tracks[start:stop], keyed like Track.unique_name."""
+        stop = len(track_list) if stop is None else min(stop, len(track_list))
+        for i in range(start, stop):
+            track_list_item = track_list[i]
+            unique_key = f"{unformatted_track_list[i][0]}_{i}"
+            try:
+                self.track_table.add_row(*track_list_item, key=unique_key)
+            except Exception as e:
+                logging.warning(
+                    f"Error adding row for track {track_list_item[0]}: {e}"
+                )
+
+    def _load_full_playlist(self, playlist_name: str) -> None:
+        """Fetch every page after the first concurrently, merge them and
+        build the tracks and table rows, then hand the result to the UI
+        thread to append. Runs on a worker thread."""
+        first_page = self.curr_displayed_tracks.get(playlist_name)
+        if not first_page or not first_page.get("next"):
+            return
+        pages = fetch_remaining_pages(
+            first_page,
+            lambda offset, limit: self._fetch_page_at(
+                playlist_name, offset, limit),
+        )
+        merged = merge_pages(first_page, pages)
+        loaded = {}
         track_list, unformatted_track_list = load_tracks(
-            self.tracks,
-            self.curr_displayed_playlist,
-            self.playlist_tracks,
+            merged, playlist_name, loaded, self.search_index,
+            self.playlist_ids[playlist_name],
         )
-        self.curr_displayed_tracks[playlist_name] = self.tracks
-        return track_list, unformatted_track_list
+        self.app.call_from_thread(
+            self._append_pages, playlist_name, first_page, merged,
+            loaded[playlist_name], track_list, unformatted_track_list)
+
+    def _append_pages(
+        self, playlist_name: str, first_page, merged, tracks, track_list,
+        unformatted_track_list,
+    ) -> None:
+        """Swap in the whole playlist, built by _load_full_playlist, and add
+        its new rows to the table, ROW_CHUNK per frame; rows already on
+        screen are left untouched (UI thread)."""
+        if (
+            self.curr_displayed_playlist != playlist_name
+            or self.curr_displayed_tracks.get(playlist_name) is not first_page
+        ):
+            # The user moved on while we were fetching.
+            return
+        self.playlist_tracks[playlist_name] = tracks
+        self.curr_displayed_tracks[playlist_name] = merged
+        # Same rows in front, so the queue keeps its place, even on a track
+        # queued by hand.
+        self.play_queue.replace_tracks(playlist_name, tracks)
+        self._add_row_chunks(
+            playlist_name, merged, track_list, unformatted_track_list,
+            len(first_page["items"]))
+        pending, self._advance_when_merged = self._advance_when_merged, None
+        if pending is not None and pending[0] == playlist_name:
+            # Playback ran off the first page before the rest arrived.
+            with trace_action(pending[1]):
+                self.play_next_track()
+
+    def _add_row_chunks(
+        self, playlist_name, merged, track_list, unformatted_track_list, start,
+    ) -> None:
+        """Add ROW_CHUNK rows from start, then the next chunk after the
+        screen refreshes, so a long playlist doesn't stall input (UI
+        thread)."""
+        if self.curr_displayed_tracks.get(playlist_name) is not merged:
+            return
+        stop = start + ROW_CHUNK
+        self._add_rows(track_list, unformatted_track_list, start, stop)
+        row = self._pending_cursor_row
+        if row is not None and row < self.track_table.row_count:
+            self._pending_cursor_row = None
+            self.track_table.move_cursor(row=row)
+        if stop < len(track_list):
+            self.call_after_refresh(
+                self._add_row_chunks, playlist_name, merged, track_list,
+                unformatted_track_list, stop)
+
+    def _move_table_cursor(self, row: int) -> None:
+        """Move the table cursor to row, or once it has been added (UI
+        thread)."""
+        if row < self.track_table.row_count:
+            self._pending_cursor_row = None
+            self.track_table.move_cursor(row=row)
+        else:
+            self._pending_cursor_row = row
+
+    def _show_first_page(self, playlist_name: str, first_page) -> bool:
+        """Fill the table with a playlist's first page (UI thread). False if
+        the user has moved to another playlist since it was requested."""
+        if self.curr_displayed_playlist != playlist_name:
+            return False
+        self.tracks = first_page
+        track_list, unformatted_track_list = load_tracks(
+            first_page, playlist_name, self.playlist_tracks, self.search_index,
+            self.playlist_ids[playlist_name],
+        )
+        self.curr_displayed_tracks[playlist_name] = first_page
+        if not self.full_playlist:
+            self.page_prefetcher.prefetch(playlist_name, first_page)
+        self.track_table.clear()
+        self._add_rows(track_list, unformatted_track_list)
+        return True
+
+    def _fetch_first_page(self, playlist_name: str):
+        """First page of a playlist, served from the on-disk cache when the
+        snapshot_id from the playlist list still matches what we stored."""
+        playlist_id = self.playlist_ids[playlist_name]
+        page = self.playlist_cache.get_page(
+            playlist_id, self.playlist_snapshots.get(playlist_id)
+        )
+        if page is not None:
+            return page
+        results = SP.playlist(
+            playlist_id, fields="snapshot_id, tracks, next, items")
+        snapshot_id = results.get("snapshot_id")
+        if snapshot_id:
+            self.playlist_snapshots[playlist_id] = snapshot_id
+        self.playlist_cache.put_page(
+            playlist_id, snapshot_id, results["tracks"])
+        return results["tracks"]
+
+    def _fetch_next_page(self, playlist_name: str, tracks):
+        """The page after `tracks`, from the cache if we have it under the
+        current snapshot, otherwise via SP.next (and then cached)."""
+        if not tracks or not tracks.get("next"):
+            return None
+        playlist_id = self.playlist_ids[playlist_name]
+        snapshot_id = self.playlist_snapshots.get(playlist_id)
+        offset = (tracks.get("offset") or 0) + (
+            tracks.get("limit") or len(tracks["items"])
+        )
+        page = self.playlist_cache.get_page(playlist_id, snapshot_id, offset)
+        if page is None:
+            page = SP.next(tracks)
+            if page:
+                self.playlist_cache.put_page(playlist_id, snapshot_id, page)
+        return page
+
+    def _fetch_page_at(self, playlist_name: str, offset: int, limit: int):
+        """The page at a given offset, from the cache or SP.playlist_items."""
+        playlist_id = self.playlist_ids[playlist_name]
+        snapshot_id = self.playlist_snapshots.get(playlist_id)
+        page = self.playlist_cache.get_page(playlist_id, snapshot_id, offset)
+        if page is None:
+            page = SP.playlist_items(playlist_id, offset=offset, limit=limit)
+            self.playlist_cache.put_page(playlist_id, snapshot_id, page)
+        return page
 
     def fetch_next_playlist_tracks(self, playlist_name: str, tracks):
         self.curr_displayed_playlist = playlist_name
@@ -165,9 +354,12 @@ class Player(Static):
             tracks,
             self.curr_displayed_playlist,
             self.playlist_tracks,
+            self.search_index,
+            self.playlist_ids[playlist_name],
         )
 
         self.curr_displayed_tracks[playlist_name] = tracks
+        self.page_prefetcher.prefetch(playlist_name, tracks)
         return track_list, unformatted_track_list
 
     def on_track_ended(self, message) -> None:
@@ -179,112 +371,151 @@ class Player(Static):
         """
         if self.curr_playing_playlist is None:
             return
-        self.play_next_track()
+        with trace_action(TRACER.start_action("auto_advance")):
+            self.play_next_track()
 
     def play_next_track(self) -> None:
         playlist = self.curr_playing_playlist
-        pt = self.playlist_tracks.get(playlist)
-        next_track_uri = self.track_queue.next_track(playlist)
-        if next_track_uri is None:
-            # Queue empty: try to load the next page of the playlist
-            while self.action_scroll_down():
-                pt = self.playlist_tracks.get(playlist)
-                next_tracks = self.curr_displayed_tracks[playlist]
-                next_track_uri = next_tracks["items"][0]["track"]["uri"]
-
-                track = pt.by_uri(next_track_uri) if pt else None
-                if track is None:
-                    return
-                self.curr_track = track
-                self.curr_row_index = track.row_index
-                self.track_table.move_cursor(row=self.curr_row_index)
-
-                self.create_queue()
-                self.curr_playing_playist_uri = str(
-                    "spotify:playlist:" + self.playlist_ids[playlist]
-                )
-                self._start_playback_async(
-                    next_track_uri, self.curr_playing_playist_uri
-                )
-                return
-            # No more pages: nothing left to play
+        track = self.play_queue.next()
+        if track is None and self.full_playlist:
+            page = self.curr_displayed_tracks.get(playlist)
+            if page is not None and page.get("next"):
+                # The rest of the playlist is still loading: continue once
+                # _append_pages has it.
+                self._advance_when_merged = (playlist, current_action())
             return
-
-        # Normal case: we have a next track in the queue — play it.
-        track = pt.by_uri(next_track_uri) if pt else None
         if track is None:
+            # End of the loaded page: load the next one (off the UI thread)
+            # and continue there.
+            action = current_action()
+            self._page_down(
+                lambda shown: self._continue_on_next_page(playlist, shown, action))
             return
-        self.curr_playing_playist_uri = str(
-            "spotify:playlist:" + self.playlist_ids[playlist]
-        )
+        self._play_queued_track(track)
 
-        # Update cursor/state immediately, then play off the UI thread.
-        self.curr_track = track
-        self.curr_row_index = track.row_index
-        self.track_table.move_cursor(row=self.curr_row_index)
-        self._start_playback_async(
-            next_track_uri, self.curr_playing_playist_uri)
+    def _continue_on_next_page(self, playlist, shown: bool, action) -> None:
+        """Play the first track of the page just turned to (UI thread)."""
+        if not shown:
+            # No more pages: nothing left to play
+            return
+        pt = self.playlist_tracks.get(playlist)
+        track = self.play_queue.play_from(playlist, pt, 0) if pt else None
+        if track is not None:
+            with trace_action(action):
+                self._play_queued_track(track)
 
     def action_next_track(self) -> None:
         """Skip to the next track (keybinding)."""
         if self.curr_playing_playlist is None:
             return
-        self.play_next_track()
+        with trace_action(TRACER.start_action("next_track", key="n")):
+            self.play_next_track()
 
     def action_previous_track(self) -> None:
-        """Skip to the previous track in the current playlist (keybinding)."""
+        """Go back to the previously played track, or the one before the
+        current track in the playlist (keybinding)."""
         if self.curr_playing_playlist is None:
             return
-        playlist = self.curr_playing_playlist
-        pt = self.playlist_tracks.get(playlist)
-        if pt is None or not isinstance(self.curr_track, Track):
-            return
-
-        curr_index = pt.index_of_uri(self.curr_track.uri)
-        if curr_index is None or curr_index <= 0:
+        track = self.play_queue.previous()
+        if track is None:
             # Unknown position, or already at the first track.
             return
-
-        prev_track = pt.by_index(curr_index - 1)
-        if prev_track is None:
+        with trace_action(TRACER.start_action("previous_track", key="p")):
+            self._play_queued_track(track)
+
+    def action_enqueue_track(self) -> None:
+        """Queue the highlighted track to play after the current one and
+        anything already queued (keybinding)."""
+        pt = self.playlist_tracks.get(self.curr_displayed_playlist)
+        if pt is None or self.track_table.row_count == 0:
             return
-
+        row_key, _ = self.track_table.coordinate_to_cell_key(
+            self.track_table.cursor_coordinate)
+        track = pt.by_unique_name(row_key.value)
+        if track is None:
+            return
+        self.play_queue.enqueue(track)
+        self.app.notify(f"Queued {track.name}")
+
+    def _play_queued_track(self, track) -> None:
+        """Make track current and play it. The queue may have moved to another
+        playlist (history) or to a queued track from elsewhere, so the table
+        cursor only follows when the track is on the page shown."""
+        playlist = self.play_queue.playlist
+        self.curr_playing_playlist = playlist
         self.curr_playing_playist_uri = str(
             "spotify:playlist:" + self.playlist_ids[playlist]
         )
 
         # Update local state and cursor immediately so the UI responds instantly,
         # then send the (blocking) playback command off the UI thread.
-        self.curr_track = prev_track
-        self.curr_row_index = prev_track.row_index
-        self.track_table.move_cursor(row=self.curr_row_index)
-        self.create_queue()
-        self._start_playback_async(
-            prev_track.uri, self.curr_playing_playist_uri)
+        self.curr_track = track
+        pt = self.playlist_tracks.get(playlist)
+        shown = pt.by_index(track.row_index) if pt else None
+        if (
+            playlist == self.curr_displayed_playlist
+            and shown is not None
+            and shown.uri == track.uri
+        ):
+            self.curr_row_index = track.row_index
+            self.track_table.move_cursor(row=self.curr_row_index)
+        self._start_playback_async(track.uri, self.curr_playing_playist_uri)
 
     def _start_playback_async(self, track_uri: str, playlist_uri: str) -> None:
         """Debounced playback: rapid n/p presses each move the cursor, but the
         actual Spotify command only fires ~250ms after presses settle, to the
         final track — mirroring the seek scrubber's debounce."""
-        self._pending_playback = (track_uri, playlist_uri)
+        self._supersede_pending()
+        self._pending_playback = (
+            track_uri, playlist_uri, current_action(), TRACER.now())
         if self._playback_timer is not None:
             self._playback_timer.stop()
         self._playback_timer = self.set_timer(0.25, self._commit_playback)
 
+    def _supersede_pending(self) -> None:
+        # A newer press replaces a pending one; its trace ends here.
+        if self._pending_playback is not None:
+            TRACER.end_action(self._pending_playback[2], superseded=True)
+
     def _commit_playback(self) -> None:
         self._playback_timer = None
         pending = self._pending_playback
         if pending is None:
             return
         self._pending_playback = None
-        track_uri, playlist_uri = pending
+        track_uri, playlist_uri, action, pressed_at = pending
+        TRACER.complete("debounce", pressed_at, action=action)
+        # The poll that sees this track and the title update find the
+        # action again by URI.
+        TRACER.follow(track_uri, action)
+        self.app.query_one(PlaybackMonitor).notify_command()
+        queued_at = TRACER.now()
         self.run_worker(
-            lambda: start_playback_on_active_device(track_uri, playlist_uri),
+            lambda: self._play_in_worker(track_uri, playlist_uri, action, queued_at),
             thread=True,
             exclusive=True,
         )
 
+    def _play_in_worker(
+        self, track_uri: str, playlist_uri: str, action=None, queued_at=0.0,
+    ) -> None:
+        # Worker threads don't inherit the request lane or the trace action;
+        # playback commands go ahead of polls and prefetches.
+        TRACER.complete("worker queue", queued_at, action=action)
+        with request_priority(Priority.USER), trace_action(action):
+            try:
+                with TRACER.span("start_playback_on_active_device"):
+                    start_playback_on_active_device(track_uri, playlist_uri)
+            except Exception as e:
+                # Log rather than raise: an error in a worker exits the app.
+                logging.warning(f"Could not start playback: {e}")
+                TRACER.end_action(action, error=str(e))
+
     def check_if_track_playing(self) -> None:
+        with request_priority(Priority.BACKGROUND):
+            self._check_if_track_playing()
+
+    def _check_if_track_playing(self) -> None:
         # NOTE: runs on a worker thread (see on_mount). The blocking SP.* reads
         # are fine here, but anything that touches widgets must be marshalled
         # back onto the UI thread via self.app.call_from_thread.
@@ -311,50 +542,121 @@ class Player(Static):
         if not playlist_name:
             return
         self.curr_playing_playlist = playlist_name
+        track = self._show_track(playlist_name, track_uri)
+        if track is not None:
+            self.curr_track = track
+            self.curr_row_index = track.row_index
+            self.create_queue()
 
-        self.app.call_from_thread(self.load_playlist_content, playlist_name)
+    def _show_track(self, playlist_name, track_uri, position=None):
+        """Display playlist_name, page to track_uri, and move both cursors to
+        it. Returns the Track, or None if it isn't in the playlist. A known
+        position (a search hit's) opens the page holding it directly
+        instead of paging there from the first. Runs on a worker thread."""
+        # Loaded here, in this worker (in full-playlist mode, every page), so
+        # the lookup below sees the playlist's tracks.
+        self.app.call_from_thread(self._open_playlist, playlist_name)
+        if position is None or self.full_playlist:
+            self._load_playlist(playlist_name)
+        else:
+            self._load_page_holding(playlist_name, position)
 
         if playlist_name in self.playlist_names:
             playlist_index = self.playlist_names.index(playlist_name)
             self.app.call_from_thread(
                 self._set_playlist_cursor, playlist_index)
 
-        track = self._find_loaded_track(track_uri)
-        while track is None and self.app.call_from_thread(self.action_scroll_down):
-            track = self._find_loaded_track(track_uri)
+        track = self._find_loaded_track(playlist_name, track_uri)
+        while track is None and not self.full_playlist and self._turn_page(
+            playlist_name, self.curr_displayed_tracks.get(playlist_name)
+        ):
+            track = self._find_loaded_track(playlist_name, track_uri)
 
         if track is not None:
-            self.curr_track = track
-            self.curr_row_index = track.row_index
-            self.app.call_from_thread(
-                self.track_table.move_cursor, row=self.curr_row_index)
+            # In full-playlist mode the row may still be on its way in.
+            self.app.call_from_thread(self._move_table_cursor, track.row_index)
             self.app.call_from_thread(self.track_table.focus)
-            self.create_queue()
+        return track
+
+    def _load_page_holding(self, playlist_name, position: int) -> None:
+        """Show the page of playlist_name that holds position (paged mode).
+        The first page gives the page size; past it, one page is fetched by
+        offset rather than the pages before it. Runs on a worker thread."""
+        first_page = self._fetch_first_page(playlist_name)
+        limit = first_page.get("limit") or len(first_page["items"])
+        offset = position // limit * limit if limit else 0
+        if offset == 0 or offset >= (first_page.get("total") or 0):
+            self.app.call_from_thread(
+                self._show_first_page, playlist_name, first_page)
+            return
+        page = self._fetch_page_at(playlist_name, offset, limit)
+        self.app.call_from_thread(self._show_page, playlist_name, page)
+
+    def _show_page(self, playlist_name, page) -> None:
+        """Show a page reached by offset rather than by turning pages (UI
+        thread); scrolling up from it fetches the page before by offset."""
+        if self.curr_displayed_playlist != playlist_name:
+            return
+        self.prev_displayed_tracks[playlist_name] = []
+        self.format_next_track_list(page)
+
+    def _playlist_name(self, playlist_id):
+        """The name playlist_id is listed under, or None if that name stands
+        for another playlist of the same name."""
+        for name, pid in self.playlist_ids.items():
+            if pid == playlist_id:
+                return name
+        return None
 
     def _sync_without_context(self, track_uri) -> None:
-        """No playlist context from Spotify: search the user's playlists for the
-        playing track and sync to the first one that contains it."""
-        for playlist_name in self.playlist_names or []:
-            playlist_id = self.playlist_ids[playlist_name]
-            try:
-                results = SP.playlist(
-                    playlist_id, fields="tracks.items.track.uri")
-            except Exception:
-                continue
-            uris = [
-                item["track"]["uri"]
-                for item in results.get("tracks", {}).get("items", [])
-                if item.get("track")
-            ]
-            if track_uri in uris:
+        """No playlist context from Spotify: look the playing track up in the
+        track index and sync to the first playlist that contains it."""
+        hits = self.track_index.locate(track_uri)
+        # Not indexed yet: bring the index up to date (a no-op unless a
+        # playlist changed) and look again. At startup the background build
+        # is usually still running; this is a worker thread, so wait for it
+        # rather than give up on the highlight.
+        if not hits:
+            self.track_index.update(self.playlist_snapshots)
+            hits = self.track_index.locate(track_uri)
+        for playlist_id, _ in hits:
+            playlist_name = self._playlist_name(playlist_id)
+            if playlist_name is not None:
                 self._sync_to_playlist(playlist_name, track_uri)
                 return
-        # Not found in any playlist's first page — leave UI as-is rather than
-        # showing a stale highlight.
+        # Not in any playlist — leave UI as-is rather than showing a stale
+        # highlight.
+
+    def _fetch_whole_playlist(self, playlist_id: str) -> None:
+        """Fetch (and so cache) every page of a playlist, for the track index.
+        Runs on the index's worker threads."""
+        names_by_id = {pid: name for name, pid in self.playlist_ids.items()}
+        name = names_by_id[playlist_id]
+        first_page = self._fetch_first_page(name)
+        fetch_remaining_pages(
+            first_page,
+            lambda offset, limit: self._fetch_page_at(name, offset, limit),
+        )
 
-    def _find_loaded_track(self, uri):
-        """Look up a track by URI in the currently loaded page, or None."""
-        pt = self.playlist_tracks.get(self.curr_playing_playlist)
+    def build_track_index(self) -> None:
+        # Speculative work: yields to anything the user is waiting on.
+        with request_priority(Priority.PREFETCH):
+            self.track_index.update(self.playlist_snapshots)
+        # Everything the index fetched is now in the cache: make it
+        # searchable too, re-indexing only playlists whose snapshot changed.
+        for name, playlist_id in list(self.playlist_ids.items()):
+            snapshot_id = self.playlist_snapshots.get(playlist_id)
+            if (
+                playlist_id in self.track_index
+                and self._searchable_snapshots.get(playlist_id) != snapshot_id
+            ):
+                self.search_index.replace_playlist(
+                    playlist_id, name, self.playlist_cache.track_rows(playlist_id))
+                self._searchable_snapshots[playlist_id] = snapshot_id
+
+    def _find_loaded_track(self, playlist_name, uri):
+        """Look up a track by URI in the playlist's loaded page, or None."""
+        pt = self.playlist_tracks.get(playlist_name)
         return pt.by_uri(uri) if pt else None
 
     def _set_playlist_cursor(self, index: int) -> None:
@@ -365,53 +667,73 @@ class Player(Static):
             pass
 
     def create_queue(self) -> None:
-        # Use the monitor's cached state instead of a blocking API read.
-        monitor = self.app.query_one(PlaybackMonitor)
-        if not monitor.is_playing:
-            return
+        """Point the play queue's cursor at the current track. O(1): the
+        loaded PlaylistTracks is the queue, nothing is copied.
 
-        if not isinstance(self.curr_track, Track):
+        A hand-queued track leaves the cursor alone, even one from this same
+        playlist: the playlist resumes at the row it was on before."""
+        if not isinstance(self.curr_track, Track) or self.play_queue.from_queue:
             return
         playlist = self.curr_playing_playlist
         pt = self.playlist_tracks.get(playlist)
         if pt is None:
             return
-        curr_track_uri = self.curr_track.uri
-        if curr_track_uri in self.track_queue.queues.get(playlist, []):
-            self.track_queue.remove_queue_at_track_uri(
-                playlist, curr_track_uri)
-        else:
-            keys_list = pt.uris()
-            try:
-                curr_index = keys_list.index(curr_track_uri)
-                next_tracks = keys_list[curr_index + 1:]
-                self.track_queue.clear_queue(playlist)
-                self.track_queue.add_tracks(playlist, next_tracks)
-            except ValueError:
-                self.track_queue.clear_queue(playlist)
-
-    def action_scroll_down(self) -> bool:
-        if (
-            self.curr_displayed_playlist is not None
-            and self.curr_displayed_tracks.get(self.curr_displayed_playlist) is not None
-        ):
-            curr_tracks = self.curr_displayed_tracks[self.curr_displayed_playlist]
-            next_tracks = SP.next(curr_tracks)
+        position = pt.index_of_uri(self.curr_track.uri)
+        if position is None:
+            return
+        self.play_queue.set_source(playlist, pt, position)
 
-            if next_tracks:
-                if self.curr_displayed_playlist not in self.prev_displayed_tracks:
-                    self.prev_displayed_tracks[self.curr_displayed_playlist] = [
-                    ]
+    def action_scroll_down(self) -> None:
+        if self.full_playlist:
+            # Everything is already in the table; just page the view.
+            self.track_table.action_page_down()
+            return
+        self._page_down()
+
+    def _page_down(self, then=None) -> None:
+        """Turn the displayed playlist to its next page on a worker thread,
+        then call then(shown) back on the UI thread."""
+        playlist_name = self.curr_displayed_playlist
+        curr_tracks = self.curr_displayed_tracks.get(playlist_name)
+        if playlist_name is None or curr_tracks is None:
+            if then is not None:
+                then(False)
+            return
 
-                self.prev_displayed_tracks[self.curr_displayed_playlist].append(
-                    curr_tracks
-                )
-                self.format_next_track_list(next_tracks)
-                return True
-            else:
-                return False
+        def turn() -> None:
+            shown = self._turn_page(playlist_name, curr_tracks)
+            if then is not None:
+                self.app.call_from_thread(then, shown)
+
+        self.run_worker(turn, thread=True, group="page-turn")
+
+    def _turn_page(self, playlist_name, curr_tracks) -> bool:
+        """Fetch the page after curr_tracks and show it; False if there is
+        none or the table has moved on. Runs on a worker thread."""
+        # Normally already fetched in the background when this page was
+        # shown, so this is an in-memory swap rather than a round trip.
+        next_tracks = self.page_prefetcher.take(playlist_name, curr_tracks)
+        if not next_tracks:
+            return False
+        return self.app.call_from_thread(
+            self._show_next_page, playlist_name, curr_tracks, next_tracks)
+
+    def _show_next_page(self, playlist_name, curr_tracks, next_tracks) -> bool:
+        """Swap the table to next_tracks, if curr_tracks is still the page
+        shown (UI thread)."""
+        if (
+            self.curr_displayed_playlist != playlist_name
+            or self.curr_displayed_tracks.get(playlist_name) is not curr_tracks
+        ):
+            return False
+        self.prev_displayed_tracks.setdefault(playlist_name, []).append(curr_tracks)
+        self.format_next_track_list(next_tracks)
+        return True
 
     def action_scroll_up(self) -> None:
+        if self.full_playlist:
+            self.track_table.action_page_up()
+            return
         if (
             self.curr_displayed_playlist is not None
             and self.curr_displayed_tracks.get(self.curr_displayed_playlist) is not None
@@ -419,33 +741,87 @@ class Player(Static):
             if self.curr_displayed_playlist not in self.prev_displayed_tracks:
                 return
             if len(self.prev_displayed_tracks[self.curr_displayed_playlist]) > 0:
+                # The stack's top is page N-1; popping from the front used to
+                # jump straight back to the first page.
                 self.prev_tracks = self.prev_displayed_tracks[
                     self.curr_displayed_playlist
-                ].pop(0)
+                ].pop()
                 if self.prev_tracks:
                     self.format_next_track_list(self.prev_tracks)
+            else:
+                # Opened at a search hit's page: the pages before it were
+                # never shown, so fetch the previous one by offset.
+                self._page_up_by_offset()
+
+    def _page_up_by_offset(self) -> None:
+        playlist_name = self.curr_displayed_playlist
+        curr_tracks = self.curr_displayed_tracks[playlist_name]
+        limit = curr_tracks.get("limit") or len(curr_tracks["items"])
+        offset = (curr_tracks.get("offset") or 0) - limit
+        if not limit or offset < 0:
+            return
+
+        def fetch() -> None:
+            page = self._fetch_page_at(playlist_name, offset, limit)
+            self.app.call_from_thread(
+                self._show_page_before, playlist_name, curr_tracks, page)
+
+        self.run_worker(fetch, thread=True, group="page-turn")
+
+    def _show_page_before(self, playlist_name, curr_tracks, page) -> None:
+        """Swap the table back to page, if curr_tracks is still the page
+        shown (UI thread)."""
+        if (
+            self.curr_displayed_playlist == playlist_name
+            and self.curr_displayed_tracks.get(playlist_name) is curr_tracks
+        ):
+            self.format_next_track_list(page)
 
     def format_next_track_list(self, tracks) -> None:
         track_list, unformatted_track_list = self.fetch_next_playlist_tracks(
             self.curr_displayed_playlist, tracks
         )
         self.track_table.clear()
-        for i, (track_list_item, unformatted_track_list_item) in enumerate(
-            zip(track_list, unformatted_track_list)
-        ):
-            unique_key = f"{unformatted_track_list_item[0]}_{i}"
-            self.track_table.add_row(*track_list_item, key=unique_key)
+        self._add_rows(track_list, unformatted_track_list)
+
+    def action_toggle_full_playlist(self) -> None:
+        """Switch between paged and full-playlist tables and reload."""
+        self.full_playlist = not self.full_playlist
+        playlist_name = self.curr_displayed_playlist
+        if playlist_name is None:
+            return
+        self.prev_displayed_tracks.pop(playlist_name, None)
+        self.load_playlist_content(playlist_name)
 
     def key_space(self) -> None:
         # Read the monitor's last-known state instead of a blocking API call,
-        # so play/pause is instant. The pause/start commands still go to Spotify.
+        # update the bar locally, and send the command from a worker, so the
+        # handler returns at once and later keys and timers aren't queued
+        # behind the round trip.
         monitor = self.app.query_one(PlaybackMonitor)
-        if monitor.is_playing:
-            SP.pause_playback()
+        pause = monitor.is_playing
+        if pause:
+            PLAYBACK_CLOCK.pause()
             self.track_progress.pause_progress_bar()
         else:
-            SP.start_playback()
+            PLAYBACK_CLOCK.resume()
             self.track_progress.resume_progress_bar()
+        monitor.notify_command()
+        # Its own group, so it can't cancel (or be cancelled by) other
+        # workers; a newer press supersedes one still in flight.
+        self.run_worker(self._send_play_pause(pause),
+                        group="play-pause", exclusive=True)
+
+    async def _send_play_pause(self, pause: bool) -> None:
+        with request_priority(Priority.USER):
+            try:
+                if pause:
+                    await ASYNC_SP.pause_playback()
+                else:
+                    await ASYNC_SP.start_playback()
+            except Exception as e:
+                # The monitor's next poll puts the bar back in line.
+                logging.warning(f"Play/pause failed: {e}")
 
     @on(ListView.Selected, "#playlist-tabs")
     def playlist_selected(self, event: ListView.Selected) -> None:
@@ -465,16 +841,77 @@ class Player(Static):
             "spotify:playlist:" + self.playlist_ids[self.curr_playing_playlist]
         )
 
-        start_playback_on_active_device(
-            track_uri, self.curr_playing_playist_uri)
-
         self.curr_track = track
         self.curr_row_index = track.row_index
 
-        self.create_queue()
+        # "Play from here": the selection goes to the queue, the track that
+        # was playing goes to history.
+        self.play_queue.play_from(self.curr_playing_playlist, pt, track.row_index)
 
         self.track_table.move_cursor(row=self.curr_row_index)
 
+        # An explicit selection isn't debounced: send it now, off the UI
+        # thread. PlaybackConfirmed arrives once the device is playing it.
+        self._supersede_pending()
+        action = TRACER.start_action("select_track", key="enter")
+        self._pending_playback = (
+            track_uri, self.curr_playing_playist_uri, action, TRACER.now())
+        if self._playback_timer is not None:
+            self._playback_timer.stop()
+        self._commit_playback()
+
+    def on_playback_confirmed(
+        self, message: PlaybackMonitor.PlaybackConfirmed
+    ) -> None:
+        # The queue was built optimistically when the track was chosen;
+        # rebuild it once the device agrees, in case playback moved on since.
+        if self.curr_track is not None and self.curr_track.uri == message.track_uri:
+            self.create_queue()
+
+    def action_open_search(self) -> None:
+        self.search_pane.display = True
+        self.search_input.focus()
+
+    def action_close_search(self) -> None:
+        if not self.search_pane.display:
+            return
+        self.search_input.value = ""
+        self.search_pane.display = False
+        self.track_table.focus()
+
+    @on(Input.Changed, "#search")
+    def search_changed(self, event: Input.Changed) -> None:
+        # In-memory and fast enough to run on every keystroke.
+        self._search_hits = self.search_index.search(
+            event.value, limit=self.SEARCH_RESULTS)
+        self.search_results.clear()
+        self.search_results.extend(SearchResult(hit) for hit in self._search_hits)
+
+    @on(Input.Submitted, "#search")
+    def search_submitted(self, event: Input.Submitted) -> None:
+        if self._search_hits:
+            self._jump_to_hit(self._search_hits[0])
+
+    @on(ListView.Selected, "#search-results")
+    def search_result_selected(self, event: ListView.Selected) -> None:
+        self._jump_to_hit(event.item.hit)
+
+    def _jump_to_hit(self, hit) -> None:
+        """Show the hit's playlist with the table cursor on its row."""
+        self.action_close_search()
+        # By id: hit.playlist is only a display name, which another playlist
+        # may share.
+        playlist_name = self._playlist_name(hit.playlist_id)
+        if playlist_name is None:
+            return
+        self.curr_displayed_playlist = playlist_name
+        self.run_worker(
+            lambda: self._show_track(playlist_name, hit.uri, hit.position),
+            thread=True,
+            group="search-jump",
+            exclusive=True,
+        )
+
     def action_seek_forward(self) -> None:
         self.seek_controller.seek_forward()
 
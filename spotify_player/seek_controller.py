@@ -1,7 +1,10 @@
-from spotify_api.spotify_client import SpotifyClient
+from spotify_api.async_client import AsyncSpotifyClient
+from spotify_api.spotify_client import LazyClient
+from spotify_api.request_scheduler import Priority, request_priority
 from tools.playback_monitor import PlaybackMonitor
+from tools.playback_clock import PLAYBACK_CLOCK
 
-SP = SpotifyClient.get_instance()
+SP = LazyClient(AsyncSpotifyClient.get_instance)
 
 
 class SeekController:
@@ -9,8 +12,8 @@ class SeekController:
 
     Keeps the progress bar responsive by updating it locally on each keypress,
     debounces the actual Spotify seek so rapid presses collapse into one API
-    call, and runs that call off the UI thread. Extracted from Player to keep
-    seeking logic in one place.
+    call, and sends it with the async client so the UI loop never waits on
+    it. Extracted from Player to keep seeking logic in one place.
     """
 
     SEEK_INTERVAL_MS = 10000  # 10 seconds per press
@@ -33,8 +36,10 @@ class SeekController:
         duration_ms = tp.total_time_ms
         if duration_ms <= 0:
             return
-        new_ms = max(0, min(tp.progress_ms + delta_ms, duration_ms - 1000))
-        # Update the bar instantly; no network call on the keypress path.
+        new_ms = max(0, min(PLAYBACK_CLOCK.position_ms() + delta_ms, duration_ms - 1000))
+        # Move the clock and the bar instantly; no network call on the
+        # keypress path.
+        PLAYBACK_CLOCK.seek(new_ms)
         tp.progress_ms = new_ms
         tp.update_progress_bar(new_ms, duration_ms)
         # Suppress the monitor's snap-back while the seek lands.
@@ -54,6 +59,8 @@ class SeekController:
         if target is None:
             return
         self._pending_seek_ms = None
-        self._owner.run_worker(
-            lambda: SP.seek_track(target), thread=True, exclusive=True
-        )
+        self._owner.run_worker(self._seek(target), exclusive=True)
+
+    async def _seek(self, target_ms: int) -> None:
+        with request_priority(Priority.USER):
+            await SP.seek_track(target_ms)
@@ -0,0 +1,20 @@
+"""Fixtures shared by the test modules.
+
+fake_clock stands in for time.monotonic wherever a class takes an injectable
+clock: it returns `now`, which only moves when a test moves it.
+"""
+
+import pytest
+
+
+class FakeClock:
+    def __init__(self, now: float = 100.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def fake_clock():
+    return FakeClock()
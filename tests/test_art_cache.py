@@ -0,0 +1,141 @@
+"""Tests for the album art cache.
+
+Fetch and decode are injected, so these count calls on fakes instead of
+touching the network or PIL. The contracts that matter: a URL is fetched once
+and then served from disk, a decoded image is reused from memory, and the
+in-memory LRU evicts the least recently used cover first. Variant selection
+must pick the smallest image that still covers the widget.
+"""
+
+from tools.art_cache import ArtCache, pick_image_variant, quantize_size
+
+SPOTIFY_IMAGES = [
+    {"url": "http://art/640", "width": 640, "height": 640},
+    {"url": "http://art/300", "width": 300, "height": 300},
+    {"url": "http://art/64", "width": 64, "height": 64},
+]
+
+
+class Counter:
+    def __init__(self):
+        self.fetches = []
+        self.decodes = []
+
+    def fetch(self, url):
+        self.fetches.append(url)
+        return url.encode()
+
+    def decode(self, data, size):
+        self.decodes.append((data, size))
+        return ("image", data.decode(), size)
+
+
+def make_cache(tmp_path, counter, **kwargs):
+    return ArtCache(counter.fetch, counter.decode, directory=tmp_path, **kwargs)
+
+
+class TestMemory:
+    def test_repeat_get_fetches_and_decodes_once(self, tmp_path):
+        counter = Counter()
+        cache = make_cache(tmp_path, counter)
+        first = cache.get("http://art/a")
+        second = cache.get("http://art/a")
+        assert first is second
+        assert counter.fetches == ["http://art/a"]
+        assert len(counter.decodes) == 1
+
+    def test_lru_evicts_least_recently_used(self, tmp_path):
+        counter = Counter()
+        cache = make_cache(tmp_path, counter, max_items=2)
+        cache.get("http://art/a")
+        cache.get("http://art/b")
+        cache.get("http://art/a")  # a is now most recent
+        cache.get("http://art/c")
+        assert "http://art/a" in cache
+        assert "http://art/b" not in cache
+        assert len(cache) == 2
+
+
+class TestDisk:
+    def test_new_instance_reads_disk_instead_of_fetching(self, tmp_path):
+        counter = Counter()
+        make_cache(tmp_path, counter).get("http://art/a")
+        image = make_cache(tmp_path, counter).get("http://art/a")
+        assert image == ("image", "http://art/a", None)
+        assert counter.fetches == ["http://art/a"]
+        assert len(counter.decodes) == 2
+
+    def test_evicted_image_is_decoded_from_disk(self, tmp_path):
+        counter = Counter()
+        cache = make_cache(tmp_path, counter, max_items=1)
+        cache.get("http://art/a")
+        cache.get("http://art/b")
+        cache.get("http://art/a")
+        assert counter.fetches == ["http://art/a", "http://art/b"]
+
+    def test_disk_is_trimmed_to_limit(self, tmp_path):
+        counter = Counter()
+        cache = make_cache(tmp_path, counter, max_disk_items=2)
+        for name in "abcd":
+            cache.get(f"http://art/{name}")
+        assert len(list(tmp_path.iterdir())) == 2
+
+
+class TestFailures:
+    def test_failed_fetch_is_not_cached(self, tmp_path):
+        calls = []
+
+        def flaky_fetch(url):
+            calls.append(url)
+            if len(calls) == 1:
+                raise OSError("timeout")
+            return b"data"
+
+        cache = ArtCache(flaky_fetch, lambda d, size: d, directory=tmp_path)
+        try:
+            cache.get("http://art/a")
+        except OSError:
+            pass
+        assert cache.get("http://art/a") == b"data"
+        assert len(calls) == 2
+
+
+class TestSizes:
+    def test_each_size_is_decoded_and_cached_separately(self, tmp_path):
+        counter = Counter()
+        cache = make_cache(tmp_path, counter)
+        small = cache.get("http://art/a", (64, 64))
+        large = cache.get("http://art/a", (128, 128))
+        assert small[2] == (64, 64)
+        assert large[2] == (128, 128)
+        assert cache.get("http://art/a", (64, 64)) is small
+        # One download, one decode per size.
+        assert counter.fetches == ["http://art/a"]
+        assert len(counter.decodes) == 2
+
+    def test_quantize_rounds_up_to_step(self):
+        assert quantize_size(100, 161) == (112, 176)
+        assert quantize_size(112, 112) == (112, 112)
+        assert quantize_size(0, 0) == (16, 16)
+
+
+class TestPickImageVariant:
+    def test_no_target_picks_largest(self):
+        assert pick_image_variant(SPOTIFY_IMAGES) == "http://art/640"
+
+    def test_picks_smallest_that_covers_target(self):
+        assert pick_image_variant(SPOTIFY_IMAGES, 200) == "http://art/300"
+        assert pick_image_variant(SPOTIFY_IMAGES, 64) == "http://art/64"
+
+    def test_target_larger_than_all_picks_largest(self):
+        assert pick_image_variant(SPOTIFY_IMAGES, 1000) == "http://art/640"
+
+    def test_order_of_list_does_not_matter(self):
+        assert pick_image_variant(SPOTIFY_IMAGES[::-1], 200) == "http://art/300"
+
+    def test_unknown_dimensions_only_used_as_fallback(self):
+        images = [{"url": "http://art/x", "width": None, "height": None}]
+        assert pick_image_variant(images, 200) == "http://art/x"
+
+    def test_no_images_returns_none(self):
+        assert pick_image_variant([], 200) is None
@@ -0,0 +1,128 @@
+"""Tests for AsyncSpotifyClient, the asyncio client the UI loop calls.
+
+These talk to a real FakeSpotify over HTTP, so they need aiohttp and are
+skipped without it. The scheduler is a fresh, generous one, so nothing here
+waits on the shared rate limit. The contracts: 204 No Content comes back as
+None, a 429 is retried after its Retry-After hold and passed on as an
+AsyncSpotifyException once the retries run out, and the OAuth token is
+reused until a minute before it expires, then fetched again.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from benchmarks.fake_spotify import FakeSpotify, FakeSpotifyConfig  # noqa: E402
+from spotify_api import async_client  # noqa: E402
+from spotify_api.async_client import (  # noqa: E402
+    AsyncSpotifyClient,
+    AsyncSpotifyException,
+)
+from spotify_api.request_scheduler import MAX_429_RETRIES, RequestScheduler  # noqa: E402
+
+
+class TokenProvider:
+    def __init__(self, lifetime_s=3600):
+        self.lifetime_s = lifetime_s
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return f"token-{self.calls}", time.time() + self.lifetime_s
+
+
+@pytest.fixture(autouse=True)
+def scheduler(monkeypatch):
+    monkeypatch.setattr(
+        async_client, "SCHEDULER", RequestScheduler(rate=1000, burst=1000))
+
+
+def run(fake, calls, provider=None):
+    """Run calls(client) on a new client against fake; returns its result."""
+    client = AsyncSpotifyClient(provider or TokenProvider(), base_url=fake.api_base)
+
+    async def main():
+        try:
+            return await calls(client)
+        finally:
+            await client.close()
+
+    return asyncio.run(main())
+
+
+class TestResponses:
+    def test_no_content_is_none(self):
+        with FakeSpotify() as fake:
+            assert run(fake, lambda c: c.pause_playback()) is None
+            assert fake.stats()["put_pause"] == 1
+
+    def test_json_is_parsed(self):
+        with FakeSpotify() as fake:
+            uri = fake.track_uri(0, 3)
+
+            async def calls(client):
+                await client.start_playback(uris=[uri])
+                return await client.current_playback()
+
+            playback = run(fake, calls)
+            assert playback["item"]["uri"] == uri
+
+    def test_429_is_retried_after_the_hold(self):
+        config = FakeSpotifyConfig(rate_limit_every=2, retry_after_s=0)
+        with FakeSpotify(config) as fake:
+
+            async def calls(client):
+                await client.pause_playback()
+                return await client.pause_playback()
+
+            # The second request is answered 429, the retry goes through.
+            assert run(fake, calls) is None
+            assert fake.stats()["put_pause"] == 3
+            assert fake.stats()["429"] == 1
+
+    def test_429_passed_on_after_the_retries(self):
+        config = FakeSpotifyConfig(rate_limit_every=1, retry_after_s=0)
+        with FakeSpotify(config) as fake:
+            with pytest.raises(AsyncSpotifyException) as raised:
+                run(fake, lambda c: c.pause_playback())
+            assert raised.value.http_status == 429
+            assert raised.value.retry_after == 0
+            assert fake.stats()["put_pause"] == MAX_429_RETRIES + 1
+
+
+class TestToken:
+    def test_reused_while_valid(self):
+        provider = TokenProvider()
+        with FakeSpotify() as fake:
+
+            async def calls(client):
+                await client.pause_playback()
+                await client.seek_track(1000)
+
+            run(fake, calls, provider)
+        assert provider.calls == 1
+
+    def test_refreshed_near_expiry(self):
+        # Inside the one-minute margin: every request fetches a new one.
+        provider = TokenProvider(lifetime_s=30)
+        with FakeSpotify() as fake:
+
+            async def calls(client):
+                await client.pause_playback()
+                await client.seek_track(1000)
+
+            run(fake, calls, provider)
+        assert provider.calls == 2
+
+    def test_concurrent_requests_share_one_refresh(self):
+        provider = TokenProvider()
+        with FakeSpotify() as fake:
+
+            async def calls(client):
+                await asyncio.gather(*(client.seek_track(i) for i in range(4)))
+
+            run(fake, calls, provider)
+        assert provider.calls == 1
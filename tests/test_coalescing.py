@@ -0,0 +1,216 @@
+"""Tests for the coalescing read layer in front of the Spotify clients.
+
+CoalescingReader and CoalescingSpotify are pure Python, so these use a fake
+client that counts calls (and can be held open to simulate a slow request).
+The contracts: overlapping identical reads make one request, results are
+reused only inside the freshness window, errors are shared rather than cached,
+sync and async callers share each other's requests in flight, and playback
+commands invalidate the cached playback state.
+"""
+
+import asyncio
+import threading
+
+from spotify_api.coalescing import CoalescingReader, CoalescingSpotify
+
+
+class FakeSpotify:
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+        self.prefix = "https://api.spotify.com/v1/"
+
+    def current_playback(self):
+        self.calls.append("current_playback")
+        self.release.wait(timeout=5)
+        return {"is_playing": True, "n": len(self.calls)}
+
+    def playlist(self, playlist_id, fields=None):
+        self.calls.append(("playlist", playlist_id, fields))
+        return {"id": playlist_id}
+
+    def pause_playback(self):
+        self.calls.append("pause_playback")
+
+
+def make_proxy(clock, freshness=None):
+    fake = FakeSpotify()
+    reader = CoalescingReader(clock=clock)
+    proxy = CoalescingSpotify(
+        fake, reader, freshness or {"current_playback": 0.5, "playlist": 0.0}
+    )
+    return proxy, fake
+
+
+class TestInFlight:
+    def test_concurrent_identical_reads_share_one_request(self, fake_clock):
+        proxy, fake = make_proxy(fake_clock)
+        fake.release.clear()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(proxy.current_playback()))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        threading.Timer(0.05, fake.release.set).start()
+        for t in threads:
+            t.join(timeout=5)
+        assert fake.calls.count("current_playback") == 1
+        assert len(results) == 5
+        assert all(r is results[0] for r in results)
+
+    def test_different_arguments_are_not_shared(self, fake_clock):
+        proxy, fake = make_proxy(fake_clock)
+        proxy.playlist("a", fields="name")
+        proxy.playlist("b", fields="name")
+        proxy.playlist("a", fields="tracks")
+        assert len(fake.calls) == 3
+
+    def test_errors_are_shared_not_cached(self):
+        reader = CoalescingReader()
+        calls = []
+
+        def failing():
+            calls.append(1)
+            raise RuntimeError("boom")
+
+        for _ in range(2):
+            try:
+                reader.get("k", failing, max_age=10)
+            except RuntimeError:
+                pass
+        assert len(calls) == 2
+
+
+class TestFreshness:
+    def test_result_reused_inside_window(self, fake_clock):
+        proxy, fake = make_proxy(fake_clock)
+        first = proxy.current_playback()
+        fake_clock.now += 0.4
+        assert proxy.current_playback() is first
+        fake_clock.now += 0.2
+        assert proxy.current_playback() is not first
+        assert fake.calls.count("current_playback") == 2
+
+    def test_zero_window_only_coalesces(self, fake_clock):
+        proxy, fake = make_proxy(fake_clock)
+        proxy.playlist("a")
+        proxy.playlist("a")
+        assert len(fake.calls) == 2
+
+    def test_none_result_is_cached(self, fake_clock):
+        reader = CoalescingReader(clock=fake_clock)
+        calls = []
+        reader.get("k", lambda: calls.append(1), max_age=1)
+        reader.get("k", lambda: calls.append(1), max_age=1)
+        assert len(calls) == 1
+
+
+class TestWrites:
+    def test_command_invalidates_playback_reads(self, fake_clock):
+        proxy, fake = make_proxy(fake_clock)
+        proxy.current_playback()
+        proxy.pause_playback()
+        proxy.current_playback()
+        assert fake.calls == ["current_playback", "pause_playback", "current_playback"]
+
+    def test_other_attributes_pass_through(self, fake_clock):
+        proxy, fake = make_proxy(fake_clock)
+        assert proxy.prefix == fake.prefix
+        proxy.prefix = "http://localhost/v1/"
+        assert fake.prefix == "http://localhost/v1/"
+
+
+class TestAsync:
+    def test_overlapping_async_reads_share_one_request(self):
+        reader = CoalescingReader()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"ok": True}
+
+        async def main():
+            return await asyncio.gather(*(reader.aget("k", fetch) for _ in range(4)))
+
+        results = asyncio.run(main())
+        assert len(calls) == 1
+        assert all(r == {"ok": True} for r in results)
+
+    def test_async_result_answers_sync_read(self, fake_clock):
+        reader = CoalescingReader(clock=fake_clock)
+
+        async def fetch():
+            return "from-async"
+
+        asyncio.run(reader.aget("k", fetch, max_age=1))
+        assert reader.get("k", lambda: "from-sync", max_age=1) == "from-async"
+
+    def test_sync_read_joins_async_read_in_flight(self):
+        reader = CoalescingReader()
+        sync_calls, shared = [], []
+        thread = threading.Thread(target=lambda: shared.append(
+            reader.get("k", lambda: sync_calls.append(1) or "from-sync")))
+
+        async def fetch():
+            # The thread asks for the same key while this is in flight.
+            thread.start()
+            await asyncio.sleep(0.1)
+            return "from-async"
+
+        assert asyncio.run(reader.aget("k", fetch)) == "from-async"
+        thread.join(timeout=5)
+        assert shared == ["from-async"]
+        assert sync_calls == []
+
+    def test_async_read_joins_sync_read_in_flight(self):
+        reader = CoalescingReader()
+        started, release = threading.Event(), threading.Event()
+        results = []
+
+        def slow_fetch():
+            started.set()
+            release.wait(timeout=5)
+            return "from-sync"
+
+        thread = threading.Thread(
+            target=lambda: results.append(reader.get("k", slow_fetch)))
+        thread.start()
+        assert started.wait(timeout=5)
+        async_calls = []
+
+        async def fetch():
+            async_calls.append(1)
+            return "from-async"
+
+        threading.Timer(0.05, release.set).start()
+        assert asyncio.run(reader.aget("k", fetch)) == "from-sync"
+        thread.join(timeout=5)
+        assert results == ["from-sync"]
+        assert async_calls == []
+
+    def test_cancelled_leader_lets_waiters_fetch(self):
+        reader = CoalescingReader()
+        calls = []
+
+        async def stuck():
+            calls.append("stuck")
+            await asyncio.sleep(10)
+
+        async def fetch():
+            calls.append("fetch")
+            return "ok"
+
+        async def main():
+            leader = asyncio.create_task(reader.aget("k", stuck))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(reader.aget("k", fetch))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower
+
+        assert asyncio.run(main()) == "ok"
+        assert calls == ["stuck", "fetch"]
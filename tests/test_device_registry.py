@@ -0,0 +1,186 @@
+"""Tests for DeviceRegistry, the cached device list behind find_active_device.
+
+The registry takes an injectable fetch and clock, so these count fetches
+against a fake device list. The contracts: one fetch, then answers from
+memory; a stale list is still served while a background refresh runs; the
+monitor's playback responses and transfers keep the active device current
+without fetching; invalidate() forces a refetch; and a play command that
+fails on a cached device refetches the list and retries once, and a start
+that is never confirmed drops the list.
+"""
+
+import threading
+
+import pytest
+
+from spotify_api import device_registry, spotify_utils
+from spotify_api.device_registry import DeviceRegistry
+from tools.playback_confirm import PlaybackConfirmations
+
+
+def dev(name, id_, is_active=False):
+    return {"name": name, "id": id_, "is_active": is_active}
+
+
+class FakeDevices:
+    def __init__(self, devices):
+        self.devices = devices
+        self.calls = 0
+        self.fetched = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.fetched.set()
+        return [dict(d) for d in self.devices]
+
+
+def make_registry(clock, devices, ttl=30):
+    fetch = FakeDevices(devices)
+    return DeviceRegistry(fetch=fetch, ttl=ttl, clock=clock), fetch
+
+
+def playback(device, is_playing=True):
+    return {"is_playing": is_playing, "device": device, "item": {"uri": "u"}}
+
+
+class TestCaching:
+    def test_fetches_once_then_answers_from_memory(self, fake_clock):
+        reg, fetch = make_registry(fake_clock, [dev("spotifyd", "sd1", is_active=True)])
+        for _ in range(5):
+            assert reg.choose("spotifyd") == -1
+        assert fetch.calls == 1
+
+    def test_stale_list_served_while_refreshing_in_background(self, fake_clock):
+        reg, fetch = make_registry(fake_clock, [dev("TV", "tv1")], ttl=30)
+        reg.devices()
+        fetch.devices = [dev("TV", "tv1"), dev("spotifyd", "sd1")]
+        fetch.fetched.clear()
+        fake_clock.now += 31
+        assert [d["id"] for d in reg.devices()] == ["tv1"]
+        assert fetch.fetched.wait(timeout=5)
+        for _ in range(100):
+            if len(reg.devices()) == 2:
+                break
+            threading.Event().wait(0.01)
+        assert reg.choose("spotifyd") == "sd1"
+        assert fetch.calls == 2
+
+    def test_invalidate_forces_refetch(self, fake_clock):
+        reg, fetch = make_registry(fake_clock, [dev("TV", "tv1")])
+        reg.devices()
+        reg.invalidate()
+        reg.devices()
+        assert fetch.calls == 2
+
+
+class TestPlaybackUpdates:
+    def test_monitor_device_becomes_active(self, fake_clock):
+        reg, fetch = make_registry(
+            fake_clock, [dev("spotifyd", "sd1"), dev("TV", "tv1", is_active=True)]
+        )
+        assert reg.choose("spotifyd") == "sd1"
+        reg.observe_playback(playback(dev("spotifyd", "sd1", is_active=True)))
+        assert reg.choose("spotifyd") == -1
+        assert [d["is_active"] for d in reg.devices()] == [True, False]
+        assert fetch.calls == 1
+
+    def test_unknown_device_from_monitor_is_added(self, fake_clock):
+        reg, _ = make_registry(fake_clock, [dev("TV", "tv1")])
+        reg.devices()
+        reg.observe_playback(playback(dev("spotifyd", "sd1", is_active=True)))
+        assert reg.choose("spotifyd") == -1
+
+    def test_nothing_playing_clears_active(self, fake_clock):
+        reg, _ = make_registry(fake_clock, [dev("TV", "tv1", is_active=True)])
+        reg.devices()
+        reg.observe_playback(None)
+        assert reg.is_playing() is False
+        assert not any(d["is_active"] for d in reg.devices())
+
+    def test_is_playing_unknown_until_first_poll(self, fake_clock):
+        reg, _ = make_registry(fake_clock, [dev("TV", "tv1")])
+        assert reg.is_playing() is None
+        reg.observe_playback(playback(dev("TV", "tv1"), is_playing=True))
+        assert reg.is_playing() is True
+
+    def test_observe_before_first_fetch_does_not_fetch(self, fake_clock):
+        reg, fetch = make_registry(fake_clock, [dev("TV", "tv1")])
+        reg.observe_playback(playback(dev("TV", "tv1")))
+        assert fetch.calls == 0
+
+    def test_mark_active_after_transfer(self, fake_clock):
+        reg, fetch = make_registry(fake_clock, [dev("spotifyd", "sd1"), dev("TV", "tv1")])
+        assert reg.choose("spotifyd") == "sd1"
+        reg.mark_active("sd1")
+        assert reg.choose("spotifyd") == -1
+        assert fetch.calls == 1
+
+    def test_handed_out_list_is_not_mutated(self, fake_clock):
+        reg, _ = make_registry(fake_clock, [dev("TV", "tv1", is_active=True)])
+        before = reg.devices()
+        reg.observe_playback(None)
+        assert before[0]["is_active"] is True
+
+
+class FakePlayer:
+    """The playback commands start_playback_on_active_device sends; devices
+    in `gone` reject them."""
+
+    def __init__(self, gone=()):
+        self.gone = set(gone)
+        self.calls = []
+
+    def transfer_playback(self, device_id, force_play=False):
+        self.calls.append(("transfer", device_id))
+        if device_id in self.gone:
+            raise RuntimeError("Device not found")
+
+    def start_playback(self, device_id=None, uris=None):
+        self.calls.append(("play", device_id))
+        if device_id in self.gone:
+            raise RuntimeError("Device not found")
+
+
+class TestStartPlayback:
+    @pytest.fixture
+    def player(self, monkeypatch, fake_clock):
+        def install(devices, gone=()):
+            reg, fetch = make_registry(fake_clock, devices)
+            player = FakePlayer(gone)
+            monkeypatch.setattr(spotify_utils, "DEVICES", reg)
+            monkeypatch.setattr(spotify_utils, "sp", player)
+            monkeypatch.setattr(
+                spotify_utils, "CONFIRMATIONS", PlaybackConfirmations(fake_clock))
+            monkeypatch.setattr(device_registry, "PREFERRED_DEVICE_NAME", "spotifyd")
+            # Nothing playing, so no pause (or playback read) before transfers.
+            reg.observe_playback(None)
+            reg.devices()
+            return reg, fetch, player
+
+        return install
+
+    def test_vanished_device_is_refetched_and_retried(self, player):
+        reg, fetch, sp = player([dev("spotifyd", "sd1")], gone={"sd1"})
+        # spotifyd has stopped since the list was cached; the TV is playing.
+        fetch.devices = [dev("TV", "tv1", is_active=True)]
+        assert spotify_utils.start_playback_on_active_device("u", "p") == 1
+        assert sp.calls == [("transfer", "sd1"), ("play", None)]
+        assert fetch.calls == 2
+
+    def test_second_failure_is_raised(self, player):
+        reg, fetch, sp = player([dev("spotifyd", "sd1")], gone={"sd1"})
+        with pytest.raises(RuntimeError):
+            spotify_utils.start_playback_on_active_device("u", "p")
+        assert sp.calls == [("transfer", "sd1"), ("transfer", "sd1")]
+        reg.devices()
+        assert fetch.calls == 3
+
+    def test_unconfirmed_start_drops_the_list(self, player, fake_clock):
+        reg, fetch, _ = player([dev("spotifyd", "sd1", is_active=True)])
+        spotify_utils.start_playback_on_active_device("u", "p")
+        reg.devices()
+        assert fetch.calls == 1
+        fake_clock.now += 60
+        assert not spotify_utils.CONFIRMATIONS.pending()
+        reg.devices()
+        assert fetch.calls == 2
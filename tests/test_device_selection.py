@@ -1,7 +1,7 @@
-"""Tests for the device-selection preference order in find_active_device.
+"""Tests for the device-selection preference order used by find_active_device.
 
-find_active_device imports a live Spotify client at module load, so rather than
-import it we test the pure decision tree it implements. Return-value contract:
+The decision tree lives in spotify_api.device_registry.choose_device, which is
+pure, so it's imported and tested directly. Return-value contract:
 
     None  -> no devices available
     -1    -> the chosen device is already active; play on current device
@@ -16,18 +16,13 @@ This logic is where the old "Speaker-only" bug and the dual-playback bug lived,
 so it's worth pinning down.
 """
 
+from functools import partial
 
-def choose_device(devices, preferred_name="spotifyd"):
-    """Mirror of find_active_device's selection logic."""
-    if not devices:
-        return None
-    preferred = next((d for d in devices if d.get("name") == preferred_name), None)
-    if preferred:
-        return -1 if preferred.get("is_active") else preferred["id"]
-    active = next((d for d in devices if d.get("is_active")), None)
-    if active:
-        return -1
-    return devices[0]["id"]
+from spotify_api.device_registry import choose_device as _choose_device
+
+# Pin the preferred name so SPOTIFYD_DEVICE_NAME in the environment can't
+# change the expectations below.
+choose_device = partial(_choose_device, preferred_name="spotifyd")
 
 
 def dev(name, id_, is_active=False, type_="Computer"):
@@ -1,24 +1,13 @@
-"""Tests for the 'did the track end naturally?' heuristic used by the
-PlaybackMonitor to distinguish a track finishing on its own (auto-advance)
-from the user skipping mid-track (no auto-advance).
+"""Tests for the 'did the track end naturally?' heuristic and the playback
+state machine PlaybackMonitor runs on every poll.
 
-PlaybackMonitor itself imports Textual, so rather than construct the widget we
-test the pure decision against the same contract the monitor implements:
-
-    ended_naturally = duration > 0 and progress >= duration - 3000
-
-If PlaybackMonitor._ended_naturally is ever extracted into a standalone
-function, point this test at it directly.
+A track finishing on its own (within 3s of its end) auto-advances; the user
+skipping mid-track must not. PlaybackState folds in one current_playback
+response at a time and reports a natural end at most once, whether playback
+stopped or moved on to another track.
 """
 
-NATURAL_END_THRESHOLD_MS = 3000
-
-
-def ended_naturally(progress_ms: int, duration_ms: int) -> bool:
-    """Mirror of PlaybackMonitor._ended_naturally."""
-    if duration_ms <= 0:
-        return False
-    return progress_ms >= duration_ms - NATURAL_END_THRESHOLD_MS
+from tools.playback_state import PlaybackState, ended_naturally, is_playing
 
 
 class TestEndedNaturally:
@@ -51,3 +40,76 @@ class TestEndedNaturally:
     def test_progress_past_duration_counts_as_natural(self):
         # Progress can briefly exceed duration on slow polls; still natural.
         assert ended_naturally(201000, 200000) is True
+
+
+def playback(uri, progress_ms, duration_ms=200000, playing=True):
+    return {
+        "is_playing": playing,
+        "progress_ms": progress_ms,
+        "item": {"uri": uri, "duration_ms": duration_ms},
+    }
+
+
+class TestIsPlaying:
+    def test_playing_track(self):
+        assert is_playing(playback("a", 1000)) is True
+
+    def test_nothing_playing(self):
+        assert is_playing(None) is False
+
+    def test_paused(self):
+        assert is_playing(playback("a", 1000, playing=False)) is False
+
+    def test_not_started_yet(self):
+        assert is_playing(playback("a", 0)) is False
+
+
+class TestPlaybackState:
+    def test_first_track_reports_nothing(self):
+        state = PlaybackState()
+        assert state.update(playback("a", 1000)) == (None, False)
+        assert state.uri == "a"
+        assert state.playing is True
+
+    def test_track_change_after_natural_end(self):
+        state = PlaybackState()
+        state.update(playback("a", 199000))
+        assert state.update(playback("b", 500)) == ("a", False)
+        assert state.uri == "b"
+
+    def test_track_change_mid_play_is_a_skip(self):
+        state = PlaybackState()
+        state.update(playback("a", 50000))
+        assert state.update(playback("b", 500)) == (None, False)
+
+    def test_stop_after_natural_end(self):
+        state = PlaybackState()
+        state.update(playback("a", 199000))
+        assert state.update(None) == ("a", True)
+        assert state.uri is None
+        assert state.playing is False
+        assert state.duration_ms == 0
+
+    def test_stop_mid_play(self):
+        state = PlaybackState()
+        state.update(playback("a", 50000))
+        assert state.update(playback("a", 50000, playing=False)) == (None, True)
+
+    def test_stopped_stays_quiet(self):
+        state = PlaybackState()
+        state.update(playback("a", 199000))
+        state.update(None)
+        assert state.update(None) == (None, False)
+
+    def test_end_is_reported_once(self):
+        state = PlaybackState()
+        state.update(playback("a", 199000))
+        state.update(None)
+        # Playback resuming later is a fresh start, not a second end.
+        assert state.update(playback("b", 500)) == (None, False)
+
+    def test_progress_tracks_latest_poll(self):
+        state = PlaybackState()
+        state.update(playback("a", 1000))
+        state.update(playback("a", 6000, duration_ms=240000))
+        assert (state.progress_ms, state.duration_ms) == (6000, 240000)
@@ -0,0 +1,177 @@
+"""Tests for the benchmark harness: the fake Spotify Web API and the report
+helpers.
+
+The benchmarks are only as honest as the server they run against, so these
+talk to a real FakeSpotify over HTTP (standard library only). The contracts:
+pages follow Spotify's shape and limits and chain through `next` to exactly
+the configured number of items; every Nth request gets a 429 with
+Retry-After; a started track stays invisible to the player endpoint for
+play_delay_ms; and every request is counted per route.
+"""
+
+import json
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from benchmarks.fake_spotify import FakeSpotify, FakeSpotifyConfig
+from benchmarks.report import request_delta, summarize
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as resp:
+            body = resp.read()
+            return resp.status, json.loads(body) if body else None, resp.headers
+    except urllib.error.HTTPError as e:
+        body = e.read()
+        return e.code, json.loads(body) if body else None, e.headers
+
+
+def put(url, body=None):
+    data = json.dumps(body).encode() if body is not None else b""
+    request = urllib.request.Request(url, data=data, method="PUT")
+    with urllib.request.urlopen(request, timeout=5) as resp:
+        return resp.status
+
+
+@pytest.fixture
+def fake(request):
+    config = getattr(request, "param", None) or FakeSpotifyConfig(
+        playlists=120, tracks_per_playlist=250)
+    with FakeSpotify(config) as server:
+        yield server
+
+
+class TestLibrary:
+    def test_playlist_pages_chain_to_the_full_list(self, fake):
+        url = fake.api_base + "me/playlists?limit=50"
+        ids = []
+        while url:
+            status, page, _ = get(url)
+            assert status == 200
+            assert page["total"] == 120
+            assert len(page["items"]) <= 50
+            ids += [p["id"] for p in page["items"]]
+            url = page["next"]
+        assert ids == [FakeSpotify.playlist_id(i) for i in range(120)]
+
+    def test_limit_is_capped_like_spotify(self, fake):
+        _, page, _ = get(fake.api_base + "me/playlists?limit=500")
+        assert page["limit"] == 50
+
+    def test_playlist_embeds_first_track_page_with_snapshot(self, fake):
+        _, playlist, _ = get(fake.api_base + "playlists/pl0003")
+        assert playlist["snapshot_id"] == "snap-3-0"
+        tracks = playlist["tracks"]
+        assert len(tracks["items"]) == 100
+        assert tracks["items"][0]["track"]["uri"] == fake.track_uri(3, 0)
+        assert tracks["next"].endswith("/v1/playlists/pl0003/tracks?offset=100&limit=100")
+
+    def test_track_pages_end_at_total(self, fake):
+        _, page, _ = get(fake.api_base + "playlists/pl0000/tracks?offset=200&limit=100")
+        assert len(page["items"]) == 50
+        assert page["next"] is None
+
+    def test_edit_changes_snapshot(self, fake):
+        fake.edit_playlist(3)
+        _, playlist, _ = get(fake.api_base + "playlists/pl0003")
+        assert playlist["snapshot_id"] == "snap-3-1"
+
+    def test_unknown_playlist_is_404(self, fake):
+        status, body, _ = get(fake.api_base + "playlists/pl9999")
+        assert status == 404
+        assert body["error"]["status"] == 404
+
+    def test_cover_is_a_png(self, fake):
+        _, playlist, _ = get(fake.api_base + "playlists/pl0000")
+        url = playlist["tracks"]["items"][0]["track"]["album"]["images"][0]["url"]
+        with urllib.request.urlopen(url, timeout=5) as resp:
+            assert resp.headers["Content-Type"] == "image/png"
+            assert resp.read().startswith(b"\x89PNG")
+
+
+class TestPlayer:
+    def test_idle_player_is_204(self, fake):
+        status, body, _ = get(fake.api_base + "me/player")
+        assert status == 204
+        assert body is None
+
+    def test_play_then_pause(self, fake):
+        uri = fake.track_uri(0, 5)
+        assert put(fake.api_base + "me/player/play?device_id=dev-spotifyd",
+                   {"uris": [uri]}) == 204
+        _, state, _ = get(fake.api_base + "me/player")
+        assert state["item"]["uri"] == uri
+        assert state["is_playing"] is True
+        assert state["device"]["name"] == "spotifyd"
+        put(fake.api_base + "me/player/pause")
+        _, state, _ = get(fake.api_base + "me/player")
+        assert state["is_playing"] is False
+
+    @pytest.mark.parametrize(
+        "fake", [FakeSpotifyConfig(play_delay_ms=150)], indirect=True)
+    def test_new_track_shows_up_after_play_delay(self, fake):
+        uri = fake.track_uri(0, 1)
+        put(fake.api_base + "me/player/play", {"uris": [uri]})
+        status, _, _ = get(fake.api_base + "me/player")
+        assert status == 204
+        time.sleep(0.2)
+        _, state, _ = get(fake.api_base + "me/player")
+        assert state["item"]["uri"] == uri
+
+    def test_transfer_activates_device(self, fake):
+        put(fake.api_base + "me/player", {"device_ids": ["dev-spotifyd"], "play": False})
+        _, body, _ = get(fake.api_base + "me/player/devices")
+        active = [d["name"] for d in body["devices"] if d["is_active"]]
+        assert active == ["spotifyd"]
+
+
+class TestKnobs:
+    @pytest.mark.parametrize(
+        "fake", [FakeSpotifyConfig(rate_limit_every=3, retry_after_s=2)], indirect=True)
+    def test_every_nth_request_is_rate_limited(self, fake):
+        statuses = [get(fake.api_base + "me/player/devices")[0] for _ in range(6)]
+        assert statuses == [200, 200, 429, 200, 200, 429]
+        get(fake.api_base + "me/player/devices")
+        get(fake.api_base + "me/player/devices")
+        status, _, headers = get(fake.api_base + "me/player/devices")
+        assert status == 429
+        assert headers["Retry-After"] == "2"
+
+    @pytest.mark.parametrize("fake", [FakeSpotifyConfig(latency_ms=50)], indirect=True)
+    def test_latency_is_added(self, fake):
+        started = time.perf_counter()
+        get(fake.api_base + "me/player/devices")
+        assert time.perf_counter() - started >= 0.05
+
+    def test_requests_are_counted_per_route(self, fake):
+        get(fake.api_base + "me/playlists")
+        get(fake.api_base + "playlists/pl0000/tracks?offset=100")
+        get(fake.api_base + "playlists/pl0001/tracks?offset=100")
+        stats = fake.stats()
+        assert stats["get_me_playlists"] == 1
+        assert stats["get_playlist_tracks"] == 2
+        assert stats["total"] == 3
+        fake.reset_stats()
+        assert fake.stats() == {}
+
+
+class TestReport:
+    def test_summarize_reports_milliseconds(self):
+        summary = summarize([0.001 * n for n in range(1, 101)])
+        assert summary["n"] == 100
+        assert summary["min_ms"] == 1.0
+        assert summary["median_ms"] == 50.5
+        assert summary["p95_ms"] == 95.0
+        assert summary["max_ms"] == 100.0
+
+    def test_summarize_empty(self):
+        assert summarize([]) == {"n": 0}
+
+    def test_request_delta_drops_unchanged_routes(self):
+        before = {"total": 3, "get_player": 3}
+        after = {"total": 5, "get_player": 3, "put_play": 2}
+        assert request_delta(before, after) == {"put_play": 2, "total": 2}
@@ -0,0 +1,105 @@
+"""Tests for the connection-reuse accounting in the shared HTTP pool.
+
+PooledAdapter reads urllib3's per-host pool counters, so these swap in stub
+pools with known counts instead of making requests; they need requests
+installed and are skipped without it. The contracts: stats() reports each
+host's requests, new connections and idle connections; the pools are
+bounded (they block rather than open extra connections); the reuse ratio is
+the share of requests that didn't open a connection, never negative; and
+pool_stats() totals the requests session and the aiohttp counters.
+"""
+
+import queue
+
+import pytest
+
+pytest.importorskip("requests")
+
+from spotify_api import http_pool  # noqa: E402
+from spotify_api.http_pool import PooledAdapter, pool_stats, reuse_ratio  # noqa: E402
+
+
+class StubPool:
+    """The parts of a urllib3 HTTPConnectionPool stats() reads."""
+
+    def __init__(self, host, requests_made, connections, idle, slots=10):
+        self.host = host
+        self.num_requests = requests_made
+        self.num_connections = connections
+        # urllib3 keeps a LIFO of connections, None for never-opened slots.
+        self.pool = queue.LifoQueue()
+        for i in range(slots):
+            self.pool.put(object() if i < idle else None)
+
+
+def make_adapter(*pools):
+    adapter = PooledAdapter()
+    adapter.poolmanager.pools = {("https", p.host, 443): p for p in pools}
+    return adapter
+
+
+class TestAdapterStats:
+    def test_per_host_counts(self):
+        adapter = make_adapter(
+            StubPool("api.spotify.com", 40, 3, idle=2),
+            StubPool("i.scdn.co", 12, 4, idle=4),
+        )
+        assert adapter.stats() == {
+            "api.spotify.com": {"requests": 40, "connections": 3, "idle": 2},
+            "i.scdn.co": {"requests": 12, "connections": 4, "idle": 4},
+        }
+
+    def test_no_pools_yet(self):
+        assert make_adapter().stats() == {}
+
+    def test_pools_block_at_maxsize(self):
+        pool = PooledAdapter().poolmanager.connection_from_url("https://api.spotify.com")
+        assert pool.block is True
+        assert pool.pool.maxsize == http_pool.POOL_MAXSIZE
+
+
+class TestReuseRatio:
+    def test_share_of_requests_on_open_connections(self):
+        assert reuse_ratio(40, 4) == pytest.approx(0.9)
+
+    def test_every_request_opened_a_connection(self):
+        assert reuse_ratio(5, 5) == 0.0
+
+    def test_no_requests(self):
+        assert reuse_ratio(0, 0) == 0.0
+
+    def test_never_negative(self):
+        # A connection opened and dropped before its request was counted.
+        assert reuse_ratio(2, 3) == 0.0
+
+
+class TestPoolStats:
+    def test_totals_both_clients(self, monkeypatch):
+        session = http_pool.requests.Session()
+        adapter = make_adapter(
+            StubPool("api.spotify.com", 40, 3, idle=2),
+            StubPool("i.scdn.co", 10, 2, idle=1),
+        )
+        session.mount("https://", adapter)
+        monkeypatch.setattr(http_pool, "_session", session)
+        monkeypatch.setattr(
+            http_pool, "_async_counts",
+            {"requests": 20, "connections": 2, "reused": 18})
+
+        stats = pool_stats()
+        assert stats["requests"]["requests"] == 50
+        assert stats["requests"]["connections"] == 5
+        assert stats["requests"]["open"] == 3
+        assert stats["requests"]["reuse_ratio"] == pytest.approx(0.9)
+        assert set(stats["requests"]["hosts"]) == {"api.spotify.com", "i.scdn.co"}
+        assert stats["aiohttp"]["reused"] == 18
+        assert stats["aiohttp"]["reuse_ratio"] == pytest.approx(0.9)
+
+    def test_before_any_request(self, monkeypatch):
+        monkeypatch.setattr(http_pool, "_session", None)
+        monkeypatch.setattr(
+            http_pool, "_async_counts", {"requests": 0, "connections": 0, "reused": 0})
+        stats = pool_stats()
+        assert stats["requests"]["hosts"] == {}
+        assert stats["requests"]["reuse_ratio"] == 0.0
+        assert stats["aiohttp"]["reuse_ratio"] == 0.0
@@ -0,0 +1,164 @@
+"""Tests for ApiMetrics, the per-endpoint call, latency, error and byte
+counters behind the debug panel and the metrics export.
+
+The clock is injectable, so rates are checked against a fake clock. The
+contracts: URLs group by endpoint with ids and query strings stripped; 429s
+and errors are counted apart; latency quantiles come from fixed buckets and
+stay within the observed range; and the Prometheus export is a well-formed
+histogram whose +Inf bucket equals the call count.
+"""
+
+import json
+
+from spotify_api.metrics import BUCKETS_S, ApiMetrics, Histogram, endpoint_for
+
+API = "https://api.spotify.com/v1/"
+
+
+def make_metrics(clock):
+    return ApiMetrics(clock=clock, wall_clock=lambda: 1.7e9)
+
+
+class TestEndpointFor:
+    def test_ids_become_placeholders(self):
+        assert endpoint_for("GET", API + "playlists/37i9dQ/tracks?offset=100&limit=100") == (
+            "GET /v1/playlists/{id}/tracks")
+
+    def test_me_paths_are_kept(self):
+        assert endpoint_for("GET", API + "me/player/devices") == "GET /v1/me/player/devices"
+        assert endpoint_for("PUT", API + "me/player/play?device_id=abc") == (
+            "PUT /v1/me/player/play")
+
+    def test_users_playlists(self):
+        assert endpoint_for("GET", API + "users/bob/playlists") == "GET /v1/users/{id}/playlists"
+
+    def test_other_hosts_group_by_host(self):
+        assert endpoint_for("GET", "https://i.scdn.co/image/ab67616d0000b273") == "GET i.scdn.co"
+        assert endpoint_for("POST", "https://accounts.spotify.com/api/token") == (
+            "POST accounts.spotify.com")
+
+    def test_works_for_any_api_host(self):
+        # The benchmark fake serves the same paths from 127.0.0.1.
+        assert endpoint_for("GET", "http://127.0.0.1:8901/v1/playlists/pl1") == (
+            "GET /v1/playlists/{id}")
+
+
+class TestHistogram:
+    def test_empty(self):
+        assert Histogram().quantile(0.5) is None
+
+    def test_quantiles_within_observed_range(self):
+        h = Histogram()
+        for ms in range(20, 40):
+            h.observe(ms / 1000)
+        assert 0.02 <= h.quantile(0.5) <= 0.039
+        assert h.quantile(0.99) <= 0.039
+        assert h.quantile(0.0) >= 0.02
+
+    def test_quantile_orders_buckets(self):
+        h = Histogram()
+        for _ in range(90):
+            h.observe(0.008)
+        for _ in range(10):
+            h.observe(0.8)
+        assert h.quantile(0.5) <= 0.01
+        assert h.quantile(0.95) > 0.5
+
+    def test_cumulative_ends_with_everything(self):
+        h = Histogram()
+        for seconds in (0.001, 0.2, 30.0):
+            h.observe(seconds)
+        cumulative = h.cumulative()
+        assert len(cumulative) == len(BUCKETS_S) + 1
+        assert cumulative[0] == (BUCKETS_S[0], 1)
+        assert cumulative[-1] == (float("inf"), 3)
+        counts = [n for _, n in cumulative]
+        assert counts == sorted(counts)
+
+
+class TestApiMetrics:
+    def test_counts_by_endpoint_and_status(self, fake_clock):
+        metrics = make_metrics(fake_clock)
+        metrics.record("GET", API + "me/player", 200, 0.05, bytes_in=800)
+        metrics.record("GET", API + "me/player", 204, 0.04)
+        metrics.record("GET", API + "playlists/a/tracks?offset=0", 200, 0.2, bytes_in=50_000)
+        metrics.record("GET", API + "playlists/b/tracks?offset=100", 429, 0.01)
+        metrics.record("PUT", API + "me/player/play", None, 10.0, bytes_out=60)
+        fake_clock.now += 60
+
+        snap = metrics.snapshot()
+        player = snap["endpoints"]["GET /v1/me/player"]
+        assert player["calls"] == 2
+        assert player["statuses"] == {"200": 1, "204": 1}
+        assert player["bytes_in"] == 800
+        tracks = snap["endpoints"]["GET /v1/playlists/{id}/tracks"]
+        assert tracks["calls"] == 2
+        assert tracks["rate_limited"] == 1
+        assert tracks["errors"] == 0
+        play = snap["endpoints"]["PUT /v1/me/player/play"]
+        assert play["errors"] == 1
+        assert play["statuses"] == {"error": 1}
+        assert play["bytes_out"] == 60
+        assert snap["calls"] == 5
+        assert snap["calls_per_min"] == 5.0
+        assert snap["errors"] == 1
+        assert snap["rate_limited"] == 1
+
+    def test_client_errors_count_as_errors(self, fake_clock):
+        metrics = make_metrics(fake_clock)
+        metrics.record("GET", API + "playlists/x", 404, 0.1)
+        assert metrics.snapshot()["errors"] == 1
+
+    def test_rate_is_per_minute_of_session(self, fake_clock):
+        metrics = make_metrics(fake_clock)
+        for _ in range(30):
+            metrics.record("GET", API + "me/player", 200, 0.05)
+        fake_clock.now += 120
+        assert metrics.snapshot()["endpoints"]["GET /v1/me/player"]["calls_per_min"] == 15.0
+
+    def test_reset(self, fake_clock):
+        metrics = make_metrics(fake_clock)
+        metrics.record("GET", API + "me/player", 200, 0.05)
+        metrics.reset()
+        assert metrics.snapshot()["endpoints"] == {}
+
+    def test_snapshot_is_json(self, fake_clock):
+        metrics = make_metrics(fake_clock)
+        metrics.record("GET", API + "me/player", 200, 0.05)
+        assert json.loads(metrics.to_json())["calls"] == 1
+
+
+class TestExport:
+    def test_prometheus_histogram(self, fake_clock):
+        metrics = make_metrics(fake_clock)
+        for seconds in (0.004, 0.03, 0.03, 3.0):
+            metrics.record("GET", API + "me/player", 200, seconds, bytes_in=10)
+        text = metrics.to_prometheus()
+        labels = 'method="GET",endpoint="/v1/me/player"'
+        assert f"spotuipy_api_requests_total{{{labels},status=\"200\"}} 4" in text
+        assert f"spotuipy_api_response_bytes_total{{{labels}}} 40" in text
+        assert f'spotuipy_api_request_duration_seconds_bucket{{{labels},le="0.005"}} 1' in text
+        assert f'spotuipy_api_request_duration_seconds_bucket{{{labels},le="0.05"}} 3' in text
+        assert f'spotuipy_api_request_duration_seconds_bucket{{{labels},le="+Inf"}} 4' in text
+        assert f"spotuipy_api_request_duration_seconds_count{{{labels}}} 4" in text
+        assert "# TYPE spotuipy_api_request_duration_seconds histogram" in text
+        assert text.endswith("\n")
+
+    def test_every_sample_line_is_name_labels_value(self, fake_clock):
+        metrics = make_metrics(fake_clock)
+        metrics.record("GET", "https://i.scdn.co/image/x", 200, 0.1, bytes_in=5000)
+        for line in metrics.to_prometheus().splitlines():
+            if line.startswith("#"):
+                continue
+            name_and_labels, value = line.rsplit(" ", 1)
+            float(value)
+            assert name_and_labels.endswith("}")
+
+    def test_export_format_follows_suffix(self, tmp_path, fake_clock):
+        metrics = make_metrics(fake_clock)
+        metrics.record("GET", API + "me/player", 200, 0.05)
+        metrics.export(tmp_path / "spotuipy.prom")
+        metrics.export(tmp_path / "spotuipy.json")
+        assert (tmp_path / "spotuipy.prom").read_text().startswith("# HELP")
+        assert json.loads((tmp_path / "spotuipy.json").read_text())["calls"] == 1
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["spotuipy.json", "spotuipy.prom"]
@@ -0,0 +1,49 @@
+"""Smoke tests for the micro-benchmark suite.
+
+The suite is only useful if it keeps running against the real functions as
+they change, so this runs every case at a tiny size. The contracts: every
+case reports throughput and allocations, and the synthetic poll stream
+exercises natural ends, skips and stops.
+"""
+
+from benchmarks.micro import poll_events, run, tracks_page
+from tools.playback_state import PlaybackState
+from tools.track_loading import load_tracks
+
+
+class TestSyntheticData:
+    def test_tracks_page_loads(self):
+        tables = {}
+        rows, _ = load_tracks(tracks_page(50), "p", tables)
+        assert len(rows) == 50
+        assert len(tables["p"]) == 50
+
+    def test_poll_stream_has_ends_skips_and_stops(self):
+        state = PlaybackState()
+        ended = stopped = 0
+        events = poll_events(5000)
+        for event in events:
+            e, s = state.update(event)
+            ended += e is not None
+            stopped += s
+        assert len(events) == 5000
+        assert ended > 0
+        assert stopped > 0
+        # Every fifth track is skipped halfway, so not every track ends.
+        tracks = {e["item"]["uri"] for e in events if e}
+        assert ended < len(tracks)
+
+
+class TestRun:
+    def test_every_case_reports(self):
+        results = run(sizes=[20], events=500, repeat=1, min_time=0, progress=lambda _: None)
+        assert "load_tracks[n=20]" in results
+        assert "PlaybackState.update[events=500]" in results
+        for result in results.values():
+            assert result["items_per_s"] > 0
+            assert result["alloc_peak_bytes"] >= 0
+
+    def test_only_filters_cases(self):
+        results = run(sizes=[20], events=0, only="by_uri", repeat=1,
+                      min_time=0, progress=lambda _: None)
+        assert list(results) == ["PlaylistTracks.by_uri[n=20]"]
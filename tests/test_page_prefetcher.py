@@ -0,0 +1,121 @@
+"""Tests for PagePrefetcher, the background fetch of the next playlist page.
+
+The fetch function is injected, so these use a fake that records calls and can
+be held open with an Event to simulate a slow request. What matters to the
+player: the next page is fetched once, take() hands back the prefetched result
+instead of fetching again, and a failed, queued or stalled prefetch still
+yields a page without the caller waiting on the prefetch lane.
+"""
+
+import threading
+import time
+
+from spotify_player.page_prefetcher import PagePrefetcher
+
+
+def page(n, has_next=True):
+    return {"items": [n], "next": f"http://page/{n + 1}" if has_next else None}
+
+
+class FakeFetch:
+    def __init__(self, fail_first=False, hold_first=False):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+        self.fail_first = fail_first
+        self.hold_first = hold_first
+
+    def __call__(self, playlist_name, current):
+        self.calls.append((playlist_name, current["next"]))
+        if len(self.calls) == 1 or not self.hold_first:
+            self.release.wait(timeout=5)
+        if self.fail_first and len(self.calls) == 1:
+            raise RuntimeError("network down")
+        return page(current["items"][0] + 1)
+
+
+class TestPrefetch:
+    def test_take_uses_prefetched_page(self):
+        fetch = FakeFetch()
+        prefetcher = PagePrefetcher(fetch)
+        prefetcher.prefetch("Mix", page(0))
+        assert prefetcher.take("Mix", page(0)) == page(1)
+        assert len(fetch.calls) == 1
+
+    def test_prefetch_twice_fetches_once(self):
+        fetch = FakeFetch()
+        fetch.release.clear()
+        prefetcher = PagePrefetcher(fetch)
+        prefetcher.prefetch("Mix", page(0))
+        prefetcher.prefetch("Mix", page(0))
+        fetch.release.set()
+        prefetcher.take("Mix", page(0))
+        assert len(fetch.calls) == 1
+
+    def test_take_waits_for_in_flight_prefetch(self):
+        fetch = FakeFetch()
+        fetch.release.clear()
+        prefetcher = PagePrefetcher(fetch)
+        prefetcher.prefetch("Mix", page(0))
+        threading.Timer(0.05, fetch.release.set).start()
+        assert prefetcher.take("Mix", page(0)) == page(1)
+        assert len(fetch.calls) == 1
+
+    def test_take_without_prefetch_fetches_directly(self):
+        fetch = FakeFetch()
+        prefetcher = PagePrefetcher(fetch)
+        assert prefetcher.take("Mix", page(3)) == page(4)
+        assert len(fetch.calls) == 1
+
+    def test_failed_prefetch_falls_back_to_direct_fetch(self):
+        fetch = FakeFetch(fail_first=True)
+        prefetcher = PagePrefetcher(fetch)
+        prefetcher.prefetch("Mix", page(0))
+        assert prefetcher.take("Mix", page(0)) == page(1)
+        assert len(fetch.calls) == 2
+
+
+class TestUserWaiting:
+    def test_stalled_prefetch_is_not_waited_out(self):
+        fetch = FakeFetch(hold_first=True)
+        fetch.release.clear()
+        prefetcher = PagePrefetcher(fetch)
+        prefetcher.prefetch("Mix", page(0))
+        started = time.monotonic()
+        assert prefetcher.take("Mix", page(0)) == page(1)
+        assert time.monotonic() - started < 2
+        assert len(fetch.calls) == 2
+        fetch.release.set()
+
+    def test_queued_prefetch_is_cancelled_and_fetched_directly(self):
+        fetch = FakeFetch(hold_first=True)
+        fetch.release.clear()
+        prefetcher = PagePrefetcher(fetch, max_workers=1)
+        prefetcher.prefetch("Mix", page(0))
+        prefetcher.prefetch("Chill", page(0))
+        # Chill's prefetch is queued behind Mix's, which is stuck.
+        assert prefetcher.take("Chill", page(0)) == page(1)
+        assert fetch.calls.count(("Chill", "http://page/1")) == 1
+        fetch.release.set()
+
+
+class TestLastPage:
+    def test_no_next_means_nothing_to_fetch(self):
+        fetch = FakeFetch()
+        prefetcher = PagePrefetcher(fetch)
+        prefetcher.prefetch("Mix", page(9, has_next=False))
+        assert prefetcher.take("Mix", page(9, has_next=False)) is None
+        assert fetch.calls == []
+
+
+class TestDiscard:
+    def test_discard_drops_other_playlists(self):
+        fetch = FakeFetch()
+        prefetcher = PagePrefetcher(fetch)
+        prefetcher.prefetch("Mix", page(0))
+        prefetcher.prefetch("Chill", page(0))
+        prefetcher.discard(keep_playlist="Chill")
+        assert prefetcher.take("Mix", page(0)) == page(1)
+        assert prefetcher.take("Chill", page(0)) == page(1)
+        # "Chill" reused its prefetch rather than fetching a second time.
+        assert fetch.calls.count(("Chill", "http://page/1")) == 1
@@ -0,0 +1,113 @@
+"""Tests for the concurrent pagination helpers.
+
+fetch_page is a fake that can hold individual offsets back, so these check
+ordering rather than timing. The contracts: every remaining offset is fetched
+exactly once, pages come back in offset order however they finish, and the
+streaming variant hands out the early pages before the later ones arrive,
+each fetch runs in the caller's request lane, and merged pages read as one
+page holding the whole list.
+"""
+
+import threading
+
+from spotify_api.request_scheduler import Priority, current_priority, request_priority
+from tools.paging import fetch_remaining_pages, iter_remaining_pages, merge_pages
+
+
+def first_page(total, limit=50):
+    return {"items": [None] * min(limit, total), "offset": 0, "limit": limit,
+            "total": total}
+
+
+class FakePages:
+    def __init__(self):
+        self.calls = []
+        self.held = {}
+        self.lock = threading.Lock()
+
+    def hold(self, offset):
+        self.held[offset] = threading.Event()
+
+    def release(self, offset):
+        self.held[offset].set()
+
+    def __call__(self, offset, limit):
+        with self.lock:
+            self.calls.append((offset, limit))
+        if offset in self.held:
+            self.held[offset].wait(timeout=5)
+        return {"offset": offset, "limit": limit}
+
+
+class TestFetchRemaining:
+    def test_fetches_each_remaining_offset_once(self):
+        pages = FakePages()
+        result = fetch_remaining_pages(first_page(220), pages)
+        assert sorted(pages.calls) == [(50, 50), (100, 50), (150, 50), (200, 50)]
+        assert [p["offset"] for p in result] == [50, 100, 150, 200]
+
+    def test_single_page_fetches_nothing(self):
+        pages = FakePages()
+        assert fetch_remaining_pages(first_page(30), pages) == []
+        assert pages.calls == []
+
+    def test_order_kept_when_early_page_is_slow(self):
+        pages = FakePages()
+        pages.hold(50)
+        threading.Timer(0.05, pages.release, args=(50,)).start()
+        result = fetch_remaining_pages(first_page(200), pages)
+        assert [p["offset"] for p in result] == [50, 100, 150]
+
+
+class TestIterRemaining:
+    def test_streams_early_pages_before_late_ones_arrive(self):
+        pages = FakePages()
+        pages.hold(150)
+        stream = iter_remaining_pages(first_page(200), pages)
+        assert next(stream)["offset"] == 50
+        assert next(stream)["offset"] == 100
+        pages.release(150)
+        assert next(stream)["offset"] == 150
+        assert list(stream) == []
+
+    def test_all_pages_requested_up_front(self):
+        pages = FakePages()
+        pages.hold(50)
+        stream = iter_remaining_pages(first_page(200), pages, max_workers=4)
+        threading.Timer(0.1, pages.release, args=(50,)).start()
+        next(stream)
+        assert sorted(o for o, _ in pages.calls) == [50, 100, 150]
+        list(stream)
+
+    def test_fetches_run_in_the_callers_lane(self):
+        lanes = []
+
+        def fetch(offset, limit):
+            lanes.append(current_priority())
+            return {"offset": offset}
+
+        with request_priority(Priority.PREFETCH):
+            fetch_remaining_pages(first_page(200), fetch)
+        assert lanes == [Priority.PREFETCH] * 3
+
+
+class TestMergePages:
+    def test_items_in_page_order(self):
+        first = {"items": [0, 1], "offset": 0, "limit": 2, "total": 5,
+                 "next": "http://page/2", "href": "http://page/0"}
+        rest = [{"items": [2, 3]}, {"items": [4]}]
+        merged = merge_pages(first, rest)
+        assert merged["items"] == [0, 1, 2, 3, 4]
+        assert merged["limit"] == 5
+        assert merged["next"] is None
+        assert merged["offset"] == 0
+        assert merged["href"] == "http://page/0"
+
+    def test_first_page_left_alone(self):
+        first = {"items": [0], "limit": 1, "next": "http://page/1"}
+        merge_pages(first, [{"items": [1]}])
+        assert first == {"items": [0], "limit": 1, "next": "http://page/1"}
+
+    def test_no_more_pages(self):
+        first = {"items": [0, 1], "limit": 2, "next": None}
+        assert merge_pages(first, [])["items"] == [0, 1]
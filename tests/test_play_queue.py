@@ -0,0 +1,160 @@
+"""Tests for PlayQueue, the cursor-based queue behind next/previous.
+
+PlayQueue runs over real PlaylistTracks collections, so these build small
+playlists and step through them. The contracts: next/previous move a cursor
+without copying the playlist, hand-queued tracks play first and don't lose
+the playlist position (even when they come from the same playlist), jumps
+go into history, and the ends of the playlist return None so the player can
+load the next page.
+"""
+
+from tools.play_queue import PlayQueue
+from tools.track import PlaylistTracks, Track
+
+
+def make_playlist(*names):
+    pt = PlaylistTracks()
+    for i, name in enumerate(names):
+        pt.append(Track(uri=f"uri:{name}", name=name, artist="Artist",
+                        album="Album", duration_ms=1000, row_index=i))
+    return pt
+
+
+class TestCursor:
+    def test_next_walks_the_playlist(self):
+        pt = make_playlist("a", "b", "c")
+        q = PlayQueue()
+        q.set_source("mix", pt, 0)
+        assert q.next().name == "b"
+        assert q.next().name == "c"
+        assert q.next() is None
+        assert q.current.name == "c"
+
+    def test_previous_steps_back_without_history(self):
+        pt = make_playlist("a", "b", "c")
+        q = PlayQueue()
+        q.set_source("mix", pt, 2)
+        assert q.previous().name == "b"
+        assert q.previous().name == "a"
+        assert q.previous() is None
+
+    def test_len_counts_the_rest_of_the_source(self):
+        pt = make_playlist("a", "b", "c", "d")
+        q = PlayQueue()
+        q.set_source("mix", pt, 1)
+        assert len(q) == 2
+
+    def test_set_source_swaps_pages_without_history(self):
+        q = PlayQueue()
+        q.set_source("mix", make_playlist("a", "b"), 1)
+        q.set_source("mix", make_playlist("c", "d"), 0)
+        assert q.current.name == "c"
+        assert q.previous() is None
+
+    def test_replace_tracks_continues_into_the_longer_copy(self):
+        page = make_playlist("a", "b")
+        whole = make_playlist("a", "b", "c")
+        q = PlayQueue()
+        q.set_source("mix", page, 0)
+        assert q.next().name == "b"
+        q.enqueue(make_playlist("x").by_index(0))
+        assert q.next().name == "x"
+        assert q.next() is None
+        q.replace_tracks("mix", whole)
+        assert q.next().name == "c"
+
+    def test_replace_tracks_ignores_other_playlists(self):
+        q = PlayQueue()
+        q.set_source("mix", make_playlist("a"), 0)
+        q.replace_tracks("chill", make_playlist("a", "b"))
+        assert q.next() is None
+
+    def test_large_playlist_jump_is_positional(self):
+        pt = make_playlist(*[str(i) for i in range(5000)])
+        q = PlayQueue()
+        assert q.play_from("big", pt, 4998).name == "4998"
+        assert q.next().name == "4999"
+        assert len(q) == 0
+
+
+class TestHistory:
+    def test_previous_returns_to_the_track_before_a_jump(self):
+        pt = make_playlist("a", "b", "c", "d")
+        q = PlayQueue()
+        q.play_from("mix", pt, 0)
+        q.play_from("mix", pt, 3)
+        assert q.previous().name == "a"
+        assert q.next().name == "b"
+
+    def test_history_crosses_playlists(self):
+        q = PlayQueue()
+        q.play_from("one", make_playlist("a", "b"), 1)
+        q.play_from("two", make_playlist("x", "y"), 0)
+        assert q.previous().name == "b"
+        assert q.playlist == "one"
+
+    def test_history_is_bounded(self):
+        pt = make_playlist(*[str(i) for i in range(10)])
+        q = PlayQueue(history_size=3)
+        q.set_source("mix", pt, 0)
+        for _ in range(9):
+            q.next()
+        back = [q.previous().name for _ in range(3)]
+        assert back == ["8", "7", "6"]
+
+
+class TestQueuedTracks:
+    def test_queued_tracks_play_first_then_playlist_resumes(self):
+        pt = make_playlist("a", "b", "c")
+        other = make_playlist("x", "y")
+        q = PlayQueue()
+        q.set_source("mix", pt, 0)
+        q.enqueue(other.by_index(0))
+        q.enqueue(other.by_index(1))
+        assert len(q) == 4
+        assert q.next().name == "x"
+        assert q.next().name == "y"
+        assert q.next().name == "b"
+
+    def test_queued_track_from_the_same_playlist_keeps_the_cursor(self):
+        pt = make_playlist(*(f"t{i}" for i in range(60)))
+        q = PlayQueue()
+        q.set_source("mix", pt, 10)
+        q.enqueue(pt.by_index(50))
+        assert q.next().name == "t50"
+        assert q.from_queue
+        # The player re-points the cursor at the playing track only when it
+        # didn't come from the queue.
+        if not q.from_queue:
+            q.set_source("mix", pt, pt.index_of_uri(q.current.uri))
+        assert q.next().name == "t11"
+        assert not q.from_queue
+
+    def test_previous_restores_from_queue(self):
+        pt = make_playlist("a", "b", "c")
+        q = PlayQueue()
+        q.set_source("mix", pt, 0)
+        q.enqueue(pt.by_index(2))
+        q.next()
+        q.next()
+        assert q.previous().name == "c"
+        assert q.from_queue
+        assert q.next().name == "b"
+
+    def test_previous_after_queued_track(self):
+        pt = make_playlist("a", "b")
+        q = PlayQueue()
+        q.set_source("mix", pt, 0)
+        q.enqueue(make_playlist("x").by_index(0))
+        q.next()
+        assert q.previous().name == "a"
+        assert q.next().name == "b"
+
+
+class TestEmpty:
+    def test_nothing_loaded(self):
+        q = PlayQueue()
+        assert q.next() is None
+        assert q.previous() is None
+        assert q.current is None
+        assert len(q) == 0
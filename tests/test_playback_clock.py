@@ -0,0 +1,193 @@
+"""Tests for PlaybackClock, the derived playback position shared by the
+progress bar, the seek scrubber and natural-end detection.
+
+The clock is injectable, so these drive it with a fake one. The contracts:
+position is anchored at the middle of each poll's round trip and derived
+from elapsed time, not accumulated; small disagreements are drift and never
+move a playing track backwards; a new track, a play/pause change, a new
+Spotify timestamp or a large jump re-anchor outright; local seeks and
+pauses move the clock at once; and position_before tells where the old
+track had got to when a new one started, however sparse the polls.
+"""
+
+from tools.playback_clock import SNAP_MS, PlaybackClock
+from tools.playback_state import PlaybackState
+
+DURATION = 200_000
+
+
+def make_clock(clock):
+    return PlaybackClock(clock=clock)
+
+
+def playback(uri="spotify:track:a", progress_ms=10_000, playing=True,
+             timestamp=1, duration_ms=DURATION):
+    return {
+        "is_playing": playing,
+        "progress_ms": progress_ms,
+        "timestamp": timestamp,
+        "item": {"uri": uri, "duration_ms": duration_ms},
+    }
+
+
+def poll(clock, fake, response, rtt_s=0.2):
+    """Sync as if the request went out now and took rtt_s."""
+    sent = fake.now
+    fake.now += rtt_s
+    clock.sync(response, sent, fake.now)
+
+
+class TestAnchoring:
+    def test_starts_at_zero(self, fake_clock):
+        clock = make_clock(fake_clock)
+        assert clock.position_ms() == 0
+        assert clock.uri is None
+
+    def test_compensates_half_the_round_trip(self, fake_clock):
+        clock = make_clock(fake_clock)
+        poll(clock, fake_clock, playback(progress_ms=10_000), rtt_s=0.4)
+        assert abs(clock.rtt_s - 0.4) < 1e-9
+        # Measured 0.2s ago, at the middle of the round trip.
+        assert clock.position_ms() == 10_200
+
+    def test_position_is_derived_from_elapsed_time(self, fake_clock):
+        clock = make_clock(fake_clock)
+        poll(clock, fake_clock, playback(progress_ms=10_000), rtt_s=0)
+        fake_clock.now += 7.25
+        assert clock.position_ms() == 17_250
+        assert clock.remaining_ms() == DURATION - 17_250
+
+    def test_clamped_to_the_track(self, fake_clock):
+        clock = make_clock(fake_clock)
+        poll(clock, fake_clock, playback(progress_ms=DURATION - 500), rtt_s=0)
+        fake_clock.now += 10
+        assert clock.position_ms() == DURATION
+        assert clock.remaining_ms() == 0
+
+    def test_paused_track_stands_still(self, fake_clock):
+        clock = make_clock(fake_clock)
+        poll(clock, fake_clock, playback(progress_ms=42_000, playing=False))
+        fake_clock.now += 30
+        assert clock.position_ms() == 42_000
+
+    def test_nothing_playing_resets(self, fake_clock):
+        clock = make_clock(fake_clock)
+        poll(clock, fake_clock, playback())
+        poll(clock, fake_clock, None)
+        assert clock.uri is None
+        assert clock.position_ms() == 0
+
+
+class TestDrift:
+    def test_small_lag_holds_instead_of_stepping_back(self, fake_clock):
+        clock = make_clock(fake_clock)
+        poll(clock, fake_clock, playback(progress_ms=10_000), rtt_s=0)
+        fake_clock.now += 5
+        shown = clock.position_ms()
+        assert shown == 15_000
+        # Spotify says we're 400ms behind what's on screen.
+        poll(clock, fake_clock, playback(progress_ms=14_600), rtt_s=0)
+        assert clock.position_ms() == 15_000
+        fake_clock.now += 0.2
+        assert clock.position_ms() == 15_000
+        fake_clock.now += 0.4
+        assert clock.position_ms() == 15_200
+
+    def test_small_lead_is_followed(self, fake_clock):
+        clock = make_clock(fake_clock)
+        poll(clock, fake_clock, playback(progress_ms=10_000), rtt_s=0)
+        fake_clock.now += 5
+        poll(clock, fake_clock, playback(progress_ms=15_300), rtt_s=0)
+        assert clock.position_ms() == 15_300
+
+    def test_large_jump_snaps(self, fake_clock):
+        clock = make_clock(fake_clock)
+        poll(clock, fake_clock, playback(progress_ms=60_000), rtt_s=0)
+        fake_clock.now += 1
+        poll(clock, fake_clock, playback(progress_ms=61_000 - SNAP_MS - 500), rtt_s=0)
+        assert clock.position_ms() == 61_000 - SNAP_MS - 500
+
+    def test_new_timestamp_snaps(self, fake_clock):
+        # A small seek back made on another device.
+        clock = make_clock(fake_clock)
+        poll(clock, fake_clock, playback(progress_ms=60_000), rtt_s=0)
+        fake_clock.now += 1
+        poll(clock, fake_clock, playback(progress_ms=60_500, timestamp=2), rtt_s=0)
+        assert clock.position_ms() == 60_500
+
+    def test_new_track_snaps(self, fake_clock):
+        clock = make_clock(fake_clock)
+        poll(clock, fake_clock, playback(progress_ms=60_000), rtt_s=0)
+        poll(clock, fake_clock, playback(uri="spotify:track:b", progress_ms=300), rtt_s=0)
+        assert clock.uri == "spotify:track:b"
+        assert clock.position_ms() == 300
+
+
+class TestLocalCommands:
+    def test_seek_moves_at_once(self, fake_clock):
+        clock = make_clock(fake_clock)
+        poll(clock, fake_clock, playback(progress_ms=60_000), rtt_s=0)
+        clock.seek(30_000)
+        assert clock.position_ms() == 30_000
+        fake_clock.now += 2
+        assert clock.position_ms() == 32_000
+
+    def test_pause_and_resume(self, fake_clock):
+        clock = make_clock(fake_clock)
+        poll(clock, fake_clock, playback(progress_ms=60_000), rtt_s=0)
+        fake_clock.now += 1
+        clock.pause()
+        fake_clock.now += 20
+        assert clock.position_ms() == 61_000
+        clock.resume()
+        fake_clock.now += 1
+        assert clock.position_ms() == 62_000
+
+    def test_resume_without_a_track_does_nothing(self, fake_clock):
+        clock = make_clock(fake_clock)
+        clock.resume()
+        fake_clock.now += 5
+        assert clock.position_ms() == 0
+
+
+class TestPositionBefore:
+    def test_unknown_before_any_track(self, fake_clock):
+        clock = make_clock(fake_clock)
+        assert clock.position_before(playback(), fake_clock.now, fake_clock.now) is None
+
+    def test_old_track_ran_out_between_sparse_polls(self, fake_clock):
+        # Last seen 20s from the end; the next poll, 25s later, finds the
+        # next track 5s in. The old track had reached its end.
+        clock = make_clock(fake_clock)
+        poll(clock, fake_clock, playback(progress_ms=DURATION - 20_000), rtt_s=0)
+        fake_clock.now += 25
+        response = playback(uri="spotify:track:b", progress_ms=5_000)
+        assert clock.position_before(response, fake_clock.now, fake_clock.now) == DURATION
+
+    def test_old_track_skipped_midway(self, fake_clock):
+        # Same gap, but the new track is 20s in: it replaced the old one
+        # 5s after the last poll, well before the end.
+        clock = make_clock(fake_clock)
+        poll(clock, fake_clock, playback(progress_ms=DURATION - 20_000), rtt_s=0)
+        fake_clock.now += 25
+        response = playback(uri="spotify:track:b", progress_ms=20_000)
+        assert clock.position_before(response, fake_clock.now, fake_clock.now) == DURATION - 15_000
+
+    def test_same_track_uses_reported_progress(self, fake_clock):
+        clock = make_clock(fake_clock)
+        poll(clock, fake_clock, playback(progress_ms=50_000), rtt_s=0)
+        fake_clock.now += 30
+        paused = playback(progress_ms=52_000, playing=False)
+        assert clock.position_before(paused, fake_clock.now, fake_clock.now) == 52_000
+
+    def test_feeds_natural_end_detection(self, fake_clock):
+        clock = make_clock(fake_clock)
+        state = PlaybackState()
+        first = playback(progress_ms=DURATION - 20_000)
+        state.update(first)
+        poll(clock, fake_clock, first, rtt_s=0)
+        fake_clock.now += 25
+        nxt = playback(uri="spotify:track:b", progress_ms=5_000)
+        ended, _ = state.update(nxt, clock.position_before(nxt, fake_clock.now, fake_clock.now))
+        # The last sample alone (20s from the end) would have missed it.
+        assert ended == "spotify:track:a"
@@ -0,0 +1,81 @@
+"""Tests for PlaybackConfirmations, the futures behind play-command confirmation.
+
+PlaybackConfirmations is pure Python with an injectable clock. The contracts:
+observing the expected track resolves its futures with True (and reports that
+it confirmed something), other tracks leave them pending, expectations that
+outlive their timeout resolve with False, and a waiter on another thread is
+woken by observe() without polling.
+"""
+
+import threading
+
+from tools.playback_confirm import PlaybackConfirmations
+
+
+def make_confirmations(clock):
+    return PlaybackConfirmations(clock=clock)
+
+
+class TestObserve:
+    def test_matching_uri_confirms(self, fake_clock):
+        conf = make_confirmations(fake_clock)
+        future = conf.expect("spotify:track:a")
+        assert conf.pending()
+        assert conf.observe("spotify:track:a") is True
+        assert future.result(timeout=0) is True
+        assert not conf.pending()
+
+    def test_other_uri_leaves_expectation_pending(self, fake_clock):
+        conf = make_confirmations(fake_clock)
+        future = conf.expect("spotify:track:a")
+        assert conf.observe("spotify:track:b") is False
+        assert not future.done()
+        assert conf.pending()
+
+    def test_all_waiters_for_a_track_are_confirmed(self, fake_clock):
+        conf = make_confirmations(fake_clock)
+        futures = [conf.expect("spotify:track:a") for _ in range(3)]
+        conf.observe("spotify:track:a")
+        assert all(f.result(timeout=0) for f in futures)
+
+    def test_observe_without_expectations_reports_nothing(self, fake_clock):
+        conf = make_confirmations(fake_clock)
+        assert conf.observe("spotify:track:a") is False
+
+
+class TestTimeout:
+    def test_expired_expectation_resolves_false(self, fake_clock):
+        conf = make_confirmations(fake_clock)
+        future = conf.expect("spotify:track:a", timeout=5)
+        fake_clock.now += 5.1
+        assert not conf.pending()
+        assert future.result(timeout=0) is False
+
+    def test_late_observation_does_not_confirm_expired(self, fake_clock):
+        conf = make_confirmations(fake_clock)
+        future = conf.expect("spotify:track:a", timeout=5)
+        fake_clock.now += 6
+        conf.pending()
+        assert conf.observe("spotify:track:a") is False
+        assert future.result(timeout=0) is False
+
+    def test_discard_resolves_false_and_clears(self, fake_clock):
+        conf = make_confirmations(fake_clock)
+        future = conf.expect("spotify:track:a")
+        conf.discard(future)
+        assert future.result(timeout=0) is False
+        assert not conf.pending()
+        conf.observe("spotify:track:a")
+        assert future.result(timeout=0) is False
+
+
+class TestThreads:
+    def test_waiter_on_worker_thread_is_woken_by_observe(self, fake_clock):
+        conf = make_confirmations(fake_clock)
+        future = conf.expect("spotify:track:a")
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(future.result(5)))
+        waiter.start()
+        conf.observe("spotify:track:a")
+        waiter.join(timeout=5)
+        assert results == [True]
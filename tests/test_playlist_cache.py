@@ -0,0 +1,109 @@
+"""Tests for the on-disk playlist cache.
+
+PlaylistCache only depends on sqlite3, so these run against a real database in
+a temporary directory. The contracts that matter to the player: a page stored
+under a snapshot comes back in the shape load_tracks expects, a different
+snapshot is a miss, and storing under a new snapshot drops the old rows.
+"""
+
+from tools.playlist_cache import PlaylistCache
+
+
+def make_page(uris, offset=0, limit=100, total=None, next_url=None):
+    return {
+        "items": [
+            {
+                "track": {
+                    "uri": uri,
+                    "name": f"Song {uri}",
+                    "artists": [{"name": "Artist"}, {"name": "Featured"}],
+                    "album": {"name": "Album", "images": []},
+                    "duration_ms": 180000,
+                }
+            }
+            for uri in uris
+        ],
+        "offset": offset,
+        "limit": limit,
+        "total": total if total is not None else len(uris),
+        "next": next_url,
+    }
+
+
+def make_cache(tmp_path):
+    return PlaylistCache(tmp_path / "playlists.sqlite3")
+
+
+class TestRoundTrip:
+    def test_page_comes_back_in_spotify_shape(self, tmp_path):
+        cache = make_cache(tmp_path)
+        cache.put_page("pl1", "snap1", make_page(["uri:a", "uri:b"]))
+        page = cache.get_page("pl1", "snap1")
+        assert [i["track"]["uri"] for i in page["items"]] == ["uri:a", "uri:b"]
+        track = page["items"][0]["track"]
+        assert track["name"] == "Song uri:a"
+        assert track["artists"][0]["name"] == "Artist"
+        assert track["album"]["name"] == "Album"
+        assert track["duration_ms"] == 180000
+
+    def test_offsets_select_the_right_page(self, tmp_path):
+        cache = make_cache(tmp_path)
+        cache.put_page("pl1", "snap1", make_page(
+            ["uri:a", "uri:b"], limit=2, total=3, next_url="http://next"))
+        cache.put_page("pl1", "snap1", make_page(
+            ["uri:c"], offset=2, limit=2, total=3))
+        first = cache.get_page("pl1", "snap1", 0)
+        second = cache.get_page("pl1", "snap1", 2)
+        assert first["next"] == "http://next"
+        assert [i["track"]["uri"] for i in second["items"]] == ["uri:c"]
+        assert second["offset"] == 2
+        assert second["total"] == 3
+
+    def test_survives_reopen(self, tmp_path):
+        make_cache(tmp_path).put_page("pl1", "snap1", make_page(["uri:a"]))
+        assert make_cache(tmp_path).get_page("pl1", "snap1") is not None
+
+    def test_null_tracks_are_skipped(self, tmp_path):
+        cache = make_cache(tmp_path)
+        page = make_page(["uri:a"])
+        page["items"].append({"track": None})
+        cache.put_page("pl1", "snap1", page)
+        assert len(cache.get_page("pl1", "snap1")["items"]) == 1
+
+
+class TestSnapshots:
+    def test_other_snapshot_is_a_miss(self, tmp_path):
+        cache = make_cache(tmp_path)
+        cache.put_page("pl1", "snap1", make_page(["uri:a"]))
+        assert cache.get_page("pl1", "snap2") is None
+
+    def test_missing_snapshot_is_a_miss(self, tmp_path):
+        cache = make_cache(tmp_path)
+        cache.put_page("pl1", "snap1", make_page(["uri:a"]))
+        assert cache.get_page("pl1", None) is None
+
+    def test_new_snapshot_replaces_old_rows(self, tmp_path):
+        cache = make_cache(tmp_path)
+        cache.put_page("pl1", "snap1", make_page(["uri:a"], limit=1))
+        cache.put_page("pl1", "snap1", make_page(["uri:b"], offset=1, limit=1))
+        cache.put_page("pl1", "snap2", make_page(["uri:z"], limit=1))
+        assert cache.get_page("pl1", "snap1") is None
+        assert cache.get_page("pl1", "snap2", 1) is None
+
+
+class TestCompleteness:
+    def test_complete_only_when_every_page_is_stored(self, tmp_path):
+        cache = make_cache(tmp_path)
+        cache.put_page("pl1", "snap1", make_page(["uri:a", "uri:b"], limit=2,
+                                                 total=3))
+        assert not cache.is_complete("pl1", "snap1")
+        cache.put_page("pl1", "snap1", make_page(["uri:c"], offset=2, limit=2,
+                                                 total=3))
+        assert cache.is_complete("pl1", "snap1")
+        assert not cache.is_complete("pl1", "snap2")
+        assert cache.track_positions("pl1") == [
+            (0, "uri:a"), (1, "uri:b"), (2, "uri:c")
+        ]
+
+    def test_unknown_playlist_is_incomplete(self, tmp_path):
+        assert not make_cache(tmp_path).is_complete("nope", "snap1")
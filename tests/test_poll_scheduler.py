@@ -0,0 +1,76 @@
+"""Tests for PollScheduler, the adaptive poll interval used by PlaybackMonitor.
+
+The scheduler is pure and takes an injectable clock, so these drive it with a
+fake one. The contracts: fast polls after a command and near a track's end,
+slow polls mid-track timed to land just before the end (inside the monitor's
+3s natural-end window), and exponential back-off while idle.
+"""
+
+from tools.poll_scheduler import PollScheduler
+
+
+def make_scheduler(clock):
+    return PollScheduler(clock=clock)
+
+
+class TestPlaying:
+    def test_mid_track_polls_slowly(self, fake_clock):
+        sched = make_scheduler(fake_clock)
+        assert sched.next_interval(True, 30000, 200000) == PollScheduler.SLOW_S
+
+    def test_near_end_polls_fast(self, fake_clock):
+        sched = make_scheduler(fake_clock)
+        assert sched.next_interval(True, 198000, 200000) == PollScheduler.FAST_S
+
+    def test_slow_poll_lands_inside_natural_end_window(self, fake_clock):
+        sched = make_scheduler(fake_clock)
+        progress, duration = 195500, 200000
+        delay = sched.next_interval(True, progress, duration)
+        remaining_after = duration - (progress + delay * 1000)
+        assert 0 < remaining_after <= 3000
+
+    def test_never_faster_than_fast(self, fake_clock):
+        sched = make_scheduler(fake_clock)
+        assert sched.next_interval(True, 250000, 200000) == PollScheduler.FAST_S
+
+
+class TestIdle:
+    def test_backs_off_exponentially_to_cap(self, fake_clock):
+        sched = make_scheduler(fake_clock)
+        delays = [sched.next_interval(False) for _ in range(6)]
+        assert delays == [2.0, 4.0, 8.0, 16.0, 30.0, 30.0]
+
+    def test_playing_resets_back_off(self, fake_clock):
+        sched = make_scheduler(fake_clock)
+        sched.next_interval(False)
+        sched.next_interval(False)
+        sched.next_interval(True, 30000, 200000)
+        assert sched.next_interval(False) == PollScheduler.IDLE_MIN_S
+
+
+class TestCommands:
+    def test_command_forces_fast_polls_for_a_while(self, fake_clock):
+        sched = make_scheduler(fake_clock)
+        sched.next_interval(False)
+        sched.next_interval(False)
+        sched.notify_command()
+        assert sched.next_interval(False) == PollScheduler.FAST_S
+        assert sched.next_interval(True, 30000, 200000) == PollScheduler.FAST_S
+        fake_clock.now += PollScheduler.COMMAND_BOOST_S + 0.1
+        assert sched.next_interval(True, 30000, 200000) == PollScheduler.SLOW_S
+
+    def test_command_resets_idle_back_off(self, fake_clock):
+        sched = make_scheduler(fake_clock)
+        for _ in range(4):
+            sched.next_interval(False)
+        sched.notify_command()
+        fake_clock.now += PollScheduler.COMMAND_BOOST_S + 0.1
+        assert sched.next_interval(False) == PollScheduler.IDLE_MIN_S
+
+    def test_pending_confirmation_polls_fastest(self, fake_clock):
+        sched = make_scheduler(fake_clock)
+        sched.notify_command()
+        assert sched.next_interval(True, 30000, 200000, confirming=True) == (
+            PollScheduler.CONFIRM_S
+        )
+        assert sched.next_interval(False, confirming=True) == PollScheduler.CONFIRM_S
@@ -0,0 +1,83 @@
+"""Tests for ProgressFrame, the repaint decisions behind the progress ticker.
+
+The contracts: the time labels repaint only when their text changes (once a
+second while ticking), the bar only when it would move a half-cell or its
+total changes, and invalidate() forces the next call of each to repaint.
+Over a whole track at 10 ticks a second, only a small fraction of ticks
+repaint anything.
+"""
+
+from tools.render_budget import ProgressFrame, tick_ms
+
+WIDTH = 32  # Textual's default bar width
+
+
+class TestLabels:
+    def test_elapsed_repaints_once_a_second(self):
+        frame = ProgressFrame()
+        shown = [frame.elapsed_text(ms) for ms in range(0, 3000, 100)]
+        assert [t for t in shown if t is not None] == ["0:00", "0:01", "0:02"]
+
+    def test_total_repaints_only_on_change(self):
+        frame = ProgressFrame()
+        assert frame.total_text(200000) == "3:20"
+        assert frame.total_text(200000) is None
+        assert frame.total_text(200400) is None  # same text
+        assert frame.total_text(61000) == "1:01"
+
+
+class TestBar:
+    def test_first_paint_always(self):
+        assert ProgressFrame().bar_changed(0, 200000, WIDTH)
+
+    def test_repaints_per_half_cell(self):
+        frame = ProgressFrame()
+        total = 64_000  # one half-cell per second at 32 cells
+        changed = [frame.bar_changed(ms, total, WIDTH) for ms in range(0, 4000, 100)]
+        assert sum(changed) == 4
+        assert changed[0] and changed[10] and changed[20] and changed[30]
+
+    def test_total_change_repaints(self):
+        frame = ProgressFrame()
+        frame.bar_changed(0, 200000, WIDTH)
+        assert frame.bar_changed(0, 180000, WIDTH)
+
+    def test_unknown_width_repaints_every_change(self):
+        frame = ProgressFrame()
+        assert frame.bar_changed(100, 200000, 0)
+        assert frame.bar_changed(200, 200000, 0)
+        assert not frame.bar_changed(200, 200000, 0)
+
+    def test_past_the_end_is_full(self):
+        frame = ProgressFrame()
+        frame.bar_changed(200000, 200000, WIDTH)
+        assert not frame.bar_changed(250000, 200000, WIDTH)
+
+
+class TestBudget:
+    def test_invalidate_forces_repaint(self):
+        frame = ProgressFrame()
+        frame.bar_changed(5000, 200000, WIDTH)
+        frame.elapsed_text(5000)
+        frame.total_text(200000)
+        frame.invalidate()
+        assert frame.bar_changed(5000, 200000, WIDTH)
+        assert frame.elapsed_text(5000) == "0:05"
+        assert frame.total_text(200000) == "3:20"
+
+    def test_most_ticks_repaint_nothing(self):
+        frame = ProgressFrame()
+        total = 210_000
+        ticks = repaints = 0
+        for ms in range(0, total, tick_ms(10)):
+            ticks += 1
+            bar = frame.bar_changed(ms, total, WIDTH)
+            label = frame.elapsed_text(ms) is not None
+            repaints += bar or label
+        assert ticks == 2100
+        assert repaints <= 210 + 64
+
+    def test_tick_ms(self):
+        assert tick_ms(10) == 100
+        assert tick_ms(4) == 250
+        assert tick_ms(0) == 1000  # at least one frame a second
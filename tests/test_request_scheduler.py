@@ -0,0 +1,112 @@
+"""Tests for RequestScheduler, the token bucket every Web API request goes
+through.
+
+try_acquire() never blocks and the clock is injectable, so these step a fake
+clock instead of sleeping. The contracts: the bucket refills at `rate` up to
+`burst`, lower lanes leave tokens in reserve for user commands, nobody jumps
+ahead of a waiting user command, and a 429 holds every lane for Retry-After,
+up to a cap.
+"""
+
+from spotify_api.request_scheduler import (
+    MAX_RETRY_AFTER_S,
+    Priority,
+    RequestScheduler,
+    current_priority,
+    parse_retry_after,
+    request_priority,
+)
+
+
+def make_scheduler(clock, rate=5.0, burst=10):
+    return RequestScheduler(rate=rate, burst=burst, clock=clock)
+
+
+def drain(sched, priority):
+    taken = 0
+    while sched.try_acquire(priority) == 0:
+        taken += 1
+    return taken
+
+
+class TestTokenBucket:
+    def test_burst_then_wait(self, fake_clock):
+        sched = make_scheduler(fake_clock, rate=5, burst=3)
+        assert drain(sched, Priority.USER) == 3
+        assert sched.try_acquire(Priority.USER) > 0
+
+    def test_refills_at_rate(self, fake_clock):
+        sched = make_scheduler(fake_clock, rate=5, burst=3)
+        drain(sched, Priority.USER)
+        fake_clock.now += 0.2
+        assert sched.try_acquire(Priority.USER) == 0
+        assert sched.try_acquire(Priority.USER) > 0
+
+    def test_refill_caps_at_burst(self, fake_clock):
+        sched = make_scheduler(fake_clock, rate=5, burst=3)
+        drain(sched, Priority.USER)
+        fake_clock.now += 60
+        assert drain(sched, Priority.USER) == 3
+
+
+class TestLanes:
+    def test_background_leaves_reserve_for_user(self, fake_clock):
+        sched = make_scheduler(fake_clock, rate=5, burst=10)
+        taken = drain(sched, Priority.BACKGROUND)
+        assert taken == 10 - RequestScheduler.RESERVE[Priority.BACKGROUND]
+        # The user lane can still go immediately.
+        assert sched.try_acquire(Priority.USER) == 0
+
+    def test_prefetch_stops_before_background(self, fake_clock):
+        sched = make_scheduler(fake_clock, rate=5, burst=10)
+        drain(sched, Priority.PREFETCH)
+        assert sched.try_acquire(Priority.BACKGROUND) == 0
+
+    def test_nobody_goes_while_more_urgent_lane_waits(self, fake_clock):
+        sched = make_scheduler(fake_clock)
+        sched._enter(Priority.USER)
+        assert sched.try_acquire(Priority.BACKGROUND) > 0
+        assert sched.try_acquire(Priority.USER) == 0
+        sched._leave(Priority.USER)
+        assert sched.try_acquire(Priority.BACKGROUND) == 0
+
+    def test_acquire_returns_when_token_available(self, fake_clock):
+        sched = make_scheduler(fake_clock)
+        sched.acquire(Priority.USER)
+        assert sched.waiting()["USER"] == 0
+
+
+class TestRetryAfter:
+    def test_holds_every_lane_until_it_expires(self, fake_clock):
+        sched = make_scheduler(fake_clock)
+        sched.retry_after(3)
+        assert sched.try_acquire(Priority.USER) == 3
+        fake_clock.now += 3
+        # Bucket was emptied, so the user lane needs one refill interval.
+        assert sched.try_acquire(Priority.USER) > 0
+        fake_clock.now += 0.2
+        assert sched.try_acquire(Priority.USER) == 0
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("7") == 7.0
+        assert parse_retry_after(None) == 1.0
+        assert parse_retry_after("soon") == 1.0
+        assert parse_retry_after("-4") == 0.0
+        assert parse_retry_after("86400") == MAX_RETRY_AFTER_S
+
+
+class TestRequestPriority:
+    def test_context_sets_and_restores_lane(self):
+        assert current_priority() == Priority.INTERACTIVE
+        with request_priority(Priority.USER):
+            assert current_priority() == Priority.USER
+            with request_priority(Priority.PREFETCH):
+                assert current_priority() == Priority.PREFETCH
+            assert current_priority() == Priority.USER
+        assert current_priority() == Priority.INTERACTIVE
+
+    def test_try_acquire_uses_current_lane(self, fake_clock):
+        sched = make_scheduler(fake_clock, rate=5, burst=10)
+        with request_priority(Priority.PREFETCH):
+            taken = drain(sched, None)
+        assert taken == 10 - RequestScheduler.RESERVE[Priority.PREFETCH]
@@ -0,0 +1,161 @@
+"""Tests for SearchIndex, the in-memory search behind the "/" search box.
+
+SearchIndex is pure Python. The contracts: every term must match the name,
+artist or album (substring for three letters and up, word prefix below
+that), name matches rank first and results otherwise keep playlist order,
+near-miss spellings are found by the fuzzy tier, re-adding a position or
+replacing a playlist never leaves stale hits, playlists are told apart by
+id rather than name, reloading the same tracks doesn't grow the index, and
+a 50k-track index answers well inside the time budget.
+"""
+
+import random
+import string
+import time
+
+from tools.search_index import SearchIndex
+
+
+def make_index():
+    index = SearchIndex()
+    index.add("rock", "Rock", 0, "uri:africa", "Africa", "Toto", "Toto IV")
+    index.add("rock", "Rock", 1, "uri:rosanna", "Rosanna", "Toto", "Toto IV")
+    index.add("rock", "Rock", 2, "uri:hold", "Hold the Line", "Toto", "Toto")
+    index.add("pop", "Pop", 0, "uri:toxic", "Toxic", "Britney Spears", "In the Zone")
+    index.add("pop", "Pop", 1, "uri:africa", "Africa", "Toto", "Toto IV")
+    return index
+
+
+def uris(hits):
+    return [h.uri for h in hits]
+
+
+class TestMatching:
+    def test_substring_of_name(self):
+        assert uris(make_index().search("frica")) == ["uri:africa", "uri:africa"]
+
+    def test_every_term_must_match_some_field(self):
+        hits = make_index().search("toto line")
+        assert uris(hits) == ["uri:hold"]
+
+    def test_case_insensitive(self):
+        assert uris(make_index().search("BRITNEY")) == ["uri:toxic"]
+
+    def test_short_terms_match_word_prefixes(self):
+        hits = make_index().search("ho")
+        assert uris(hits) == ["uri:hold"]
+
+    def test_single_letters_are_ignored(self):
+        assert make_index().search("a") == []
+
+    def test_hits_carry_playlist_and_position(self):
+        hit = make_index().search("toxic")[0]
+        assert (hit.playlist, hit.position, hit.artist) == ("Pop", 0, "Britney Spears")
+
+
+class TestRanking:
+    def test_name_matches_come_before_other_fields(self):
+        index = SearchIndex()
+        index.add("p", "P", 0, "uri:album", "Intro", "Someone", "Zone Tracks")
+        index.add("p", "P", 1, "uri:name", "The Zone", "Someone", "Album")
+        assert uris(index.search("zone")) == ["uri:name", "uri:album"]
+
+    def test_results_keep_insertion_order_within_a_tier(self):
+        hits = make_index().search("toto")
+        assert [(h.playlist, h.position) for h in hits] == [
+            ("Rock", 0), ("Rock", 1), ("Rock", 2), ("Pop", 1)
+        ]
+
+    def test_limit(self):
+        assert len(make_index().search("toto", limit=2)) == 2
+
+
+class TestFuzzy:
+    def test_typo_still_finds_the_track(self):
+        assert "uri:rosanna" in uris(make_index().search("rosana"))
+
+    def test_exact_matches_rank_above_fuzzy(self):
+        index = SearchIndex()
+        index.add("p", "P", 0, "uri:fuzzy", "Rosana", "A", "B")
+        index.add("p", "P", 1, "uri:exact", "Rosanna", "A", "B")
+        assert uris(index.search("rosanna"))[0] == "uri:exact"
+
+    def test_unrelated_query_finds_nothing(self):
+        assert make_index().search("zzyzx") == []
+
+
+class TestUpdates:
+    def test_readding_a_position_replaces_it(self):
+        index = make_index()
+        index.add("rock", "Rock", 0, "uri:new", "Kyrie", "Mr. Mister", "Welcome")
+        assert "uri:africa" not in [h.uri for h in index.search("africa")
+                                    if h.playlist == "Rock"]
+        assert uris(index.search("kyrie")) == ["uri:new"]
+
+    def test_replace_playlist_drops_old_rows(self):
+        index = make_index()
+        index.replace_playlist("rock", "Rock", [(0, "uri:k", "Kyrie", "Mr. Mister", "Welcome")])
+        assert uris(index.search("rosanna")) == []
+        assert uris(index.search("kyrie")) == ["uri:k"]
+        assert len(index) == 3
+
+    def test_remove_playlist(self):
+        index = make_index()
+        index.remove_playlist("pop")
+        assert uris(index.search("britney")) == []
+
+    def test_same_name_playlists_stay_separate(self):
+        index = SearchIndex()
+        index.add("id1", "Mix", 0, "uri:a", "Africa", "Toto", "Toto IV")
+        index.add("id2", "Mix", 0, "uri:b", "Kyrie", "Mr. Mister", "Welcome")
+        index.replace_playlist("id2", "Mix", [(0, "uri:c", "Roxanne", "Police", "X")])
+        assert uris(index.search("africa")) == ["uri:a"]
+        assert uris(index.search("roxanne")) == ["uri:c"]
+
+    def test_reloading_the_same_page_does_not_grow(self):
+        index = make_index()
+        slots = len(index._hits)
+        for _ in range(3):
+            index.add("rock", "Rock", 0, "uri:africa", "Africa", "Toto", "Toto IV")
+            index.replace_playlist("pop", "Pop", [
+                (0, "uri:toxic", "Toxic", "Britney Spears", "In the Zone"),
+                (1, "uri:africa", "Africa", "Toto", "Toto IV"),
+            ])
+        assert len(index._hits) == slots
+
+    def test_replaced_slots_are_compacted(self):
+        index = SearchIndex()
+        index.COMPACT_MIN = 10
+        for round_ in range(20):
+            index.replace_playlist("p", "P", [
+                (i, f"uri:{round_}:{i}", f"Song {round_} {i}", "A", "B")
+                for i in range(5)])
+        assert len(index) == 5
+        assert len(index._hits) <= 5 + 10 + 5
+        # Order within the playlist survives the rebuild.
+        assert [h.position for h in index.search("song 19")] == [0, 1, 2, 3, 4]
+
+
+class TestScale:
+    def test_50k_tracks_answer_quickly(self):
+        rng = random.Random(7)
+        words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(6))
+                 for _ in range(5000)]
+
+        def phrase(n):
+            return " ".join(rng.choice(words) for _ in range(n))
+
+        artists = [phrase(2) for _ in range(2000)]
+        albums = [phrase(3) for _ in range(5000)]
+        index = SearchIndex()
+        for i in range(50000):
+            index.add(f"pl{i // 1000}", f"pl{i // 1000}", i % 1000, f"uri:{i}", phrase(3),
+                      rng.choice(artists), rng.choice(albums))
+        queries = [words[1][:4], words[2], words[3][:2], words[4] + "x",
+                   artists[0]]
+        start = time.perf_counter()
+        for query in queries:
+            index.search(query)
+        per_query = (time.perf_counter() - start) / len(queries)
+        # Budget is 10 ms; allow headroom for slow CI machines.
+        assert per_query < 0.05
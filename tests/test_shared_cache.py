@@ -0,0 +1,186 @@
+"""Tests for the optional Redis tier behind the playlist and art caches.
+
+Every test runs against FakeRedis, an in-process stand-in for the handful of
+redis-py commands SharedCache uses. Set SPOTUIPY_TEST_REDIS_URL (and install
+redis) to run them against a real redis-server as well. The contracts: two
+instances with separate local caches warm each other through the shared
+tier, pages are keyed by snapshot so instances on different snapshots of a
+playlist don't evict each other, keys carry TTLs, and a failing server
+degrades to "miss" instead of raising.
+"""
+
+import os
+import uuid
+
+import pytest
+
+from tools.art_cache import ArtCache
+from tools.playlist_cache import PlaylistCache
+from tools.shared_cache import SharedCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def get(self, name):
+        value = self.data.get(name)
+        return value.encode() if isinstance(value, str) else value
+
+    def set(self, name, value, ex=None):
+        self.data[name] = value
+        if ex is not None:
+            self.ttls[name] = ex
+
+    def hget(self, name, key):
+        value = self.data.get(name, {}).get(key)
+        return value.encode() if isinstance(value, str) else value
+
+    def hset(self, name, key, value):
+        self.data.setdefault(name, {})[key] = value
+
+    def expire(self, name, seconds):
+        self.ttls[name] = seconds
+
+
+class BrokenRedis:
+    def __init__(self):
+        self.calls = 0
+
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            self.calls += 1
+            raise ConnectionError("redis down")
+
+        return fail
+
+
+def backends():
+    params = ["fake"]
+    if os.getenv("SPOTUIPY_TEST_REDIS_URL"):
+        params.append("redis")
+    return params
+
+
+@pytest.fixture(params=backends())
+def shared(request):
+    if request.param == "fake":
+        return SharedCache(FakeRedis())
+    redis = pytest.importorskip("redis")
+    client = redis.Redis.from_url(os.environ["SPOTUIPY_TEST_REDIS_URL"])
+    # A unique prefix per test keeps runs from seeing each other's keys.
+    return SharedCache(client, prefix=f"spotuipy-test:{uuid.uuid4().hex}:")
+
+
+def make_page(uris, offset=0, total=None):
+    return {
+        "items": [
+            {
+                "track": {
+                    "uri": uri,
+                    "name": f"Song {uri}",
+                    "artists": [{"name": "Artist"}],
+                    "album": {"name": "Album"},
+                    "duration_ms": 1000,
+                }
+            }
+            for uri in uris
+        ],
+        "offset": offset,
+        "limit": 100,
+        "total": total if total is not None else len(uris),
+        "next": None,
+    }
+
+
+def uris(page):
+    return [i["track"]["uri"] for i in page["items"]]
+
+
+class Counter:
+    def __init__(self):
+        self.fetches = []
+
+    def fetch(self, url):
+        self.fetches.append(url)
+        return url.encode()
+
+    def decode(self, data, size):
+        return data
+
+
+class TestPlaylistPages:
+    def test_second_instance_is_warmed_by_the_first(self, tmp_path, shared):
+        first = PlaylistCache(tmp_path / "a.sqlite3", shared=shared)
+        second = PlaylistCache(tmp_path / "b.sqlite3", shared=shared)
+        first.put_page("pl1", "snap1", make_page(["uri:a", "uri:b"]))
+        page = second.get_page("pl1", "snap1")
+        assert uris(page) == ["uri:a", "uri:b"]
+        assert page["items"][0]["track"]["name"] == "Song uri:a"
+        # ...and it is now in the second instance's own SQLite file.
+        assert PlaylistCache(tmp_path / "b.sqlite3").get_page("pl1", "snap1")
+
+    def test_positions_survive_null_tracks(self, tmp_path, shared):
+        page = make_page(["uri:a", "uri:b", "uri:c"])
+        page["items"][1]["track"] = None
+        PlaylistCache(tmp_path / "a.sqlite3", shared=shared).put_page(
+            "pl1", "snap1", page
+        )
+        other = PlaylistCache(tmp_path / "b.sqlite3", shared=shared)
+        local = PlaylistCache(tmp_path / "c.sqlite3")
+        local.put_page("pl1", "snap1", page)
+        assert other.get_page("pl1", "snap1") == local.get_page("pl1", "snap1")
+
+    def test_other_snapshot_is_a_miss(self, tmp_path, shared):
+        PlaylistCache(tmp_path / "a.sqlite3", shared=shared).put_page(
+            "pl1", "snap1", make_page(["uri:a"])
+        )
+        other = PlaylistCache(tmp_path / "b.sqlite3", shared=shared)
+        assert other.get_page("pl1", "snap2") is None
+
+    def test_instances_on_different_snapshots_keep_their_pages(self, tmp_path, shared):
+        old = PlaylistCache(tmp_path / "a.sqlite3", shared=shared)
+        new = PlaylistCache(tmp_path / "b.sqlite3", shared=shared)
+        # Interleaved, as two instances a playlist edit apart would publish.
+        new.put_page("pl1", "snap2", make_page(["uri:b"]))
+        old.put_page("pl1", "snap1", make_page(["uri:a"]))
+        new.put_page("pl1", "snap2", make_page(["uri:c"], offset=1))
+        assert shared.get_page("pl1", "snap1", 0)["rows"][0][1] == "uri:a"
+        assert shared.get_page("pl1", "snap2", 0)["rows"][0][1] == "uri:b"
+        assert shared.get_page("pl1", "snap2", 1)["rows"][0][1] == "uri:c"
+
+
+class TestArt:
+    def test_cover_fetched_once_across_instances(self, tmp_path, shared):
+        counter = Counter()
+        ArtCache(counter.fetch, counter.decode, directory=tmp_path / "a",
+                 shared=shared).get("http://art/a")
+        data = ArtCache(counter.fetch, counter.decode, directory=tmp_path / "b",
+                        shared=shared).get("http://art/a")
+        assert data == b"http://art/a"
+        assert counter.fetches == ["http://art/a"]
+
+
+class TestTtlAndFailures:
+    def test_keys_carry_ttls(self, tmp_path):
+        fake = FakeRedis()
+        shared = SharedCache(fake, prefix="t:", page_ttl=60, art_ttl=120)
+        shared.put_page("pl1", "snap1", 0, {"limit": 1, "total": 0, "next": None,
+                                            "rows": []})
+        shared.put_art("http://art/a", b"x")
+        assert fake.ttls["t:pages:pl1:snap1"] == 60
+        assert 120 in fake.ttls.values()
+
+    def test_down_server_is_a_miss_and_backs_off(self, tmp_path):
+        broken = BrokenRedis()
+        now = [0.0]
+        shared = SharedCache(broken, clock=lambda: now[0])
+        cache = PlaylistCache(tmp_path / "a.sqlite3", shared=shared)
+        cache.put_page("pl1", "snap1", make_page(["uri:a"]))
+        assert uris(cache.get_page("pl1", "snap1")) == ["uri:a"]
+        assert cache.get_page("pl1", "snap2") is None
+        assert broken.calls == 1
+        now[0] += SharedCache.RETRY_S + 1
+        assert cache.get_page("pl1", "snap2") is None
+        assert broken.calls == 2
@@ -0,0 +1,115 @@
+"""Tests for the lazy start: importing the app's modules builds no Spotify
+client and loads none of the slow network libraries, and the client is
+built once, on first use.
+
+The contracts: modules that talk to Spotify import without credentials and
+without spotipy, requests or aiohttp; the app entry point pulls in only
+what the first frame needs; LazyClient defers to get_instance on every
+access; and concurrent first uses build a single client. The import checks
+run in fresh interpreters (via benchmarks.startup), since this process has
+imported everything already.
+"""
+
+import threading
+import time
+
+import pytest
+
+from benchmarks.startup import measure, parse_importtime, top_imports
+from spotify_api.spotify_client import LazyClient, SpotifyClient
+
+NETWORK = {"spotipy", "requests", "urllib3", "aiohttp"}
+
+
+class TestImports:
+    @pytest.mark.parametrize("module", [
+        "spotify_api.spotify_client",
+        "spotify_api.spotify_utils",
+        "spotify_api.async_client",
+        "spotify_api.device_registry",
+    ])
+    def test_api_modules_import_bare(self, module):
+        result = measure(module, runs=1)
+        assert "error" not in result, result
+        assert result["heavy"] == []
+        assert result["client_built"] is False
+
+    def test_app_loads_only_what_the_first_frame_needs(self):
+        for dependency in ("dotenv", "textual", "textual_image"):
+            pytest.importorskip(dependency)
+        result = measure("main", runs=1)
+        assert "error" not in result, result
+        assert NETWORK.isdisjoint(result["heavy"])
+        assert result["client_built"] is False
+
+
+class TestLazyClient:
+    def test_fetches_instance_on_each_access(self):
+        calls = []
+
+        class Client:
+            name = "real"
+
+        def get_instance():
+            calls.append(1)
+            return Client
+
+        proxy = LazyClient(get_instance)
+        assert calls == []
+        assert proxy.name == "real"
+        assert proxy.name == "real"
+        assert len(calls) == 2
+
+    def test_setattr_reaches_the_client(self):
+        class Client:
+            prefix = "a"
+
+        proxy = LazyClient(lambda: Client)
+        proxy.prefix = "b"
+        assert Client.prefix == "b"
+
+
+class TestGetInstance:
+    def test_concurrent_first_use_builds_once(self, monkeypatch):
+        built = []
+
+        def build():
+            time.sleep(0.05)
+            built.append(object())
+            return built[-1]
+
+        monkeypatch.setattr(SpotifyClient, "_instance", None)
+        monkeypatch.setattr(SpotifyClient, "build", staticmethod(build))
+        seen = []
+        threads = [
+            threading.Thread(target=lambda: seen.append(SpotifyClient.get_instance()))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(built) == 1
+        assert all(client is built[0] for client in seen)
+
+
+class TestImportTime:
+    SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       221 |        221 |   _io
+import time:       584 |      11232 |   json.decoder
+import time:       711 |        711 |   json.encoder
+import time:       395 |      12337 | json
+import time:      1000 |      20000 | spotify_api.spotify_utils
+"""
+
+    def test_parse(self):
+        entries = parse_importtime(self.SAMPLE)
+        assert entries[0] == ("_io", 221, 221, 1)
+        assert entries[3] == ("json", 395, 12337, 0)
+        assert len(entries) == 5
+
+    def test_top_imports_skip_the_module_itself(self):
+        entries = parse_importtime(self.SAMPLE)
+        assert top_imports(entries, "spotify_api.spotify_utils", top=2) == [
+            ["json", 12.337], ["_io", 0.221]]
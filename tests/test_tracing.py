@@ -0,0 +1,151 @@
+"""Tests for Tracer, the opt-in keypress-to-render span tracing.
+
+The clock is injectable, so durations are checked against a fake clock. The
+contracts: a disabled tracer records nothing; spans and instants carry the
+correlation id of the action they were done for, including on worker
+threads that enter trace_action themselves; each action is one begin/end
+pair however often it is ended; and dump() writes Chrome trace-event JSON
+with thread names.
+"""
+
+import json
+import threading
+
+from tools.tracing import Tracer, current_action, trace_action
+
+
+def make_tracer(clock, **kwargs):
+    return Tracer(enabled=True, clock=clock, **kwargs)
+
+
+class TestDisabled:
+    def test_records_nothing(self):
+        tracer = Tracer(enabled=False)
+        action = tracer.start_action("next_track")
+        with tracer.span("work"):
+            pass
+        tracer.instant("mark")
+        tracer.complete("wait", 0.0)
+        tracer.follow("uri", action)
+        tracer.end_action(action)
+        assert action is None
+        assert tracer.action_for("uri") is None
+        assert tracer.events() == []
+
+    def test_span_is_shared_noop(self):
+        tracer = Tracer(enabled=False)
+        assert tracer.span("a") is tracer.span("b")
+
+
+class TestSpans:
+    def test_span_duration_in_microseconds(self, fake_clock):
+        tracer = make_tracer(fake_clock)
+        with tracer.span("load", cat="ui", rows=100):
+            fake_clock.now += 0.25
+        (event,) = tracer.events()
+        assert event["ph"] == "X"
+        assert event["name"] == "load"
+        assert event["cat"] == "ui"
+        assert event["ts"] == 100.0e6
+        assert event["dur"] == 0.25e6
+        assert event["args"] == {"rows": 100}
+
+    def test_complete_from_earlier_timestamp(self, fake_clock):
+        tracer = make_tracer(fake_clock)
+        start = tracer.now()
+        fake_clock.now += 0.1
+        tracer.complete("debounce", start, action=7)
+        (event,) = tracer.events()
+        assert event["dur"] == 0.1e6
+        assert event["args"] == {"action": 7}
+
+    def test_spans_pick_up_current_action(self, fake_clock):
+        tracer = make_tracer(fake_clock)
+        action = tracer.start_action("next_track")
+        with trace_action(action):
+            assert current_action() == action
+            with tracer.span("send"):
+                pass
+            tracer.instant("sent")
+        assert current_action() is None
+        spans = [e for e in tracer.events() if e["ph"] in "Xi"]
+        assert [e["args"]["action"] for e in spans] == [action, action]
+
+    def test_worker_thread_enters_action_itself(self, fake_clock):
+        tracer = make_tracer(fake_clock)
+        action = tracer.start_action("select_track")
+
+        def worker():
+            # Context variables don't cross threads on their own.
+            assert current_action() is None
+            with trace_action(action), tracer.span("start_playback"):
+                pass
+
+        thread = threading.Thread(target=worker, name="playback-worker")
+        thread.start()
+        thread.join()
+        (span,) = [e for e in tracer.events() if e["ph"] == "X"]
+        assert span["args"]["action"] == action
+        assert span["tid"] == thread.ident
+
+
+class TestActions:
+    def test_begin_and_end_share_id_and_name(self, fake_clock):
+        tracer = make_tracer(fake_clock)
+        action = tracer.start_action("next_track", key="n")
+        fake_clock.now += 1.5
+        tracer.end_action(action, uri="spotify:track:x")
+        begin, end = tracer.events()
+        assert (begin["ph"], end["ph"]) == ("b", "e")
+        assert begin["id"] == end["id"] == action
+        assert begin["name"] == end["name"] == "next_track"
+        assert end["ts"] - begin["ts"] == 1.5e6
+        assert begin["args"] == {"key": "n", "action": action}
+
+    def test_ids_are_unique(self, fake_clock):
+        tracer = make_tracer(fake_clock)
+        assert tracer.start_action("a") != tracer.start_action("b")
+
+    def test_end_is_recorded_once(self, fake_clock):
+        tracer = make_tracer(fake_clock)
+        action = tracer.start_action("next_track")
+        tracer.end_action(action, superseded=True)
+        tracer.end_action(action)
+        assert [e["ph"] for e in tracer.events()] == ["b", "e"]
+
+    def test_follow_by_key(self, fake_clock):
+        tracer = make_tracer(fake_clock)
+        action = tracer.start_action("next_track")
+        tracer.follow("spotify:track:x", action)
+        assert tracer.action_for("spotify:track:x") == action
+        assert tracer.action_for("spotify:track:x", pop=True) == action
+        assert tracer.action_for("spotify:track:x") is None
+
+
+class TestDump:
+    def test_chrome_trace_json(self, tmp_path, fake_clock):
+        tracer = make_tracer(fake_clock)
+        action = tracer.start_action("next_track")
+        with trace_action(action), tracer.span("send"):
+            pass
+        tracer.end_action(action)
+        path = tmp_path / "trace.json"
+        assert tracer.dump(path) == 3
+
+        trace = json.loads(path.read_text())
+        assert trace["displayTimeUnit"] == "ms"
+        events = trace["traceEvents"]
+        names = {e["args"]["name"] for e in events if e["ph"] == "M"}
+        assert threading.current_thread().name in names
+        assert "spotuipy" in names
+        assert [e["ph"] for e in events if e["ph"] != "M"] == ["b", "X", "e"]
+        for event in events:
+            assert {"ph", "pid", "tid"} <= set(event)
+
+    def test_buffer_is_bounded(self, fake_clock):
+        tracer = make_tracer(fake_clock, max_events=10)
+        for i in range(25):
+            tracer.instant(f"mark {i}")
+        events = tracer.events()
+        assert len(events) == 10
+        assert events[-1]["name"] == "mark 24"
@@ -115,3 +115,38 @@ class TestPlaylistTracksDuplicates:
         # but both remain in order for positional/ordering operations
         assert pt.uris() == ["uri:dup", "uri:dup"]
         assert len(pt) == 2
+
+
+class TestCompactStorage:
+    """Large libraries hold tens of thousands of these; keep them small."""
+
+    def test_track_has_no_instance_dict(self):
+        t = make_track("uri:a", "Africa", 0)
+        assert not hasattr(t, "__dict__")
+
+    def test_artist_and_album_are_interned(self):
+        # Built at runtime so the two strings start out as separate objects.
+        a = make_track("uri:a", "A", 0, artist="".join(["To", "to"]))
+        b = make_track("uri:b", "B", 1, artist="".join(["Tot", "o"]))
+        assert a.artist is b.artist
+
+    def test_uris_is_not_rebuilt_per_call(self):
+        pt = make_collection()
+        assert pt.uris() is pt.uris()
+        pt.append(make_track("uri:d", "Pamela", 3))
+        assert pt.uris()[-1] == "uri:d"
+
+    def test_by_unique_name_with_underscores_in_name(self):
+        pt = PlaylistTracks()
+        pt.append(make_track("uri:a", "Song_With_Underscores", 0))
+        assert pt.by_unique_name("Song_With_Underscores_0").uri == "uri:a"
+
+    def test_by_unique_name_needs_matching_name(self):
+        pt = make_collection()
+        assert pt.by_unique_name("Rosanna_0") is None
+
+    def test_by_unique_name_when_rows_dont_match_positions(self):
+        pt = PlaylistTracks()
+        pt.append(make_track("uri:a", "Later", 100))
+        pt.append(make_track("uri:b", "Latest", 101))
+        assert pt.by_unique_name("Latest_101").uri == "uri:b"
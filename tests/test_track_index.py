@@ -0,0 +1,177 @@
+"""Tests for TrackIndex, the URI -> (playlist, position) index used to sync to
+a track playing without a playlist context.
+
+The index sits on a real PlaylistCache in a temporary directory; the playlist
+fetch is a fake that stores pages in it and records which playlists it was
+asked for. The contracts: every page of every playlist is indexed, only
+playlists with a new snapshot (or missing pages) are fetched again, the index
+survives a restart through the cache, failures leave a playlist out
+rather than breaking the build, fetches run in the caller's request lane,
+and lookups don't wait for a build's fetches.
+"""
+
+import threading
+
+from spotify_api.request_scheduler import Priority, current_priority, request_priority
+from tools.playlist_cache import PlaylistCache
+from tools.track_index import TrackIndex
+
+
+def make_page(uris, offset, total, limit=2):
+    return {
+        "items": [
+            {
+                "track": {
+                    "uri": uri,
+                    "name": uri,
+                    "artists": [{"name": "Artist"}],
+                    "album": {"name": "Album"},
+                    "duration_ms": 1000,
+                }
+            }
+            for uri in uris
+        ],
+        "offset": offset,
+        "limit": limit,
+        "total": total,
+        "next": None,
+    }
+
+
+class FakeLibrary:
+    """Playlists as lists of URIs, served two tracks per page."""
+
+    def __init__(self, cache, playlists):
+        self.cache = cache
+        self.playlists = playlists
+        self.snapshots = {pid: "s1" for pid in playlists}
+        self.fetched = []
+        self.failing = set()
+        self.held = set()
+        self.holding = threading.Event()
+        self.release = threading.Event()
+
+    def fetch_playlist(self, pid):
+        self.fetched.append(pid)
+        if pid in self.held:
+            self.holding.set()
+            self.release.wait(timeout=5)
+        if pid in self.failing:
+            raise RuntimeError("boom")
+        uris = self.playlists[pid]
+        for offset in range(0, max(len(uris), 1), 2):
+            self.cache.put_page(
+                pid, self.snapshots[pid],
+                make_page(uris[offset:offset + 2], offset, len(uris)),
+            )
+
+
+def make_index(tmp_path, playlists):
+    cache = PlaylistCache(tmp_path / "playlists.sqlite3")
+    library = FakeLibrary(cache, playlists)
+    return TrackIndex(cache, library.fetch_playlist), library
+
+
+class TestBuild:
+    def test_finds_tracks_beyond_the_first_page(self, tmp_path):
+        index, lib = make_index(tmp_path, {
+            "pA": ["u1", "u2", "u3", "u4", "u5"],
+            "pB": ["u9", "u5"],
+        })
+        index.update(lib.snapshots)
+        assert index.locate("u5") == [("pA", 4), ("pB", 1)]
+        assert index.locate("u3") == [("pA", 2)]
+        assert index.locate("nope") == []
+
+    def test_hits_follow_playlist_display_order(self, tmp_path):
+        index, lib = make_index(tmp_path, {"pB": ["u1"], "pA": ["u1"]})
+        index.update(lib.snapshots)
+        assert [pid for pid, _ in index.locate("u1")] == ["pB", "pA"]
+
+    def test_unchanged_playlists_are_not_refetched(self, tmp_path):
+        index, lib = make_index(tmp_path, {"pA": ["u1"], "pB": ["u2"]})
+        index.update(lib.snapshots)
+        index.update(lib.snapshots)
+        assert sorted(lib.fetched) == ["pA", "pB"]
+
+    def test_empty_playlist_counts_as_complete(self, tmp_path):
+        index, lib = make_index(tmp_path, {"pA": []})
+        index.update(lib.snapshots)
+        index.update(lib.snapshots)
+        assert lib.fetched == ["pA"]
+        assert "pA" in index
+
+
+class TestIncremental:
+    def test_new_snapshot_reindexes_only_that_playlist(self, tmp_path):
+        index, lib = make_index(tmp_path, {"pA": ["u1"], "pB": ["u2"]})
+        index.update(lib.snapshots)
+        lib.playlists["pA"] = ["u3"]
+        lib.snapshots["pA"] = "s2"
+        lib.fetched.clear()
+        index.update(lib.snapshots)
+        assert lib.fetched == ["pA"]
+        assert index.locate("u1") == []
+        assert index.locate("u3") == [("pA", 0)]
+        assert index.locate("u2") == [("pB", 0)]
+
+    def test_removed_playlist_leaves_the_index(self, tmp_path):
+        index, lib = make_index(tmp_path, {"pA": ["u1"], "pB": ["u1"]})
+        index.update(lib.snapshots)
+        del lib.snapshots["pB"]
+        index.update(lib.snapshots)
+        assert index.locate("u1") == [("pA", 0)]
+
+    def test_restart_rebuilds_from_cache_without_fetching(self, tmp_path):
+        index, lib = make_index(tmp_path, {"pA": ["u1", "u2", "u3"]})
+        index.update(lib.snapshots)
+        reopened, lib2 = make_index(tmp_path, {"pA": ["u1", "u2", "u3"]})
+        reopened.update(lib2.snapshots)
+        assert lib2.fetched == []
+        assert reopened.locate("u3") == [("pA", 2)]
+
+    def test_fetches_run_in_the_callers_lane(self, tmp_path):
+        cache = PlaylistCache(tmp_path / "playlists.sqlite3")
+        lib = FakeLibrary(cache, {"pA": ["u1"], "pB": ["u2"]})
+        lanes = []
+
+        def fetch(pid):
+            lanes.append(current_priority())
+            lib.fetch_playlist(pid)
+
+        with request_priority(Priority.PREFETCH):
+            TrackIndex(cache, fetch).update(lib.snapshots)
+        assert lanes == [Priority.PREFETCH] * 2
+
+
+class TestFailures:
+    def test_failed_playlist_is_skipped_and_retried(self, tmp_path):
+        index, lib = make_index(tmp_path, {"pA": ["u1"], "pB": ["u2"]})
+        lib.failing.add("pB")
+        index.update(lib.snapshots)
+        assert index.locate("u1") == [("pA", 0)]
+        assert "pB" not in index
+        lib.failing.clear()
+        index.update(lib.snapshots)
+        assert index.locate("u2") == [("pB", 0)]
+
+
+class TestConcurrentLookups:
+    def test_locate_answers_while_a_build_fetches(self, tmp_path):
+        index, lib = make_index(tmp_path, {"pA": ["u1"], "pB": ["u2"]})
+        index.update(lib.snapshots)
+        lib.snapshots["pB"] = "s2"
+        lib.playlists["pB"] = ["u3"]
+        lib.held.add("pB")
+        build = threading.Thread(target=index.update, args=(lib.snapshots,))
+        build.start()
+        assert lib.holding.wait(timeout=5)
+        try:
+            # The rebuild is stuck fetching pB; the index still answers.
+            assert index.locate("u1") == [("pA", 0)]
+            assert index.update(lib.snapshots, wait=False) is False
+        finally:
+            lib.release.set()
+            build.join(timeout=5)
+        assert index.locate("u3") == [("pB", 0)]
+        assert index.locate("u2") == []
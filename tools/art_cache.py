@@ -0,0 +1,132 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from tools.cache_paths import cache_dir
+
+
+def pick_image_variant(images, target_px=None):
+    """URL of the smallest image that is at least target_px on both sides.
+
+    Spotify lists album images largest first (640, 300, 64). With no target,
+    or when no variant is big enough, the largest image is used. Variants with
+    unknown dimensions are only used as that fallback.
+    """
+    if not images:
+        return None
+    largest = max(images, key=lambda i: i.get("width") or 0)
+    if not target_px:
+        return largest["url"]
+    big_enough = [
+        i for i in images
+        if (i.get("width") or 0) >= target_px and (i.get("height") or 0) >= target_px
+    ]
+    if not big_enough:
+        return largest["url"]
+    return min(big_enough, key=lambda i: i["width"])["url"]
+
+
+def quantize_size(width_px: int, height_px: int, step: int = 16):
+    """Round a pixel size up to a multiple of step, so small resizes reuse
+    the same cached scaled image."""
+    return (
+        max(step, -(-width_px // step) * step),
+        max(step, -(-height_px // step) * step),
+    )
+
+
+class ArtCache:
+    """Album art by URL: scaled images in a bounded LRU, raw bytes on disk.
+
+    A cover is fetched from the network at most once per URL: after that the
+    bytes come from the disk cache (which survives restarts). Decoded images
+    are kept in memory per (url, size), already scaled to the size they are
+    drawn at, so a recently shown cover skips both the decode and the resize.
+    Only max_items images are held; the least recently used one is dropped
+    first. The disk cache is trimmed to max_disk_items files, oldest first.
+
+    fetch(url) -> bytes and decode(bytes, size) -> image are injected so the
+    cache itself needs neither requests nor PIL; size is None for "as is".
+    get() is called from worker threads, so the LRU is guarded by a lock.
+    With a shared tier (tools.shared_cache.SharedCache), a disk miss is tried
+    there before fetching, and fetched covers are published to it.
+    """
+
+    def __init__(
+        self, fetch, decode, max_items: int = 32, max_disk_items: int = 500,
+        directory=None, shared=None,
+    ) -> None:
+        self._fetch = fetch
+        self._shared = shared
+        self._decode = decode
+        self._max_items = max_items
+        self._max_disk_items = max_disk_items
+        self._directory = Path(directory) if directory else None
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str, size=None):
+        key = (url, size)
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                return image
+        data = self._read_disk(url)
+        if data is None:
+            data = self._shared.get_art(url) if self._shared is not None else None
+            if data is None:
+                data = self._fetch(url)
+                if self._shared is not None:
+                    self._shared.put_art(url, data)
+            self._write_disk(url, data)
+        image = self._decode(data, size)
+        with self._lock:
+            self._images[key] = image
+            self._images.move_to_end(key)
+            while len(self._images) > self._max_items:
+                self._images.popitem(last=False)
+        return image
+
+    def __contains__(self, key) -> bool:
+        """True if (url, size) is held in memory; a bare url means size None."""
+        if isinstance(key, str):
+            key = (key, None)
+        with self._lock:
+            return key in self._images
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._images)
+
+    def _path_for(self, url: str) -> Path:
+        if self._directory is None:
+            self._directory = cache_dir("art")
+        return self._directory / hashlib.sha1(url.encode()).hexdigest()
+
+    def _read_disk(self, url: str):
+        try:
+            return self._path_for(url).read_bytes()
+        except OSError:
+            return None
+
+    def _write_disk(self, url: str, data: bytes) -> None:
+        # Write-then-rename so a crash never leaves a truncated cover behind.
+        path = self._path_for(url)
+        tmp = path.with_suffix(".tmp")
+        try:
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            self._trim_disk()
+        except OSError as e:
+            logging.warning(f"Could not cache album art on disk: {e}")
+
+    def _trim_disk(self) -> None:
+        files = [p for p in self._directory.iterdir() if not p.suffix]
+        if len(files) <= self._max_disk_items:
+            return
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for path in files[: len(files) - self._max_disk_items]:
+            path.unlink(missing_ok=True)
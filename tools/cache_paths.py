@@ -0,0 +1,17 @@
+import os
+from pathlib import Path
+
+
+def cache_dir(*parts) -> Path:
+    """Directory for spotuipy's on-disk caches, created on first use.
+
+    Defaults to $XDG_CACHE_HOME/spotuipy (~/.cache/spotuipy); set
+    SPOTUIPY_CACHE_DIR to put it somewhere else. Extra path parts name a
+    subdirectory, e.g. cache_dir("art").
+    """
+    base = os.getenv("SPOTUIPY_CACHE_DIR") or os.path.join(
+        os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "spotuipy"
+    )
+    path = Path(base, *parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,49 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+PAGE_FETCH_WORKERS = 8
+
+
+def fetch_remaining_pages(first_page, fetch_page, max_workers=None) -> list:
+    """Fetch every page after first_page concurrently, returned in order.
+
+    The first page's total and limit tell us every remaining offset up front,
+    so instead of walking the "next" chain one round trip at a time all pages
+    are requested at once. fetch_page(offset, limit) returns a paging object.
+    """
+    return list(iter_remaining_pages(first_page, fetch_page, max_workers))
+
+
+def iter_remaining_pages(first_page, fetch_page, max_workers=None):
+    """Like fetch_remaining_pages, but yields each page as soon as it and
+    every page before it have arrived, so callers can show rows in order
+    while later pages are still in flight."""
+    total = first_page.get("total") or 0
+    limit = first_page.get("limit") or len(first_page["items"])
+    start = (first_page.get("offset") or 0) + limit
+    offsets = range(start, total, limit) if limit else range(0)
+    if not offsets:
+        return
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers or PAGE_FETCH_WORKERS, len(offsets))
+    ) as pool:
+        # Pool threads don't inherit context variables, so each fetch runs in
+        # a copy of the caller's: its request lane and traced action.
+        futures = [
+            pool.submit(contextvars.copy_context().run, fetch_page, offset, limit)
+            for offset in offsets
+        ]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            # Abandoned early (or a page failed): don't start the rest.
+            for future in futures:
+                future.cancel()
+
+
+def merge_pages(first_page, pages) -> dict:
+    """first_page with the items of every page after it appended, as a
+    single paging object that covers the whole list and has no next page."""
+    items = [item for page in (first_page, *pages) for item in page["items"]]
+    return dict(first_page, items=items, limit=len(items), next=None)
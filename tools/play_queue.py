@@ -0,0 +1,121 @@
+from collections import deque
+
+
+class PlayQueue:
+    """What plays next: a cursor into a playlist's ordered tracks, plus
+    tracks the user queued by hand and a history of what already played.
+
+    The old queue copied every URI after the current track into a deque on
+    each selection and popped its way forward to resync. Here the playlist's
+    PlaylistTracks is the queue: "play from here" just moves a position, and
+    next/previous step it by one, so every operation is O(1) however long the
+    playlist is.
+
+    - next() plays user-queued tracks first (in the order they were added),
+      then continues the playlist after the cursor. A queued track doesn't
+      move the cursor, so the playlist resumes where it left off; from_queue
+      says whether the current track came from the queue.
+    - previous() goes back through history; with no history it steps the
+      cursor back one position.
+    - play_from() is a user jump (selection, skip): the current track goes
+      into history. set_source() only re-points the cursor, e.g. when the
+      player swaps in a newly loaded page, and records nothing;
+      replace_tracks() swaps in a longer copy of the same rows.
+
+    Tracks are tools.track.Track objects; the source is any sequence with
+    PlaylistTracks' by_index() and len().
+    """
+
+    def __init__(self, history_size: int = 100) -> None:
+        self.playlist = None
+        self._tracks = None
+        self._position = -1
+        self._current = None
+        self._from_queue = False
+        self._queued = deque()
+        self._history = deque(maxlen=history_size)
+
+    @property
+    def current(self):
+        return self._current
+
+    @property
+    def position(self) -> int:
+        """Cursor position in the source; -1 before anything is playing."""
+        return self._position
+
+    @property
+    def from_queue(self) -> bool:
+        """True while the current track is one the user queued by hand, so
+        the cursor still marks where the playlist resumes, not this track."""
+        return self._from_queue
+
+    def set_source(self, playlist, tracks, position: int) -> None:
+        """Point the cursor at tracks[position] without touching history."""
+        self.playlist = playlist
+        self._tracks = tracks
+        self._position = position
+        self._current = tracks.by_index(position) if tracks is not None else None
+        self._from_queue = False
+
+    def replace_tracks(self, playlist, tracks) -> None:
+        """Swap in a reloaded copy of the source that starts with the same
+        rows (e.g. the whole playlist once its remaining pages arrive). The
+        cursor, the current track and from_queue are kept."""
+        if playlist == self.playlist:
+            self._tracks = tracks
+
+    def play_from(self, playlist, tracks, position: int):
+        """Jump to tracks[position]; returns the track now current."""
+        self._remember()
+        self.set_source(playlist, tracks, position)
+        return self._current
+
+    def next(self):
+        """Advance and return the track to play, or None at the end of the
+        source (the caller may load the next page and set_source it)."""
+        if self._queued:
+            self._remember()
+            self._current = self._queued.popleft()
+            self._from_queue = True
+            return self._current
+        if self._tracks is None:
+            return None
+        upcoming = self._tracks.by_index(self._position + 1)
+        if upcoming is None:
+            return None
+        self._remember()
+        self._position += 1
+        self._current = upcoming
+        self._from_queue = False
+        return upcoming
+
+    def previous(self):
+        """Step back and return the track to play, or None if there is
+        nothing before the current track."""
+        if self._history:
+            (self.playlist, self._tracks, self._position, self._current,
+             self._from_queue) = self._history.pop()
+            return self._current
+        if self._tracks is None or self._position <= 0:
+            return None
+        self._position -= 1
+        self._current = self._tracks.by_index(self._position)
+        self._from_queue = False
+        return self._current
+
+    def enqueue(self, track) -> None:
+        """Play track after the current one and anything queued before it."""
+        self._queued.append(track)
+
+    def __len__(self) -> int:
+        """Tracks left to play: queued ones plus the rest of the source."""
+        rest = 0
+        if self._tracks is not None:
+            rest = max(0, len(self._tracks) - self._position - 1)
+        return len(self._queued) + rest
+
+    def _remember(self) -> None:
+        if self._current is not None:
+            self._history.append((self.playlist, self._tracks, self._position,
+                                  self._current, self._from_queue))
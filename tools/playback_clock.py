@@ -0,0 +1,143 @@
+import time
+
+# A poll that disagrees with the clock by more than this (on the same track,
+# still playing, with no state change reported) is treated as a jump the
+# clock didn't hear about, and snapped to. Smaller differences are drift.
+SNAP_MS = 1500
+
+
+class PlaybackClock:
+    """Where the current track is, derived from the last poll and the time
+    since, rather than accumulated tick by tick.
+
+    Each poll anchors the clock: the position Spotify reported, at the
+    monotonic time Spotify most likely measured it. That is taken as the
+    middle of the request's round trip, so a slow response doesn't put the
+    clock behind by its whole latency. Between polls the position is
+    anchor + elapsed time while playing, clamped to the track, so a busy
+    event loop delays repaints but never slows the clock down.
+
+    A poll that lands close to the clock's own estimate is drift. The clock
+    follows it, but the position never steps backwards while a track plays
+    continuously; it holds until the new anchor catches up, instead of the
+    bar snapping back. A new track, a play/pause change, a changed
+    `timestamp` in the response (Spotify's time of the last state change:
+    a seek or skip made elsewhere), or a large disagreement all re-anchor
+    outright.
+
+    Local commands move the clock straight away: seek() for the seek
+    scrubber, pause()/resume() for play/pause. The monitor skips syncing
+    during its seek guard, while polls still report the old position.
+
+    clock is the monotonic source the anchor's elapsed time is read from;
+    times passed in and out are in its units (seconds).
+    """
+
+    def __init__(self, clock=time.monotonic) -> None:
+        self._clock = clock
+        self.reset()
+
+    def reset(self) -> None:
+        self.uri = None
+        self.duration_ms = 0
+        self.playing = False
+        self.rtt_s = None
+        self._anchor_ms = 0
+        self._anchor_t = self._clock()
+        self._floor_ms = 0
+        self._timestamp = None
+
+    def now(self) -> float:
+        return self._clock()
+
+    def position_ms(self, at=None) -> int:
+        """Position of the current track at monotonic time at (default
+        now)."""
+        if at is None:
+            at = self._clock()
+        position = self._anchor_ms
+        if self.playing:
+            position += (at - self._anchor_t) * 1000
+        position = max(position, self._floor_ms, 0)
+        if self.duration_ms > 0:
+            position = min(position, self.duration_ms)
+        return int(position)
+
+    def remaining_ms(self, at=None) -> int:
+        return max(0, self.duration_ms - self.position_ms(at))
+
+    def sync(self, playback, sent_at: float, received_at: float) -> None:
+        """Anchor to a current_playback response requested at sent_at and
+        received at received_at (monotonic)."""
+        if not playback or not playback.get("item"):
+            self.reset()
+            return
+        item = playback["item"]
+        playing = bool(playback.get("is_playing"))
+        progress = playback.get("progress_ms") or 0
+        timestamp = playback.get("timestamp")
+        measured_at = (sent_at + received_at) / 2
+
+        continuous = (
+            playing and self.playing
+            and item["uri"] == self.uri
+            and timestamp == self._timestamp
+        )
+        shown = self.position_ms(received_at) if continuous else None
+        predicted = self.position_ms(measured_at) if continuous else None
+
+        self.uri = item["uri"]
+        self.duration_ms = item.get("duration_ms") or 0
+        self.playing = playing
+        self.rtt_s = max(0.0, received_at - sent_at)
+        self._timestamp = timestamp
+        self._anchor_ms = progress
+        self._anchor_t = measured_at
+        self._floor_ms = 0
+        if continuous and abs(progress - predicted) <= SNAP_MS:
+            # Drift: follow the poll, but don't step back from what has
+            # already been shown.
+            self._floor_ms = shown
+
+    def seek(self, position_ms: int) -> None:
+        """A local seek: jump there now. The next state change Spotify
+        reports (the seek landing) re-anchors as usual."""
+        self._anchor_ms = position_ms
+        self._anchor_t = self._clock()
+        self._floor_ms = 0
+
+    def pause(self) -> None:
+        self._anchor_ms = self.position_ms()
+        self._anchor_t = self._clock()
+        self._floor_ms = 0
+        self.playing = False
+
+    def resume(self) -> None:
+        if self.uri is None:
+            return
+        self._anchor_t = self._clock()
+        self._floor_ms = 0
+        self.playing = True
+
+    def position_before(self, playback, sent_at: float, received_at: float):
+        """How far the track the clock is following got, judged from a new
+        response, before sync() is given it; None if the response says
+        nothing about it.
+
+        - Same track: where Spotify says it is now, or where it was last
+          seen if that is further (a finished context may reset to 0).
+        - A different track: where the clock's track was when the new one
+          started, i.e. this response's progress ago. This doesn't depend
+          on when the last poll happened, so polls can be sparse.
+        """
+        if self.uri is None or not playback or not playback.get("item"):
+            return None
+        measured_at = (sent_at + received_at) / 2
+        progress = playback.get("progress_ms") or 0
+        if playback["item"]["uri"] == self.uri:
+            return max(progress, self.position_ms(self._anchor_t))
+        started_at = measured_at - progress / 1000
+        return self.position_ms(max(started_at, self._anchor_t))
+
+
+PLAYBACK_CLOCK = PlaybackClock()
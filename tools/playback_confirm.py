@@ -0,0 +1,83 @@
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
+
+class PlaybackConfirmations:
+    """Pending "is my track playing yet?" questions, answered by the monitor.
+
+    After a play command, the caller registers the track it expects with
+    expect() and gets a Future back instead of polling current_playback in a
+    sleep loop. PlaybackMonitor already polls playback state; every poll it
+    calls observe() with the URI it saw, which resolves the matching futures
+    with True. While anything is pending the monitor polls in a fast burst,
+    so confirmation lands within one short poll of the device switching
+    tracks. Expectations not met within their timeout resolve with False.
+
+    observe() runs on the event loop and expect() on worker threads, so the
+    waiter table is guarded by a lock.
+    """
+
+    def __init__(self, clock=time.monotonic) -> None:
+        self._clock = clock
+        self._waiters = {}
+        self._lock = threading.Lock()
+
+    def expect(self, track_uri: str, timeout: float = 10.0) -> Future:
+        future = Future()
+        with self._lock:
+            self._waiters.setdefault(track_uri, []).append(
+                (self._clock() + timeout, future)
+            )
+        return future
+
+    def observe(self, track_uri: str) -> bool:
+        """The monitor saw track_uri playing. Returns True if that confirmed
+        at least one pending expectation."""
+        with self._lock:
+            waiters = self._waiters.pop(track_uri, [])
+        for _, future in waiters:
+            _resolve(future, True)
+        self._expire()
+        return bool(waiters)
+
+    def pending(self) -> bool:
+        self._expire()
+        with self._lock:
+            return bool(self._waiters)
+
+    def discard(self, future: Future) -> None:
+        """Forget an expectation the caller has given up on."""
+        with self._lock:
+            for uri, waiters in list(self._waiters.items()):
+                remaining = [w for w in waiters if w[1] is not future]
+                if remaining:
+                    self._waiters[uri] = remaining
+                else:
+                    del self._waiters[uri]
+        _resolve(future, False)
+
+    def _expire(self) -> None:
+        now = self._clock()
+        expired = []
+        with self._lock:
+            for uri, waiters in list(self._waiters.items()):
+                live = [w for w in waiters if w[0] > now]
+                expired.extend(w[1] for w in waiters if w[0] <= now)
+                if live:
+                    self._waiters[uri] = live
+                else:
+                    del self._waiters[uri]
+        for future in expired:
+            _resolve(future, False)
+
+
+def _resolve(future: Future, value: bool) -> None:
+    # observe() and discard() can race for the same future; first one wins.
+    try:
+        future.set_result(value)
+    except InvalidStateError:
+        pass
+
+
+CONFIRMATIONS = PlaybackConfirmations()
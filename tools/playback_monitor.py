@@ -2,9 +2,18 @@ import time
 import logging
 from textual.message import Message
 from textual.widget import Widget
-from spotify_api.spotify_client import SpotifyClient
-
-sp = SpotifyClient.get_instance()
+from spotify_api.async_client import AsyncSpotifyClient
+from spotify_api.spotify_client import LazyClient
+from spotify_api.device_registry import DEVICES
+from spotify_api.request_scheduler import Priority, request_priority
+from tools.art_cache import pick_image_variant
+from tools.poll_scheduler import PollScheduler
+from tools.playback_confirm import CONFIRMATIONS
+from tools.playback_state import PlaybackState
+from tools.playback_clock import PLAYBACK_CLOCK
+from tools.tracing import TRACER
+
+sp = LazyClient(AsyncSpotifyClient.get_instance)
 
 logging.getLogger("spotipy").setLevel(logging.WARNING)
 logging.getLogger("urllib3").setLevel(logging.WARNING)
@@ -13,14 +22,20 @@ logging.getLogger("urllib3").setLevel(logging.WARNING)
 class PlaybackMonitor(Widget):
     """Single source of truth for playback state.
 
-    Polls Spotify once per second, diffs against the last seen state, and posts
-    messages when something changes. It is the ONLY thing that calls the
-    playback API on a timer; every other widget reacts to these messages instead
-    of polling on its own. The widget renders nothing.
+    Polls Spotify on an adaptive schedule (see PollScheduler: fast around
+    commands and track ends, slow mid-track, backing off while idle), diffs
+    against the last seen state, and posts messages when something changes.
+    It is the ONLY thing that calls the playback API on a timer; every other
+    widget reacts to these messages instead of polling on its own. The widget
+    renders nothing.
     """
 
     DEFAULT_CSS = "PlaybackMonitor { display: none; }"
 
+    # Pixel size the album cover is drawn at; set by AlbumCover when it is
+    # resized. None means "no preference" and picks the largest variant.
+    art_target_px = None
+
     class PlaybackChanged(Message):
         """Posted every poll while a track is playing, with fresh ground truth."""
 
@@ -55,73 +70,96 @@ class PlaybackMonitor(Widget):
     class PlaybackStopped(Message):
         """Posted when nothing is playing anymore."""
 
+    class PlaybackConfirmed(Message):
+        """Posted when a track someone started (via CONFIRMATIONS.expect) is
+        seen playing on the device."""
+
+        def __init__(self, track_uri: str) -> None:
+            super().__init__()
+            self.track_uri = track_uri
+
     def on_mount(self) -> None:
-        self._last_uri = None
-        self._last_playing = False
-        self._last_progress_ms = 0
-        self._last_duration_ms = 0
+        self._state = PlaybackState()
         self._seek_guard_until = 0.0
-        self.set_interval(1, self.poll)
+        self._scheduler = PollScheduler()
+        self._poll_timer = None
+        self._schedule_poll(self._scheduler.FAST_S)
+
+    def _schedule_poll(self, delay: float) -> None:
+        if self._poll_timer is not None:
+            self._poll_timer.stop()
+        self._poll_timer = self.set_timer(delay, self._tick)
+
+    async def _tick(self) -> None:
+        await self.poll()
+        self._schedule_poll(
+            self._scheduler.next_interval(
+                self._state.playing,
+                PLAYBACK_CLOCK.position_ms(),
+                self._state.duration_ms,
+                confirming=CONFIRMATIONS.pending(),
+            )
+        )
 
     @property
     def is_playing(self) -> bool:
         """Last-known playing state from the most recent poll. Lets other
         widgets check play/pause status without making their own blocking
         API call."""
-        return self._last_playing
+        return self._state.playing
 
-    def _ended_naturally(self) -> bool:
-        """True if the last-seen track was near its end (within 3s), meaning it
-        finished on its own rather than being skipped mid-track by the user."""
-        if self._last_duration_ms <= 0:
-            return False
-        return self._last_progress_ms >= self._last_duration_ms - 3000
+    @property
+    def current_uri(self):
+        """URI of the track the last poll saw playing, or None."""
+        return self._state.uri
+
+    async def poll(self) -> None:
+        # Awaited on Textual's event loop: a slow response delays the next
+        # poll but never blocks input or rendering.
+        with TRACER.span("poll", cat="poll"):
+            await self._poll()
 
-    def poll(self) -> None:
+    async def _poll(self) -> None:
         try:
-            track = sp.current_playback()
+            with request_priority(Priority.BACKGROUND):
+                sent_at = PLAYBACK_CLOCK.now()
+                track = await sp.current_playback()
+                received_at = PLAYBACK_CLOCK.now()
         except Exception:
             # transient network/API error: keep last known state, try next tick
             return
 
-        playing = bool(
-            track
-            and track.get("is_playing")
-            and track.get("item")
-            and track.get("progress_ms", 0) > 0
-        )
-
-        if not playing:
-            # transition from playing -> stopped
-            if self._last_playing:
-                self._last_playing = False
-                # Only auto-advance if the track actually ran to its end.
-                if self._last_uri and self._ended_naturally():
-                    self.post_message(self.TrackEnded(self._last_uri))
-                self._last_uri = None
-                self._last_progress_ms = 0
-                self._last_duration_ms = 0
-                self.post_message(self.PlaybackStopped())
+        DEVICES.observe_playback(track)
+        if track and track.get("item"):
+            if CONFIRMATIONS.observe(track["item"]["uri"]):
+                self.post_message(self.PlaybackConfirmed(track["item"]["uri"]))
+
+        # Only auto-advance if the track actually ran to its end; a change or
+        # stop mid-track was a manual skip (n/p, selection) and must NOT
+        # advance again. The clock knows where the old track had got to
+        # when the new one started, however long ago the last poll was.
+        previous_uri = self._state.uri
+        ended, stopped = self._state.update(
+            track, PLAYBACK_CLOCK.position_before(track, sent_at, received_at))
+        in_seek_guard = time.monotonic() < self._seek_guard_until
+        if not in_seek_guard:
+            PLAYBACK_CLOCK.sync(track, sent_at, received_at)
+        if ended:
+            self.post_message(self.TrackEnded(ended))
+        if stopped:
+            self.post_message(self.PlaybackStopped())
+        if not self._state.playing:
             return
 
         item = track["item"]
         curr_uri = item["uri"]
-
-        # Track changed. Only treat it as a natural end (auto-advance) if the
-        # previous track was near completion; otherwise it was a manual skip
-        # (n/p keybinding or track selection) and we must NOT advance again.
-        if curr_uri != self._last_uri:
-            if self._last_uri and self._ended_naturally():
-                self.post_message(self.TrackEnded(self._last_uri))
-            self._last_uri = curr_uri
+        if curr_uri != previous_uri:
+            TRACER.instant("poll saw new track", cat="poll",
+                           action=TRACER.action_for(curr_uri), uri=curr_uri)
         images = item["album"]["images"]
-        art_url = images[0]["url"] if images else None
+        art_url = pick_image_variant(images, self.art_target_px)
         device = track.get("device") or {}
         device_name = device.get("name")
-        in_seek_guard = time.monotonic() < self._seek_guard_until
-        self._last_playing = True
-        self._last_progress_ms = track["progress_ms"]
-        self._last_duration_ms = item["duration_ms"]
         self.post_message(
             self.PlaybackChanged(
                 track_name=item["name"],
@@ -139,3 +177,12 @@ class PlaybackMonitor(Widget):
         """Called when the user seeks; suppresses position snap-back until the
         seek has had time to land on the device."""
         self._seek_guard_until = time.monotonic() + 2.0
+        self.notify_command()
+
+    def notify_command(self) -> None:
+        """Called when the user sends a playback command (play, pause, skip,
+        seek); switches to fast polling so the result shows up quickly, and
+        cuts short any long idle wait."""
+        self._scheduler.notify_command()
+        if self._poll_timer is not None:
+            self._schedule_poll(self._scheduler.FAST_S)
@@ -0,0 +1,80 @@
+NATURAL_END_THRESHOLD_MS = 3000
+
+
+def ended_naturally(progress_ms: int, duration_ms: int) -> bool:
+    """True if a track last seen at progress_ms was within the last 3s of its
+    duration: it finished on its own rather than being skipped mid-track."""
+    if duration_ms <= 0:
+        return False
+    return progress_ms >= duration_ms - NATURAL_END_THRESHOLD_MS
+
+
+def is_playing(playback) -> bool:
+    """Whether a current_playback response shows a track actually playing
+    (a paused track, or one at 0ms that hasn't started yet, doesn't count)."""
+    return bool(
+        playback
+        and playback.get("is_playing")
+        and playback.get("item")
+        and playback.get("progress_ms", 0) > 0
+    )
+
+
+class PlaybackState:
+    """The playback state machine behind PlaybackMonitor, free of Textual and
+    the network so it can be tested and benchmarked on its own.
+
+    update() folds in one current_playback response and reports what changed
+    since the previous one:
+
+    - ended: the URI of a track that ran to its natural end (see
+      ended_naturally), either because playback stopped or because a
+      different track is now playing. A track that changed or stopped
+      mid-play was skipped, and reports nothing, so the player never
+      auto-advances twice.
+    - stopped: playback went from playing to not playing.
+
+    Between updates, uri / playing / progress_ms / duration_ms hold the last
+    playing state seen (all cleared once playback stops).
+    """
+
+    __slots__ = ("uri", "playing", "progress_ms", "duration_ms")
+
+    def __init__(self) -> None:
+        self.uri = None
+        self.playing = False
+        self.progress_ms = 0
+        self.duration_ms = 0
+
+    def update(self, playback, last_position_ms=None) -> tuple:
+        """Returns (ended, stopped): the URI that ended naturally or None,
+        and whether playback just stopped.
+
+        last_position_ms is how far the previous track got, if known better
+        than its last seen progress (see PlaybackClock.position_before)."""
+        if not is_playing(playback):
+            if not self.playing:
+                return None, False
+            ended = self._ended_uri(last_position_ms)
+            self.playing = False
+            self.uri = None
+            self.progress_ms = 0
+            self.duration_ms = 0
+            return ended, True
+
+        item = playback["item"]
+        ended = None
+        if item["uri"] != self.uri:
+            ended = self._ended_uri(last_position_ms)
+            self.uri = item["uri"]
+        self.playing = True
+        self.progress_ms = playback["progress_ms"]
+        self.duration_ms = item["duration_ms"]
+        return ended, False
+
+    def _ended_uri(self, last_position_ms=None):
+        if last_position_ms is None:
+            last_position_ms = self.progress_ms
+        if self.uri and ended_naturally(last_position_ms, self.duration_ms):
+            return self.uri
+        return None
@@ -0,0 +1,218 @@
+import sqlite3
+import threading
+from tools.cache_paths import cache_dir
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS playlists (
+    playlist_id TEXT PRIMARY KEY,
+    snapshot_id TEXT NOT NULL,
+    total INTEGER
+);
+CREATE TABLE IF NOT EXISTS pages (
+    playlist_id TEXT NOT NULL,
+    page_offset INTEGER NOT NULL,
+    page_limit INTEGER NOT NULL,
+    next_url TEXT,
+    PRIMARY KEY (playlist_id, page_offset)
+);
+CREATE TABLE IF NOT EXISTS tracks (
+    playlist_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    uri TEXT NOT NULL,
+    name TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    album TEXT NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    PRIMARY KEY (playlist_id, position)
+);
+"""
+
+
+class PlaylistCache:
+    """Persistent SQLite store of playlist pages and their track rows.
+
+    Everything is keyed by playlist id and Spotify's snapshot_id. Spotify bumps
+    the snapshot on every edit, so a page stored under the current snapshot is
+    exactly what the API would return and can be rendered without a request.
+    Storing a page under a new snapshot drops everything cached for the old one.
+
+    Pages are handed back in the same shape as a Spotify paging object (items,
+    offset, limit, total, next), trimmed to the fields load_tracks reads, so
+    callers can't tell a cached page from a fetched one. The connection is
+    shared between the UI thread and workers, guarded by a lock.
+
+    With a shared tier (tools.shared_cache.SharedCache), a local miss is
+    tried there before the caller goes to Spotify, and stored pages are
+    published to it, so other instances don't refetch them.
+    """
+
+    def __init__(self, path=None, shared=None) -> None:
+        self._path = str(path or cache_dir() / "playlists.sqlite3")
+        self._shared = shared
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def get_page(self, playlist_id: str, snapshot_id: str, offset: int = 0):
+        """Cached page starting at offset, or None if it isn't stored under
+        this snapshot."""
+        if not snapshot_id:
+            return None
+        page = self._get_local_page(playlist_id, snapshot_id, offset)
+        if page is None and self._shared is not None:
+            shared = self._shared.get_page(playlist_id, snapshot_id, offset)
+            if shared is not None:
+                rows = [(playlist_id, *row) for row in shared["rows"]]
+                self._write(
+                    playlist_id, snapshot_id, offset, shared["limit"],
+                    shared["total"], shared["next"], rows,
+                )
+                page = self._get_local_page(playlist_id, snapshot_id, offset)
+        return page
+
+    def _get_local_page(self, playlist_id, snapshot_id, offset):
+        with self._lock:
+            meta = self._conn.execute(
+                "SELECT p.page_limit, p.next_url, l.total FROM pages p "
+                "JOIN playlists l ON l.playlist_id = p.playlist_id "
+                "WHERE p.playlist_id = ? AND p.page_offset = ? "
+                "AND l.snapshot_id = ?",
+                (playlist_id, offset, snapshot_id),
+            ).fetchone()
+            if meta is None:
+                return None
+            limit, next_url, total = meta
+            rows = self._conn.execute(
+                "SELECT uri, name, artist, album, duration_ms FROM tracks "
+                "WHERE playlist_id = ? AND position >= ? AND position < ? "
+                "ORDER BY position",
+                (playlist_id, offset, offset + limit),
+            ).fetchall()
+        return {
+            "items": [
+                {
+                    "track": {
+                        "uri": uri,
+                        "name": name,
+                        "artists": [{"name": artist}],
+                        "album": {"name": album},
+                        "duration_ms": duration_ms,
+                    }
+                }
+                for uri, name, artist, album, duration_ms in rows
+            ],
+            "offset": offset,
+            "limit": limit,
+            "total": total,
+            "next": next_url,
+            "previous": None,
+        }
+
+    def put_page(self, playlist_id: str, snapshot_id: str, page) -> None:
+        """Store one paging object (the "tracks" part of a playlist response,
+        or anything SP.next returns for it)."""
+        if not snapshot_id or not page:
+            return
+        offset = page.get("offset") or 0
+        items = page.get("items") or []
+        limit = page.get("limit") or len(items)
+        rows = []
+        for i, item in enumerate(items):
+            track = item.get("track")
+            if not track or not track.get("uri"):
+                # Local files and removed tracks come back as null.
+                continue
+            rows.append((
+                playlist_id,
+                offset + i,
+                track["uri"],
+                track["name"],
+                track["artists"][0]["name"] if track.get("artists") else "",
+                (track.get("album") or {}).get("name", ""),
+                track.get("duration_ms", 0),
+            ))
+        self._write(
+            playlist_id, snapshot_id, offset, limit, page.get("total"),
+            page.get("next"), rows,
+        )
+        if self._shared is not None:
+            self._shared.put_page(playlist_id, snapshot_id, offset, {
+                "limit": limit,
+                "total": page.get("total"),
+                "next": page.get("next"),
+                "rows": [row[1:] for row in rows],
+            })
+
+    def is_complete(self, playlist_id: str, snapshot_id: str) -> bool:
+        """True if every page of the playlist is stored under this snapshot."""
+        if not snapshot_id:
+            return False
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT l.total, COUNT(p.page_offset), MIN(p.page_limit) "
+                "FROM playlists l LEFT JOIN pages p ON p.playlist_id = l.playlist_id "
+                "WHERE l.playlist_id = ? AND l.snapshot_id = ?",
+                (playlist_id, snapshot_id),
+            ).fetchone()
+        if row is None or row[0] is None:
+            return False
+        total, pages, limit = row
+        if total == 0:
+            return True
+        return bool(limit) and pages >= -(-total // limit)
+
+    def track_positions(self, playlist_id: str) -> list:
+        """(position, uri) for every stored track of the playlist, in order."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT position, uri FROM tracks WHERE playlist_id = ? "
+                "ORDER BY position",
+                (playlist_id,),
+            ).fetchall()
+
+    def track_rows(self, playlist_id: str) -> list:
+        """(position, uri, name, artist, album) for every stored track of the
+        playlist, in order."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT position, uri, name, artist, album FROM tracks "
+                "WHERE playlist_id = ? ORDER BY position",
+                (playlist_id,),
+            ).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _write(self, playlist_id, snapshot_id, offset, limit, total, next_url, rows):
+        with self._lock, self._conn:
+            self._reset_if_stale(playlist_id, snapshot_id, total)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                (playlist_id, offset, limit, next_url),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tracks VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def _reset_if_stale(self, playlist_id, snapshot_id, total) -> None:
+        # Caller holds the lock and an open transaction.
+        row = self._conn.execute(
+            "SELECT snapshot_id FROM playlists WHERE playlist_id = ?",
+            (playlist_id,),
+        ).fetchone()
+        if row is not None and row[0] == snapshot_id:
+            return
+        self._delete(playlist_id)
+        self._conn.execute(
+            "INSERT INTO playlists VALUES (?, ?, ?)",
+            (playlist_id, snapshot_id, total),
+        )
+
+    def _delete(self, playlist_id) -> None:
+        for table in ("playlists", "pages", "tracks"):
+            self._conn.execute(
+                f"DELETE FROM {table} WHERE playlist_id = ?", (playlist_id,)
+            )
@@ -0,0 +1,61 @@
+import time
+
+
+class PollScheduler:
+    """Decides how long PlaybackMonitor waits before its next poll.
+
+    Polling every second forever is wasteful: mid-track nothing is expected to
+    change, and while paused or idle nothing may change for hours. Instead:
+
+    - right after a user command (play, pause, skip, seek), poll fast for a
+      few seconds so the UI catches the result quickly;
+    - near the predicted end of the track, poll fast so the track change is
+      seen promptly (whether it ended naturally comes from PlaybackClock,
+      which doesn't need a sample near the end);
+    - mid-track, poll slowly, timed so a poll lands just before the end;
+    - while nothing is playing, back off exponentially up to IDLE_MAX_S;
+    - while a play command is waiting for confirmation, poll every
+      CONFIRM_S so the new track is seen almost as soon as it starts.
+
+    The progress bar interpolates locally between polls, so slow polls don't
+    make it any less smooth. clock times the command boost window.
+    """
+
+    CONFIRM_S = 0.3
+    FAST_S = 1.0
+    SLOW_S = 5.0
+    IDLE_MIN_S = 2.0
+    IDLE_MAX_S = 30.0
+    COMMAND_BOOST_S = 5.0
+    # Aim for the last poll of a track to land this long before its end.
+    END_LEAD_MS = 2000
+
+    def __init__(self, clock=time.monotonic) -> None:
+        self._clock = clock
+        self._boost_until = 0.0
+        self._idle_polls = 0
+
+    def notify_command(self) -> None:
+        """A user command was just sent; expect a state change soon."""
+        self._boost_until = self._clock() + self.COMMAND_BOOST_S
+        self._idle_polls = 0
+
+    def next_interval(
+        self, playing: bool, progress_ms: int = 0, duration_ms: int = 0,
+        confirming: bool = False,
+    ) -> float:
+        """Seconds until the next poll, given the state the last poll saw."""
+        if confirming:
+            return self.CONFIRM_S
+        if self._clock() < self._boost_until:
+            return self.FAST_S
+        if not playing:
+            delay = min(self.IDLE_MAX_S, self.IDLE_MIN_S * 2 ** self._idle_polls)
+            self._idle_polls += 1
+            return delay
+        self._idle_polls = 0
+        remaining_ms = duration_ms - progress_ms
+        until_lead_s = (remaining_ms - self.END_LEAD_MS) / 1000
+        if until_lead_s <= self.FAST_S:
+            return self.FAST_S
+        return min(self.SLOW_S, until_lead_s)
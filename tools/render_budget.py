@@ -0,0 +1,70 @@
+import os
+
+from tools.formatting import format_duration
+
+# How often the progress bar ticks between polls. Most ticks change nothing
+# on screen and are skipped (see ProgressFrame); lower this over slow SSH
+# links or on low-power machines to spend less time even deciding that.
+PROGRESS_FPS = float(os.getenv("SPOTUIPY_PROGRESS_FPS", "10"))
+
+
+def tick_ms(fps: float = PROGRESS_FPS) -> int:
+    """Milliseconds between ticks at fps (at least 1 frame/s)."""
+    return max(1, round(1000 / max(fps, 1.0)))
+
+
+class ProgressFrame:
+    """What the progress row last put on screen, so a tick only repaints the
+    parts whose visible value changed.
+
+    At 10 ticks a second the time labels change once a second and the bar
+    moves one half-cell (the finest step it draws) every few seconds for a
+    typical track, so almost every tick repaints nothing at all.
+
+    Each *_changed/*_text method compares against what was last shown and
+    records the new value when it differs. invalidate() forgets everything,
+    forcing the next call of each to repaint.
+    """
+
+    __slots__ = ("_bar", "_elapsed", "_total")
+
+    def __init__(self) -> None:
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        self._bar = None
+        self._elapsed = None
+        self._total = None
+
+    def bar_changed(self, progress_ms: int, total_ms: int, width_cells: int) -> bool:
+        """True if the bar, width_cells wide, would draw differently at
+        progress_ms than it last did. An unknown width (before layout)
+        always repaints."""
+        if width_cells > 0 and total_ms > 0:
+            steps = width_cells * 2
+            step = min(steps, max(0, progress_ms) * steps // total_ms)
+        else:
+            step = progress_ms
+        key = (step, total_ms)
+        if key == self._bar:
+            return False
+        self._bar = key
+        return True
+
+    def elapsed_text(self, progress_ms: int):
+        """The elapsed-time label for progress_ms, or None if it already
+        shows that."""
+        text = format_duration(progress_ms)
+        if text == self._elapsed:
+            return None
+        self._elapsed = text
+        return text
+
+    def total_text(self, total_ms: int):
+        """The total-time label for total_ms, or None if it already shows
+        that."""
+        text = format_duration(total_ms)
+        if text == self._total:
+            return None
+        self._total = text
+        return text
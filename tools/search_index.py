@@ -0,0 +1,210 @@
+import heapq
+import math
+import threading
+from collections import Counter
+from dataclasses import dataclass
+
+NAME, ARTIST, ALBUM = 0, 1, 2
+
+
+@dataclass(slots=True, frozen=True)
+class SearchHit:
+    """One track in one playlist, as returned by SearchIndex.search()."""
+
+    playlist_id: str
+    playlist: str
+    position: int
+    uri: str
+    name: str
+    artist: str
+    album: str
+
+
+class SearchIndex:
+    """As-you-type search over the name, artist and album of every track the
+    app has seen, in every playlist.
+
+    The index is built over distinct strings rather than tracks: a library of
+    50k tracks has far fewer distinct artists and albums, so each is indexed
+    once and points at all the tracks that carry it. Strings are indexed by
+    trigram (for terms of three or more characters) and by one- and
+    two-letter word prefix (for shorter terms). A query term matches a string
+    that contains it; every term must match one of a track's fields.
+
+    Results come in tiers: tracks whose name matches every term, then other
+    exact matches, then fuzzy matches (strings sharing most of a term's
+    trigrams, so small typos still find the track). Within a tier tracks keep
+    the order they were added, which is playlist order. Ranking works on
+    sets and plain ints throughout, so a query stays in the low milliseconds
+    however many tracks are indexed.
+
+    Tracks are added a page at a time as they are loaded (add) or a whole
+    playlist at once from the cache (replace_playlist), keyed by playlist id
+    and position: two playlists with the same name stay separate. Adding a
+    track at a position that is already indexed replaces it, unless it is
+    the same track, which is left as it is; reloading a page costs nothing.
+    Replaced tracks leave empty doc slots behind, and once those outnumber
+    the live tracks the index is rebuilt without them. Pages are added from
+    worker threads, so updates and queries share a lock.
+    """
+
+    FUZZY_MIN_SHARE = 0.6
+    # Empty doc slots tolerated before a rebuild, whatever the index size.
+    COMPACT_MIN = 1024
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._hits = []  # doc id -> SearchHit, or None once replaced
+        self._removed = 0  # None slots in _hits
+        self._doc_by_key = {}  # (playlist id, position) -> doc id
+        self._docs_by_playlist = {}  # playlist id -> set of doc ids
+        self._string_ids = {}  # (field, folded text) -> string id
+        self._texts = []  # string id -> folded text
+        self._fields = []  # string id -> field
+        self._string_docs = []  # string id -> set of doc ids
+        self._grams = {}  # trigram -> set of string ids
+        self._prefixes = {}  # 1-2 letter word prefix -> set of string ids
+
+    def add(self, playlist_id, playlist, position, uri, name, artist, album) -> None:
+        with self._lock:
+            self._add(SearchHit(
+                playlist_id, playlist, position, uri, name, artist, album))
+            self._maybe_compact()
+
+    def replace_playlist(self, playlist_id, playlist, rows) -> None:
+        """Index a whole playlist, dropping whatever else was indexed for it.
+        rows are (position, uri, name, artist, album)."""
+        with self._lock:
+            positions = set()
+            for position, uri, name, artist, album in rows:
+                self._add(SearchHit(
+                    playlist_id, playlist, position, uri, name, artist, album))
+                positions.add(position)
+            for doc in list(self._docs_by_playlist.get(playlist_id, ())):
+                if self._hits[doc].position not in positions:
+                    self._remove_doc(doc)
+            self._maybe_compact()
+
+    def remove_playlist(self, playlist_id) -> None:
+        with self._lock:
+            self._remove_playlist(playlist_id)
+            self._maybe_compact()
+
+    def search(self, query: str, limit: int = 20) -> list:
+        terms = [t for t in query.casefold().split() if len(t) >= 2]
+        if not terms:
+            return []
+        with self._lock:
+            per_term = [self._exact(term) for term in terms]
+            in_name = _intersect([by_field[NAME] for by_field in per_term])
+            exact = _intersect([set().union(*by_field) for by_field in per_term])
+            ids = heapq.nsmallest(limit, in_name)
+            if len(ids) < limit:
+                ids += heapq.nsmallest(limit - len(ids), exact - in_name)
+            if len(ids) < limit:
+                fuzzy = _intersect([self._fuzzy(term) for term in terms])
+                ids += heapq.nsmallest(limit - len(ids), fuzzy - exact)
+            return [self._hits[i] for i in ids]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._doc_by_key)
+
+    def _add(self, hit) -> None:
+        # Caller holds the lock.
+        key = (hit.playlist_id, hit.position)
+        old = self._doc_by_key.get(key)
+        if old is not None:
+            if self._hits[old] == hit:
+                return
+            self._remove_doc(old)
+        doc = len(self._hits)
+        self._hits.append(hit)
+        self._doc_by_key[key] = doc
+        self._docs_by_playlist.setdefault(hit.playlist_id, set()).add(doc)
+        for field, text in ((NAME, hit.name), (ARTIST, hit.artist), (ALBUM, hit.album)):
+            if text:
+                self._string_docs[self._string_id(field, text)].add(doc)
+
+    def _string_id(self, field, text) -> int:
+        folded = text.casefold()
+        sid = self._string_ids.get((field, folded))
+        if sid is not None:
+            return sid
+        sid = len(self._texts)
+        self._string_ids[(field, folded)] = sid
+        self._texts.append(folded)
+        self._fields.append(field)
+        self._string_docs.append(set())
+        for gram in _trigrams(folded):
+            self._grams.setdefault(gram, set()).add(sid)
+        for word in folded.split():
+            for prefix in {word[:1], word[:2]}:
+                self._prefixes.setdefault(prefix, set()).add(sid)
+        return sid
+
+    def _remove_doc(self, doc) -> None:
+        hit = self._hits[doc]
+        self._hits[doc] = None
+        self._removed += 1
+        del self._doc_by_key[(hit.playlist_id, hit.position)]
+        self._docs_by_playlist.get(hit.playlist_id, set()).discard(doc)
+        for field, text in ((NAME, hit.name), (ARTIST, hit.artist), (ALBUM, hit.album)):
+            sid = self._string_ids.get((field, text.casefold())) if text else None
+            if sid is not None:
+                self._string_docs[sid].discard(doc)
+
+    def _remove_playlist(self, playlist_id) -> None:
+        for doc in list(self._docs_by_playlist.pop(playlist_id, ())):
+            self._remove_doc(doc)
+
+    def _maybe_compact(self) -> None:
+        # Caller holds the lock. Re-adding the live hits in doc order keeps
+        # their relative order, which is what ranking ties fall back on, and
+        # drops strings no live track uses any more.
+        if self._removed <= max(self.COMPACT_MIN, len(self._doc_by_key)):
+            return
+        live = [hit for hit in self._hits if hit is not None]
+        self._reset()
+        for hit in live:
+            self._add(hit)
+
+    def _exact(self, term) -> list:
+        """Doc ids whose name / artist / album contains term, per field."""
+        if len(term) < 3:
+            sids = self._prefixes.get(term, ())
+        else:
+            postings = sorted(
+                (self._grams.get(g, set()) for g in _trigrams(term)), key=len)
+            sids = set(postings[0]).intersection(*postings[1:])
+            sids = [s for s in sids if term in self._texts[s]]
+        return self._docs_of(sids)
+
+    def _fuzzy(self, term) -> set:
+        grams = _trigrams(term)
+        if len(grams) < 2:
+            return set()
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._grams.get(gram, ()))
+        needed = max(2, math.ceil(self.FUZZY_MIN_SHARE * len(grams)))
+        sids = [s for s, n in counts.items() if n >= needed]
+        return set().union(*self._docs_of(sids))
+
+    def _docs_of(self, sids) -> list:
+        by_field = [set(), set(), set()]
+        for sid in sids:
+            by_field[self._fields[sid]] |= self._string_docs[sid]
+        return by_field
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _intersect(sets) -> set:
+    sets = sorted(sets, key=len)
+    return set(sets[0]).intersection(*sets[1:]) if sets else set()
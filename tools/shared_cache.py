@@ -0,0 +1,114 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+REDIS_URL = os.getenv("SPOTUIPY_REDIS_URL", "")
+PAGE_TTL_S = int(os.getenv("SPOTUIPY_REDIS_PAGE_TTL", str(7 * 24 * 3600)))
+ART_TTL_S = int(os.getenv("SPOTUIPY_REDIS_ART_TTL", str(30 * 24 * 3600)))
+KEY_PREFIX = os.getenv("SPOTUIPY_REDIS_PREFIX", "spotuipy:")
+
+
+class SharedCache:
+    """Optional Redis tier shared by every spotuipy instance on a machine or
+    network, sitting behind the local SQLite and disk caches.
+
+    Local caches stay the first stop; on a local miss they ask here before
+    going to Spotify, and whatever they fetch is published here, so one
+    instance loading a playlist or cover warms all the others.
+
+    Layout (all keys under KEY_PREFIX):
+
+    - pages:<playlist_id>:<snapshot> hash of page offset -> page JSON
+      (limit, total, next and the track rows with their positions)
+    - art:<sha1(url)>                raw cover bytes
+
+    Pages are keyed by snapshot, so an edited playlist simply stops matching.
+    Nothing is shared per playlist: instances still on an older snapshot
+    publish to their own hash and never evict the newer one (or each other).
+    Everything carries a TTL, which is how an old snapshot's pages go away.
+
+    The shared tier is best effort: any Redis error is logged, the call
+    answers "miss", and the tier is skipped for RETRY_S before trying again,
+    so a dead server costs one timeout rather than one per request. client
+    is anything with redis-py's get/set/hget/hset/expire methods.
+    """
+
+    RETRY_S = 30.0
+
+    def __init__(
+        self, client, prefix: str = KEY_PREFIX, page_ttl: int = PAGE_TTL_S,
+        art_ttl: int = ART_TTL_S, clock=time.monotonic,
+    ) -> None:
+        self._client = client
+        self._prefix = prefix
+        self._page_ttl = page_ttl
+        self._art_ttl = art_ttl
+        self._clock = clock
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+
+    def get_page(self, playlist_id: str, snapshot_id: str, offset: int):
+        """Page dict as published by put_page, or None."""
+        raw = self._call(
+            lambda c: c.hget(self._pages_key(playlist_id, snapshot_id), str(offset))
+        )
+        return json.loads(raw) if raw else None
+
+    def put_page(self, playlist_id: str, snapshot_id: str, offset: int, page) -> None:
+        pages_key = self._pages_key(playlist_id, snapshot_id)
+
+        def publish(c):
+            c.hset(pages_key, str(offset), json.dumps(page))
+            c.expire(pages_key, self._page_ttl)
+
+        self._call(publish)
+
+    def get_art(self, url: str):
+        return self._call(lambda c: c.get(self._art_key(url)))
+
+    def put_art(self, url: str, data: bytes) -> None:
+        self._call(lambda c: c.set(self._art_key(url), data, ex=self._art_ttl))
+
+    def _call(self, op):
+        with self._lock:
+            if self._clock() < self._down_until:
+                return None
+        try:
+            return op(self._client)
+        except Exception as e:
+            with self._lock:
+                self._down_until = self._clock() + self.RETRY_S
+            logging.warning(f"Shared cache unavailable, skipping for {self.RETRY_S:.0f}s: {e}")
+            return None
+
+    def _key(self, *parts) -> str:
+        return self._prefix + ":".join(parts)
+
+    def _pages_key(self, playlist_id, snapshot_id) -> str:
+        return self._key("pages", playlist_id, snapshot_id)
+
+    def _art_key(self, url) -> str:
+        return self._key("art", hashlib.sha1(url.encode()).hexdigest())
+
+
+def connect_shared_cache(url: str = None):
+    """SharedCache for SPOTUIPY_REDIS_URL, or None if it isn't set or the
+    redis package isn't installed (the local caches work on their own)."""
+    url = url if url is not None else REDIS_URL
+    if not url:
+        return None
+    try:
+        import redis
+    except ImportError:
+        logging.warning("SPOTUIPY_REDIS_URL is set but redis is not installed")
+        return None
+    # from_url doesn't connect yet; the first command does. Short timeouts
+    # keep a missing server from stalling a page load.
+    client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+    return SharedCache(client)
+
+
+SHARED_CACHE = connect_shared_cache()
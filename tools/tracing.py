@@ -0,0 +1,189 @@
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+
+# Set to a path to record a trace and write it there (Chrome trace-event
+# JSON) when the app exits. Unset, tracing is off and costs next to nothing.
+TRACE_FILE = os.getenv("SPOTUIPY_TRACE_FILE", "")
+# Oldest events are dropped past this many, so a long session can't grow
+# the buffer without bound.
+TRACE_MAX_EVENTS = int(os.getenv("SPOTUIPY_TRACE_MAX_EVENTS", "200000"))
+
+_action = ContextVar("trace_action", default=None)
+_NO_SPAN = nullcontext()
+
+
+@contextmanager
+def trace_action(action):
+    """Attribute the spans recorded inside this block to a user action.
+
+    Like request_priority, the context variable doesn't follow work onto new
+    threads, so worker threads enter this themselves with the action id
+    handed to them.
+    """
+    token = _action.set(action)
+    try:
+        yield
+    finally:
+        _action.reset(token)
+
+
+def current_action():
+    return _action.get()
+
+
+class Tracer:
+    """Opt-in span tracing across the UI thread, workers and the network,
+    written out as Chrome trace-event JSON (open it in chrome://tracing or
+    https://ui.perfetto.dev).
+
+    A user action (a keypress) gets a correlation id from start_action();
+    everything done on its behalf, on any thread, is tagged with that id:
+
+    - span() times a block on the current thread ("X" events);
+    - complete() records a span whose start was taken earlier with now(),
+      for waits that cross callbacks (a debounce, a worker queue);
+    - instant() marks a point in time ("i" events).
+
+    Each action is also drawn as one bar from start_action() to
+    end_action() on its own async track ("b"/"e" events with the id), so the
+    whole keypress-to-render latency is visible at a glance with the spans
+    that make it up underneath.
+
+    Code far from the keypress (the playback poll, the now-playing widget)
+    doesn't know the action id, but it knows what it is looking at: follow()
+    registers the action under a key such as a track URI, and action_for()
+    finds it again.
+
+    Disabled, every method returns immediately and span() hands back a
+    shared no-op context manager. Events are buffered in memory (at most
+    max_events) and written by dump().
+    """
+
+    def __init__(self, enabled: bool = False, max_events: int = TRACE_MAX_EVENTS,
+                 clock=time.perf_counter) -> None:
+        self.enabled = enabled
+        self._clock = clock
+        self._events = deque(maxlen=max_events)
+        self._threads = {}
+        self._ids = itertools.count(1)
+        self._following = {}
+        self._open_actions = {}  # id -> name
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def now(self) -> float:
+        """Timestamp in microseconds, for complete()."""
+        return self._clock() * 1e6
+
+    def start_action(self, name: str, **args):
+        """A new correlation id for a user action, or None when disabled."""
+        if not self.enabled:
+            return None
+        action = next(self._ids)
+        with self._lock:
+            self._open_actions[action] = name
+        self._emit({"ph": "b", "cat": "action", "name": name, "id": action,
+                    "args": dict(args, action=action)})
+        return action
+
+    def end_action(self, action, **args) -> None:
+        if not self.enabled or action is None:
+            return
+        with self._lock:
+            started = self._open_actions.pop(action, None)
+        if started is None:
+            # Already ended (or never started here): one bar per action.
+            return
+        self._emit({"ph": "e", "cat": "action", "name": started,
+                    "id": action, "args": dict(args, action=action)})
+
+    def follow(self, key, action) -> None:
+        """Remember action under key (e.g. the URI of the track it starts)."""
+        if self.enabled and action is not None:
+            with self._lock:
+                self._following[key] = action
+
+    def action_for(self, key, pop: bool = False):
+        if not self.enabled:
+            return None
+        with self._lock:
+            if pop:
+                return self._following.pop(key, None)
+            return self._following.get(key)
+
+    def span(self, name: str, cat: str = "app", action=None, **args):
+        if not self.enabled:
+            return _NO_SPAN
+        return self._span(name, cat, action, args)
+
+    @contextmanager
+    def _span(self, name, cat, action, args):
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.complete(name, start, cat=cat, action=action, **args)
+
+    def complete(self, name: str, start_us: float, cat: str = "app",
+                 action=None, **args) -> None:
+        """A span from start_us (taken with now()) until now."""
+        if not self.enabled:
+            return
+        end = self.now()
+        self._emit({"ph": "X", "cat": cat, "name": name, "ts": start_us,
+                    "dur": max(0.0, end - start_us)},
+                   action, args)
+
+    def instant(self, name: str, cat: str = "app", action=None, **args) -> None:
+        if not self.enabled:
+            return
+        self._emit({"ph": "i", "s": "t", "cat": cat, "name": name}, action, args)
+
+    def events(self) -> list:
+        with self._lock:
+            return list(self._events)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._events.clear()
+            self._following.clear()
+            self._open_actions.clear()
+
+    def dump(self, path) -> int:
+        """Write the buffered events to path as Chrome trace JSON; returns
+        how many events were written."""
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        metadata = [
+            {"ph": "M", "name": "thread_name", "pid": self._pid, "tid": tid,
+             "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        metadata.append({"ph": "M", "name": "process_name", "pid": self._pid,
+                         "tid": 0, "args": {"name": "spotuipy"}})
+        Path(path).write_text(json.dumps(
+            {"traceEvents": metadata + events, "displayTimeUnit": "ms"}))
+        return len(events)
+
+    def _emit(self, event, action=None, args=None) -> None:
+        thread = threading.current_thread()
+        event.setdefault("ts", self.now())
+        event["pid"] = self._pid
+        event["tid"] = thread.ident
+        if args is not None:
+            action = action if action is not None else _action.get()
+            event["args"] = dict(args, action=action) if action is not None else args
+        with self._lock:
+            self._threads.setdefault(thread.ident, thread.name)
+            self._events.append(event)
+
+
+TRACER = Tracer(enabled=bool(TRACE_FILE))
@@ -1,13 +1,19 @@
+import sys
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class Track:
     """A single track within a playlist.
 
     Replaces the parallel track_info / track_uris / uri_list dicts: one object
     holds everything previously spread across three keying schemes, and the
     ordered PlaylistTracks collection below preserves position.
+
+    Slotted (no per-instance __dict__), and artist/album are interned: a large
+    library repeats the same few thousand artist and album names across tens
+    of thousands of tracks, and each parsed JSON response would otherwise
+    hold its own copy of every one.
     """
 
     uri: str
@@ -17,6 +23,10 @@ class Track:
     duration_ms: int
     row_index: int
 
+    def __post_init__(self) -> None:
+        self.artist = sys.intern(self.artist)
+        self.album = sys.intern(self.album)
+
     @property
     def unique_name(self) -> str:
         """Stable per-row identifier (name + row index), matching the old
@@ -30,19 +40,22 @@ class PlaylistTracks:
 
     Provides the three lookups the app needs — by position, by URI, and by
     unique name — all derived from one ordered list instead of three
-    hand-maintained dicts.
+    hand-maintained dicts. Only the URI lookup keeps an index: a unique name
+    already encodes the row, so by_unique_name goes straight to it rather
+    than holding a formatted-string key per track. The ordered URI list is
+    kept alongside the tracks, so uris() costs nothing per call.
     """
 
     def __init__(self) -> None:
         self._tracks: list[Track] = []
+        self._uris: list[str] = []
         self._by_uri: dict[str, Track] = {}
-        self._by_unique_name: dict[str, Track] = {}
 
     def append(self, track: Track) -> None:
         self._tracks.append(track)
+        self._uris.append(track.uri)
         # Last-write-wins on URI matches the old behaviour for duplicate tracks.
         self._by_uri[track.uri] = track
-        self._by_unique_name[track.unique_name] = track
 
     def by_index(self, index: int) -> Track | None:
         if 0 <= index < len(self._tracks):
@@ -53,7 +66,19 @@ class PlaylistTracks:
         return self._by_uri.get(uri)
 
     def by_unique_name(self, unique_name: str) -> Track | None:
-        return self._by_unique_name.get(unique_name)
+        _, _, row = unique_name.rpartition("_")
+        if not row.isdigit():
+            return None
+        row_index = int(row)
+        # Rows are appended in order, so the row index is normally the
+        # position; scan only if a collection was built some other way.
+        track = self.by_index(row_index)
+        if track is None or track.row_index != row_index:
+            track = next(
+                (t for t in self._tracks if t.row_index == row_index), None)
+        if track is not None and track.unique_name == unique_name:
+            return track
+        return None
 
     def index_of_uri(self, uri: str) -> int | None:
         track = self._by_uri.get(uri)
@@ -62,8 +87,9 @@ class PlaylistTracks:
         return track.row_index
 
     def uris(self) -> list[str]:
-        """Ordered list of track URIs (replaces uri_list[playlist])."""
-        return [t.uri for t in self._tracks]
+        """Ordered list of track URIs (replaces uri_list[playlist]). Shared,
+        not copied: callers must not modify it."""
+        return self._uris
 
     def __len__(self) -> int:
         return len(self._tracks)
@@ -0,0 +1,121 @@
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TrackIndex:
+    """Inverted index from track URI to every (playlist_id, position) it
+    appears at, across all of the user's playlists.
+
+    The rows themselves live in PlaylistCache's SQLite tracks table, so the
+    index survives restarts; this class keeps an in-memory dict over them for
+    lookups. update(snapshots) brings it in line with the current snapshot of
+    each playlist: playlists whose snapshot is unchanged and fully cached cost
+    nothing, the rest are fetched in full by fetch_playlist(playlist_id)
+    (which stores their pages in the cache), up to max_workers at a time, and
+    re-indexed. After that, "which playlist is this track in?" is a dict
+    lookup instead of a request per playlist.
+
+    update() runs on worker threads and may be called from more than one at
+    once: concurrent callers wait for a single build, or with wait=False
+    return straight away. A build fetches without holding the index lock and
+    swaps each playlist's rows in as they are read, so locate() answers from
+    the index as it stands while a build is running.
+    """
+
+    def __init__(self, cache, fetch_playlist, max_workers: int = 4) -> None:
+        self._cache = cache
+        self._fetch_playlist = fetch_playlist
+        self._max_workers = max_workers
+        self._by_uri = {}
+        self._indexed = {}  # playlist_id -> (snapshot_id, uris indexed)
+        self._order = {}
+        self._lock = threading.Lock()  # the in-memory index
+        self._build_lock = threading.Lock()  # one update() at a time
+
+    def update(self, snapshots: dict, wait: bool = True) -> bool:
+        """Index every playlist in snapshots (playlist_id -> snapshot_id, in
+        display order). snapshots may be the player's live dict: fetching a
+        playlist can record a newer snapshot in it. Returns False, having
+        done nothing, if wait is False and another update is running."""
+        if not self._build_lock.acquire(blocking=wait):
+            return False
+        try:
+            self._update(snapshots)
+        finally:
+            self._build_lock.release()
+        return True
+
+    def _update(self, snapshots: dict) -> None:
+        # Caller holds the build lock, so only this thread changes _indexed.
+        with self._lock:
+            self._order = {pid: i for i, pid in enumerate(snapshots)}
+            for pid in [p for p in self._indexed if p not in snapshots]:
+                self._drop(pid)
+        stale = [
+            pid for pid, snap in list(snapshots.items())
+            if self._indexed.get(pid, (None,))[0] != snap or snap is None
+        ]
+        missing = [
+            pid for pid in stale
+            if not self._cache.is_complete(pid, snapshots.get(pid))
+        ]
+        if missing:
+            with ThreadPoolExecutor(
+                max_workers=min(self._max_workers, len(missing))
+            ) as pool:
+                # In a copy of the caller's context each, so the fetches keep
+                # its request lane instead of the pool threads' default.
+                futures = [
+                    pool.submit(contextvars.copy_context().run,
+                                self._fetch_quietly, pid)
+                    for pid in missing
+                ]
+                for future in futures:
+                    future.result()
+        for pid in stale:
+            snap = snapshots.get(pid)
+            rows = None
+            if self._cache.is_complete(pid, snap):
+                rows = list(self._cache.track_positions(pid))
+            with self._lock:
+                self._drop(pid)
+                if rows is not None:
+                    self._add(pid, snap, rows)
+
+    def locate(self, uri: str) -> list:
+        """(playlist_id, position) pairs for uri, in playlist display order."""
+        with self._lock:
+            hits = list(self._by_uri.get(uri, ()))
+            order = self._order
+        return sorted(hits, key=lambda hit: (order.get(hit[0], 0), hit[1]))
+
+    def __contains__(self, playlist_id) -> bool:
+        with self._lock:
+            return playlist_id in self._indexed
+
+    def _fetch_quietly(self, playlist_id) -> None:
+        try:
+            self._fetch_playlist(playlist_id)
+        except Exception as e:
+            # Left out of the index; the next update() retries it.
+            logging.warning(f"Could not index playlist {playlist_id}: {e}")
+
+    def _add(self, playlist_id, snapshot_id, rows) -> None:
+        # Caller holds the lock.
+        uris = []
+        for position, uri in rows:
+            self._by_uri.setdefault(uri, []).append((playlist_id, position))
+            uris.append(uri)
+        self._indexed[playlist_id] = (snapshot_id, uris)
+
+    def _drop(self, playlist_id) -> None:
+        # Caller holds the lock.
+        _, uris = self._indexed.pop(playlist_id, (None, ()))
+        for uri in set(uris):
+            hits = [h for h in self._by_uri.get(uri, ()) if h[0] != playlist_id]
+            if hits:
+                self._by_uri[uri] = hits
+            else:
+                self._by_uri.pop(uri, None)
@@ -0,0 +1,68 @@
+from tools.formatting import format_duration, format_artist_track
+from tools.track import Track, PlaylistTracks
+
+
+def load_tracks(
+    tracks, playlist, playlist_tracks, search_index=None, playlist_id=None
+) -> list:
+    """Populate playlist_tracks[playlist] with Track objects and return the
+    formatted and unformatted display rows for the table. With a
+    search_index, each track is also indexed at its position in the playlist,
+    under playlist_id (the playlist's name if not given)."""
+    list_items = []
+    unformatted_list_items = []
+    playlist_tracks[playlist] = PlaylistTracks()
+    offset = tracks.get("offset") or 0
+
+    for row_index, item in enumerate(tracks["items"]):
+        track = item["track"]
+        artist_name = track["artists"][0]["name"]
+        track_name = track["name"]
+        album_name = track["album"]["name"]
+        duration_ms = track["duration_ms"]
+        duration = format_duration(duration_ms)
+        uri = track["uri"]
+
+        playlist_tracks[playlist].append(Track(
+            uri=uri,
+            name=track_name,
+            artist=artist_name,
+            album=album_name,
+            duration_ms=duration_ms,
+            row_index=row_index,
+        ))
+        if search_index is not None:
+            search_index.add(
+                playlist_id or playlist, playlist, offset + row_index, uri,
+                track_name, artist_name, album_name,
+            )
+
+        artist_name_formatted, track_name_formatted, album_name_formatted = (
+            format_artist_track(artist_name, track_name, album_name, 20)
+        )
+
+        list_items.append(
+            (
+                track_name_formatted,
+                artist_name_formatted,
+                album_name_formatted,
+                duration,
+            )
+        )
+        unformatted_list_items.append(
+            (track_name, artist_name, album_name, duration))
+
+    return list_items, unformatted_list_items
+
+
+def load_user_playlists(playlists):
+    """Return playlist names in display order, a name -> id map, and an
+    id -> snapshot_id map (the snapshot keys the on-disk playlist cache)."""
+    playlist_names = []
+    playlist_ids = {}
+    playlist_snapshots = {}
+    for playlist in playlists["items"]:
+        playlist_names.append(playlist["name"])
+        playlist_ids[playlist["name"]] = playlist["id"]
+        playlist_snapshots[playlist["id"]] = playlist.get("snapshot_id")
+    return playlist_names, playlist_ids, playlist_snapshots
@@ -1,21 +1,70 @@
 from textual import work
+# Not deferred like the network libraries: textual-image asks the terminal
+# which graphics protocol it supports when imported, which only works before
+# Textual takes over the terminal.
 from textual_image.widget import Image as AlbumImage
 from PIL import Image as PILImage
 from io import BytesIO
-import requests
 import logging
 from textual.widgets import ListItem, Label, Static, ProgressBar
 from textual.app import ComposeResult
 from textual.containers import Horizontal
 from textual.timer import Timer
-from spotify_api.spotify_client import SpotifyClient
+from rich.table import Table
+from spotify_api.metrics import METRICS
 from tools.formatting import format_duration
-
-sp = SpotifyClient.get_instance()
+from tools.shared_cache import SHARED_CACHE
+from tools.art_cache import ArtCache, quantize_size
+from tools.playback_monitor import PlaybackMonitor
+from tools.tracing import TRACER
+from tools.render_budget import ProgressFrame, tick_ms
+from tools.playback_clock import PLAYBACK_CLOCK
 
 logging.getLogger("spotipy").setLevel(logging.WARNING)
 logging.getLogger("urllib3").setLevel(logging.WARNING)
 
+# Typical terminal cell size in pixels (width, height), for when textual-image
+# can't tell us the real one.
+FALLBACK_CELL_PX = (10, 20)
+
+
+def _fetch_cover(url: str) -> bytes:
+    from spotify_api.http_pool import get_session
+
+    resp = get_session().get(url, timeout=5)
+    resp.raise_for_status()
+    return resp.content
+
+
+def _decode_cover(data: bytes, size=None):
+    pil = PILImage.open(BytesIO(data))
+    # PIL decodes lazily; force it here so it happens on the worker thread,
+    # along with the downscale, instead of at render time.
+    pil.load()
+    if size is not None:
+        pil.thumbnail(size, PILImage.Resampling.LANCZOS)
+    return pil.convert("RGB")
+
+
+def _cell_size_px():
+    """Terminal cell size in pixels, as textual-image measures it."""
+    # textual_image._terminal is private, so a textual-image release may move
+    # get_cell_size or change what it returns.
+    try:
+        from textual_image._terminal import get_cell_size
+    except ImportError:
+        return FALLBACK_CELL_PX
+    cell = get_cell_size()
+    try:
+        return cell.width, cell.height
+    except AttributeError:
+        return FALLBACK_CELL_PX
+
+
+ART_CACHE = ArtCache(
+    fetch=_fetch_cover, decode=_decode_cover, shared=SHARED_CACHE
+)
+
 
 class PlaylistLabel(ListItem):
     def __init__(self, label: str) -> None:
@@ -26,7 +75,28 @@ class PlaylistLabel(ListItem):
         yield Label(self.label)
 
 
+class SearchResult(ListItem):
+    """One search hit in the results list; keeps the hit for the jump."""
+
+    def __init__(self, hit) -> None:
+        super().__init__()
+        self.hit = hit
+
+    def compose(self) -> ComposeResult:
+        yield Label(f"{self.hit.name} — {self.hit.artist}  [{self.hit.playlist}]")
+
+
 class TrackProgress(Static):
+    """Elapsed/total time and a progress bar, ticked locally between polls.
+
+    The position comes from PLAYBACK_CLOCK, which the monitor anchors on
+    every poll, so a late or skipped tick repaints late but never loses
+    time. The tick runs PROGRESS_FPS times a second but only repaints what
+    would look different (see ProgressFrame): the time label once a second,
+    the bar when it moves a half-cell. Widget references are looked up once
+    on mount rather than on every tick.
+    """
+
     progress_timer: Timer
 
     def __init__(self):
@@ -35,6 +105,8 @@ class TrackProgress(Static):
         self.progress_ms = 0
         self.is_finished = False
         self.is_active = False
+        self._tick_ms = tick_ms()
+        self._frame = ProgressFrame()
 
     def compose(self) -> ComposeResult:
         with Horizontal():
@@ -48,17 +120,32 @@ class TrackProgress(Static):
             )
 
     def on_mount(self) -> None:
-        self.progress_timer = self.set_interval(1 / 10, self.make_progress, pause=True)
+        self._bar = self.query_one("#track_progress", ProgressBar)
+        self._elapsed_label = self.query_one(
+            "#track_progress_time_label", TrackProgressTimeLabel)
+        self._total_label = self.query_one(
+            "#track_progress_total_time_label", TrackProgressTimeLabel)
+        self.progress_timer = self.set_interval(
+            self._tick_ms / 1000, self.make_progress, pause=True)
 
     def on_playback_monitor_playback_changed(self, message) -> None:
+        progress_ms = self._position(message)
         if self.is_active:
             if message.trust_progress:
-                self.update_progress_bar(message.progress_ms, message.duration_ms)
-                self.progress_ms = message.progress_ms
+                self.update_progress_bar(progress_ms, message.duration_ms)
+                self.progress_ms = progress_ms
                 self.total_time_ms = message.duration_ms
             # during seek guard: leave local progress_ms alone, keep ticking
         else:
-            self.start_progress_bar(message.progress_ms, message.duration_ms)
+            self.start_progress_bar(progress_ms, message.duration_ms)
+
+    @staticmethod
+    def _position(message) -> int:
+        # The clock has already been synced to this poll, and accounts for
+        # the time the response took to arrive.
+        if PLAYBACK_CLOCK.uri == message.track_uri:
+            return PLAYBACK_CLOCK.position_ms()
+        return message.progress_ms
 
     def on_playback_monitor_playback_stopped(self, message) -> None:
         self.reset_to_zero()
@@ -70,26 +157,24 @@ class TrackProgress(Static):
             self.is_active = False
             return
 
-        self.progress_ms += 100
-        self.query_one("#track_progress", ProgressBar).advance(100)
-        self.query_one("#track_progress_time_label", TrackProgressTimeLabel).update(
-            new_time_label=format_duration(self.progress_ms),
-            duration_ms=self.progress_ms,
-        )
+        self.progress_ms = min(PLAYBACK_CLOCK.position_ms(), self.total_time_ms)
+        self._paint(self.progress_ms, self.total_time_ms)
+
+    def _paint(self, progress_ms: int, total_time_ms: int) -> None:
+        frame = self._frame
+        # The bar's own size: its percentage and ETA parts are hidden.
+        if frame.bar_changed(progress_ms, total_time_ms, self._bar.size.width):
+            self._bar.update(progress=progress_ms, total=total_time_ms)
+        text = frame.elapsed_text(progress_ms)
+        if text is not None:
+            self._elapsed_label.update(new_time_label=text, duration_ms=progress_ms)
+        text = frame.total_text(total_time_ms)
+        if text is not None:
+            self._total_label.update(new_time_label=text, duration_ms=total_time_ms)
 
     def start_progress_bar(self, progress_ms: int, total_time_ms: int) -> None:
-        self.query_one("#track_progress", ProgressBar).update(
-            progress=progress_ms, total=total_time_ms
-        )
-        self.query_one("#track_progress_time_label", TrackProgressTimeLabel).update(
-            new_time_label=format_duration(progress_ms), duration_ms=progress_ms
-        )
-        self.query_one(
-            "#track_progress_total_time_label", TrackProgressTimeLabel
-        ).update(
-            new_time_label=format_duration(total_time_ms), duration_ms=total_time_ms
-        )
         self.reset_progress_bar()
+        self._paint(progress_ms, total_time_ms)
         self.resume_progress_bar()
         self.total_time_ms = total_time_ms
         self.progress_ms = progress_ms
@@ -97,17 +182,7 @@ class TrackProgress(Static):
         self.is_active = True
 
     def update_progress_bar(self, progress_ms: int, total_time_ms: int) -> None:
-        self.query_one("#track_progress", ProgressBar).update(
-            progress=progress_ms, total=total_time_ms
-        )
-        self.query_one("#track_progress_time_label", TrackProgressTimeLabel).update(
-            new_time_label=format_duration(progress_ms), duration_ms=progress_ms
-        )
-        self.query_one(
-            "#track_progress_total_time_label", TrackProgressTimeLabel
-        ).update(
-            new_time_label=format_duration(total_time_ms), duration_ms=total_time_ms
-        )
+        self._paint(progress_ms, total_time_ms)
 
     def pause_progress_bar(self) -> None:
         self.progress_timer.pause()
@@ -117,19 +192,16 @@ class TrackProgress(Static):
 
     def reset_progress_bar(self) -> None:
         self.progress_timer.reset()
-        self.query_one("#track_progress_time_label", TrackProgressTimeLabel).update(
-            new_time_label=format_duration(0), duration_ms=0
-        )
 
     def reset_to_zero(self) -> None:
         self.pause_progress_bar()
         self.is_active = False
         self.progress_ms = 0
         self.total_time_ms = 0
-        self.query_one("#track_progress", ProgressBar).update(progress=0)
-        self.query_one("#track_progress_time_label", TrackProgressTimeLabel).update(
-            new_time_label=format_duration(0), duration_ms=0
-        )
+        self._bar.update(progress=0)
+        self._frame.invalidate()
+        text = self._frame.elapsed_text(0)
+        self._elapsed_label.update(new_time_label=text, duration_ms=0)
 
 
 class TrackProgressTimeLabel(Label):
@@ -157,19 +229,26 @@ class CurrentTrack(Static):
         super().__init__()
         self.track_name = None
         self.track_artist = None
+        self.device_text = None
+        self._device_label = None
 
     def compose(self) -> ComposeResult:
         yield CurrentTrackLabel(label="", id="track-title")
         yield CurrentTrackLabel(label="", id="track-artist")
 
     def on_playback_monitor_playback_changed(self, message) -> None:
+        action = TRACER.action_for(message.track_uri, pop=True)
         if self.should_update_track(message.track_name, message.track_artist):
-            self.update_track_labels(message.track_name, message.track_artist)
-        device_label = self.app.query_one("#track-device", CurrentTrackLabel)
-        device_label.update(
+            with TRACER.span("title update", action=action):
+                self.update_track_labels(message.track_name, message.track_artist)
+        if action is not None:
+            # The action that started this track ends once the new title
+            # has been painted.
+            self.call_after_refresh(
+                TRACER.end_action, action, uri=message.track_uri)
+        self.update_device_label(
             f"Playing from {message.device_name}" if message.device_name else ""
         )
-        device_label.refresh(layout=True)
 
     def on_playback_monitor_playback_stopped(self, message) -> None:
         self.display_no_current_track()
@@ -177,22 +256,31 @@ class CurrentTrack(Static):
     def should_update_track(self, track_name, track_artist) -> bool:
         return self.track_name != track_name or self.track_artist != track_artist
 
+    def on_mount(self) -> None:
+        self._title_label = self.query_one("#track-title", CurrentTrackLabel)
+        self._artist_label = self.query_one("#track-artist", CurrentTrackLabel)
+
     def update_track_labels(self, track_name, track_artist):
-        title = self.app.query_one("#track-title", CurrentTrackLabel)
-        artist = self.app.query_one("#track-artist", CurrentTrackLabel)
-        title.update(track_name)
-        artist.update(track_artist)
-        title.refresh(layout=True)
-        artist.refresh(layout=True)
+        # Label.update already refreshes layout.
+        self._title_label.update(track_name)
+        self._artist_label.update(track_artist)
         self.track_name = track_name
         self.track_artist = track_artist
 
+    def update_device_label(self, text: str) -> None:
+        # Every poll reports the device; repaint only when it changes.
+        if text == self.device_text:
+            return
+        if self._device_label is None:
+            # A sibling in PlayerControls, mounted after this widget.
+            self._device_label = self.app.query_one("#track-device", CurrentTrackLabel)
+        self._device_label.update(text)
+        self.device_text = text
+
     def display_no_current_track(self):
-        self.query_one("#track-title", CurrentTrackLabel).update(
-            "No track currently playing"
-        )
-        self.query_one("#track-artist", CurrentTrackLabel).update("")
-        self.app.query_one("#track-device", CurrentTrackLabel).update("")
+        self._title_label.update("No track currently playing")
+        self._artist_label.update("")
+        self.update_device_label("")
         self.track_name = None
         self.track_artist = None
 
@@ -201,12 +289,28 @@ class AlbumCover(Static):
     def __init__(self):
         super().__init__()
         self._last_art = None
+        self._size_px = None
 
     def compose(self) -> ComposeResult:
         yield AlbumImage(id="cover")
 
+    def on_resize(self, event) -> None:
+        # Covers are square, so the smaller side of the widget bounds the
+        # drawn size.
+        cell_w, cell_h = _cell_size_px()
+        side = max(min(event.size.width * cell_w, event.size.height * cell_h), 1)
+        size_px = quantize_size(side, side)
+        if size_px == self._size_px:
+            return
+        self._size_px = size_px
+        # Ask the monitor for the smallest variant that still covers this.
+        self.app.query_one(PlaybackMonitor).art_target_px = size_px[0]
+        if self._last_art:
+            self.load_cover(self._last_art)
+
     def on_playback_monitor_playback_changed(self, message) -> None:
-        if not message.art_url:
+        # The monitor posts every poll; only a new cover URL needs any work.
+        if not message.art_url or message.art_url == self._last_art:
             return
         self._last_art = message.art_url
         self.load_cover(message.art_url)
@@ -214,9 +318,10 @@ class AlbumCover(Static):
     @work(thread=True, exclusive=True)
     def load_cover(self, url: str) -> None:
         try:
-            resp = requests.get(url, timeout=5)
-            pil = PILImage.open(BytesIO(resp.content))
+            pil = ART_CACHE.get(url, self._size_px)
         except Exception:
+            # Let the next poll retry this URL.
+            self._last_art = None
             return
         # Setting the widget property must happen on the UI thread:
         self.app.call_from_thread(self._set_image, pil)
@@ -227,3 +332,46 @@ class AlbumCover(Static):
     def on_playback_monitor_playback_stopped(self, message) -> None:
         self._last_art = None
         self.query_one("#cover", AlbumImage).image = None
+
+
+class DebugPanel(Static):
+    """Per-endpoint API metrics (calls, rate, latency, errors, bytes),
+    redrawn once a second while shown. Hidden by default; toggled from the
+    app. Reads METRICS, so it costs nothing while hidden."""
+
+    REFRESH_S = 1.0
+
+    def __init__(self):
+        super().__init__(id="debug-panel")
+        self._timer = None
+
+    def toggle(self) -> None:
+        self.display = not self.display
+        if self.display:
+            self.redraw()
+            self._timer = self.set_interval(self.REFRESH_S, self.redraw)
+        elif self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+
+    def redraw(self) -> None:
+        snap = METRICS.snapshot()
+        table = Table(
+            title=(
+                f"API: {snap['calls']} calls, {snap['calls_per_min']:.1f}/min, "
+                f"{snap['errors']} errors, {snap['rate_limited']} x 429 "
+                f"over {snap['session_s'] / 60:.1f} min"
+            ),
+            box=None, expand=True,
+        )
+        for column in ("Endpoint", "Calls", "/min", "p50 ms", "p95 ms", "Err", "429", "KB in"):
+            table.add_column(column, justify="left" if column == "Endpoint" else "right")
+        for name, e in snap["endpoints"].items():
+            latency = e["latency_ms"]
+            table.add_row(
+                name, str(e["calls"]), f"{e['calls_per_min']:.1f}",
+                f"{latency['p50']:.0f}", f"{latency['p95']:.0f}",
+                str(e["errors"]), str(e["rate_limited"]),
+                f"{e['bytes_in'] / 1024:.1f}",
+            )
+        self.update(table)